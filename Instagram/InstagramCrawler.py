@@ -2,23 +2,43 @@
 from datetime import datetime
 from pathlib import Path
 import argparse
-import requests
-import pandas as pd
+import copy
 import time
 import json
 from urllib.parse import quote
 from cookie_getter import get_instagram_cookies
+from ig_transport import get_transport, TRANSPORT_ERRORS
+from profile_cache import negative_reason_for_status
+from feed_store import is_pinned, merge_feed_items
+from run_journal import RunJournal
+from result_sink import ResultSink, export_run
+from parquet_writer import export_parquet
+from raw_archive import RawArchive, get_raw_archive
+from frontier import HashtagFrontier
+from post_normalizer import extract_hashtags
+import ig_parsers
 from fake_useragent import UserAgent
 import random
 import os
+import asyncio
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+# 프론티어 모드 기본 설정 - 해시태그 페이지 요청 예산 / 태그당 최대 페이지 / 시드에서 최대 확장 단계
+FRONTIER_DEFAULTS = {"max_requests": 30, "pages_per_tag": 2, "max_depth": 2}
 
 
 class InstagramCrawler:
-    def __init__(self, category, max_count=50, sleep_sec=2.0, output_dir="results", max_user_posts=100, username=None, password=None):
+    def __init__(self, category, max_count=50, sleep_sec=2.0, output_dir="results", max_user_posts=100, username=None, password=None, transport=None, profile_cache=None, negative_cache=None, feed_store=None, parquet_dir=None, raw_archive=None, country=None, post_listeners=None, frontier=None):
         self.category = category
         self.max_count = max_count
         self.sleep_sec = sleep_sec
         self.base_output_dir = None
+        # open_run에서 생성되는 실행별 NDJSON 결과 저장소
+        self.sink = None
+        self.crawl_date = None
+        # 실행 종료 시 crawl_date/hashtag 파티션 Parquet을 기록할 데이터셋 루트 (None이면 사용 안 함)
+        self.parquet_dir = parquet_dir
         self.USER_AGENTS = UserAgent()
         self.cookie_file_path = "ig_cookies.json"
         self.OUTPUT_DIR = Path(output_dir)
@@ -29,8 +49,37 @@ class InstagramCrawler:
         self.max_user_posts = max_user_posts
         self.username = username
         self.password = password
+        # 엔드포인트 간 공유 프로필 캐시 (None이면 항상 새로 수집)
+        self.profile_cache = profile_cache
+        # 없는/비공개/차단 계정 네거티브 캐시 (None이면 사용 안 함)
+        self.negative_cache = negative_cache
+        # 계정별 피드 증분 수집 상태 (None이면 매번 최신부터 전체 수집)
+        self.feed_store = feed_store
+        # 원본 응답 압축 아카이브 (RawArchive(enabled=False)를 넘기면 저장 안 함)
+        self.raw_archive = raw_archive or get_raw_archive()
+        # 수집 대상 국가 코드 (패턴 집계 등 post_listeners가 참고, None이면 알 수 없음)
+        self.country = country
+        # 프로필이 결과 저장소에 기록될 때마다 listener(profile, crawler) 호출 (예: PatternAggregator.on_profile)
+        self.post_listeners = list(post_listeners or [])
+        # 프론티어 모드 설정 (None이면 category 해시태그 하나만 수집, dict면 category의 쉼표 구분 시드에서 인접 해시태그로 확장)
+        self.frontier = None
+        if frontier is not None:
+            self.frontier = {key: int(frontier.get(key, default)) for key, default in FRONTIER_DEFAULTS.items()}
+        # 마지막 프론티어 실행의 HashtagFrontier (방문한 태그 / 남은 후보 확인용)
+        self.frontier_state = None
+        # 계정별 keep-alive 세션 + 토큰 버킷 스케줄러를 공유하는 전송 계층
+        self.transport = transport or get_transport()
+        if self.transport.scheduler is not None and sleep_sec:
+            # sleep_sec는 프로필 요청의 초기 간격으로 사용 (이후 AIMD로 조절)
+            self.transport.scheduler.set_initial_rate(self.username, "profile", 1.0 / sleep_sec)
         self._setup_cookies_and_headers()
 
+    def _request_headers(self):
+        """요청마다 User-Agent를 새로 뽑은 헤더 사본 반환 (self.headers는 변경하지 않음)"""
+        headers = self.headers.copy()
+        headers["User-Agent"] = self.USER_AGENTS.random
+        return headers
+
     def _cookie_dict_to_str(self, cookie_dict):
         return "; ".join(f"{k}={v}" for k, v in cookie_dict.items())
 
@@ -44,7 +93,6 @@ class InstagramCrawler:
                 print(f"[INFO] 제공된 계정으로 로그인 시도: {username}")
                 
                 # 비동기 환경 감지 및 동기 실행
-                import asyncio
                 try:
                     # 이미 실행 중인 루프가 있는지 확인
                     loop = asyncio.get_running_loop()
@@ -83,284 +131,278 @@ class InstagramCrawler:
         }
 
     def parse_post_node(self, node):
-        media_product_type = node.get('media_product_type', '')
-        shortcode = node.get('shortcode', '')
-        is_reel = (media_product_type == 'REELS') or ('/reel/' in f"/{shortcode}/")
-        like_count = node.get('edge_media_preview_like', {}).get('count', 0)
-        comment_count = node.get('edge_media_to_comment', {}).get('count', 0)
-        view_count = node.get('video_view_count', None)
-        media_type = node.get('__typename', None) or node.get('typename', None)
-        thumbnail_url = node.get('display_url', '')
-        media_url = thumbnail_url
-        video_url = node.get('video_url', None)
-        caption = ""
-        try:
-            caption = node.get('edge_media_to_caption', {}).get('edges', [{}])[0].get('node', {}).get('text', '')
-        except Exception:
-            pass
-        
-        # 음악 정보 추출 (릴스의 경우)
-        music_info = None
-        if is_reel:
-            # clips_music_attribution_info에서 음악 정보 추출
-            clips_info = node.get('clips_music_attribution_info')
-            if clips_info:
-                music_info = {
-                    'song_name': clips_info.get('song_name', ''),
-                    'artist_name': clips_info.get('artist_name', ''),
-                    'should_mute_audio': clips_info.get('should_mute_audio', False)
-                }
-            
-            # 대체 경로: music 또는 audio 정보
-            if not music_info:
-                music_data = node.get('music', {})
-                if music_data:
-                    music_info = {
-                        'song_name': music_data.get('song_name', ''),
-                        'artist_name': music_data.get('artist_name', ''),
-                        'should_mute_audio': False
-                    }
-        
-        # 해시태그 추출
-        hashtags = []
-        if caption:
-            import re
-            hashtags = re.findall(r'#(\w+)', caption)
-        
-        post_type = "reel" if is_reel else "post"
-        return {
-            'id': node.get('id'),
-            'shortcode': shortcode,
-            'is_reel': is_reel,
-            'post_type': post_type,
-            'media_type': media_type,
-            'caption': caption,
-            'hashtags': hashtags,
-            'music': music_info,
-            'like_count': like_count,
-            'comment_count': comment_count,
-            'view_count': view_count,
-            'thumbnail_url': thumbnail_url,
-            'media_url': media_url,
-            'video_url': video_url,
-            'taken_at_timestamp': node.get('taken_at_timestamp')
-        }
+        return ig_parsers.parse_post_node(node)
 
-    def get_recent_posts_by_tag(self, tag, max_count=50, output_dir=None):
-        posts = []
+    def _fetch_tag_page(self, tag, cursor=None):
+        """해시태그 한 페이지 요청 - (medias, next_cursor) 반환, 실패 시 (None, None)
+
+        cursor가 None이면 web_info로 첫 페이지를, 아니면 sections API로 다음 페이지를 요청합니다.
+        """
         tag_encoded = quote(tag)
-        url = f"https://i.instagram.com/api/v1/tags/web_info/?tag_name={tag_encoded}"
-        if output_dir is None:
-            output_dir = self.OUTPUT_DIR
         for attempt in range(3):
             try:
-                self.headers["User-Agent"] = self.USER_AGENTS.random
-                resp = requests.get(url, headers=self.headers)
+                if cursor is None:
+                    url = f"https://i.instagram.com/api/v1/tags/web_info/?tag_name={tag_encoded}"
+                    resp = self.transport.get(url, account=self.username, headers=self._request_headers(), endpoint="tag")
+                else:
+                    url = f"https://i.instagram.com/api/v1/tags/{tag_encoded}/sections/"
+                    form = {
+                        "tab": cursor["tab"],
+                        "max_id": cursor["max_id"],
+                        "page": cursor.get("page") or "",
+                        "next_media_ids": json.dumps(cursor.get("next_media_ids") or []),
+                        "surface": "grid",
+                    }
+                    resp = self.transport.post(url, account=self.username, headers=self._request_headers(), data=form, endpoint="tag")
                 if resp.status_code != 200:
                     print(f"[{tag_encoded}] 게시물 수집 실패 (status: {resp.status_code})")
-                    return posts
+                    return None, None
                 data = resp.json()
-                print(f"[DEBUG] API 응답(일부): {str(data)[:300]}")
-                with open(output_dir / f"ig_tag_{tag}_api_response.json", "w", encoding="utf-8") as f:
-                    json.dump(data, f, ensure_ascii=False, indent=2)
-                sections = data.get("data", {}).get("top", {}).get("sections", [])
-                if not sections:
-                    sections = data.get("data", {}).get("recent", {}).get("sections", [])
-                if not sections:
-                    medias = data.get("data", {}).get("top", {}).get("layout_content", {}).get("medias", [])
-                    posts.extend(medias)
-                    medias2 = data.get("data", {}).get("recent", {}).get("layout_content", {}).get("medias", [])
-                    posts.extend(medias2)
-                    print(f"[{tag_encoded}] fallback로 medias에서 {len(posts)}개 추출")
-                    return posts[:max_count]
-                medias = []
-                for sec in sections:
-                    medias.extend(sec.get("layout_content", {}).get("medias", []))
-                posts.extend(medias)
-                return posts[:max_count]
-            except (requests.exceptions.RequestException, json.JSONDecodeError) as e:
+                self.raw_archive.store("tag", f"{tag}:{cursor['max_id'] if cursor else ''}", resp.content)
+                if cursor is None:
+                    print(f"[DEBUG] API 응답(일부): {resp.content[:300].decode('utf-8', 'replace')}")
+                medias, next_cursor = ig_parsers.parse_tag_page(data, tab=cursor["tab"] if cursor else None)
+                return medias, next_cursor
+            except TRANSPORT_ERRORS + (json.JSONDecodeError,) as e:
                 print(f"[{tag_encoded}] 요청 또는 JSON 파싱 실패: {e} (재시도 {attempt+1}/3)")
                 time.sleep(random.uniform(2,5))
             except Exception as e:
                 print(f"[{tag_encoded}] 예기치 않은 오류: {e} (재시도 {attempt+1}/3)")
                 time.sleep(random.uniform(2,5))
-        return posts
+        return None, None
+
+    def iter_tag_pages(self, tag, cursor=None, max_pages=None, budget=None):
+        """해시태그 섹션을 커서로 넘기며 (medias, next_cursor)를 페이지 단위로 yield
+
+        budget이 주어지면 페이지를 요청하기 전마다 budget()을 호출하고 False면 중단합니다 (여러 태그가 나눠 쓰는 요청 예산).
+        """
+        pages = 0
+        while True:
+            if budget is not None and not budget():
+                return
+            medias, next_cursor = self._fetch_tag_page(tag, cursor=cursor)
+            if medias is None:
+                return
+            pages += 1
+            yield medias, next_cursor
+            if not next_cursor or (max_pages and pages >= max_pages):
+                return
+            cursor = next_cursor
+
+    def iter_tag_authors(self, tag, max_authors=50, seen=None, cursor=None, on_page=None):
+        """해시태그 페이지를 넘기며 처음 보는 작성자를 즉시 yield (중복은 수집 중에 제거)
+
+        on_page가 주어지면 페이지마다 (새 작성자 목록, 다음 페이지 커서)로 먼저 호출합니다.
+        """
+        seen = set() if seen is None else seen
+        yielded = 0
+        for medias, next_cursor in self.iter_tag_pages(tag, cursor=cursor):
+            new_authors = []
+            for post in medias:
+                username = post.get('media', {}).get('user', {}).get('username')
+                if not username or username in seen:
+                    continue
+                seen.add(username)
+                new_authors.append(username)
+            if on_page is not None:
+                on_page(new_authors, next_cursor)
+            for username in new_authors:
+                yielded += 1
+                yield username
+                if yielded >= max_authors:
+                    return
+
+    def iter_journal_authors(self, tag, max_authors, journal, state):
+        """저널에 남은 미완료 작성자를 먼저 yield 한 뒤, 저장된 커서부터 해시태그 수집을 이어가며 새 페이지를 저널에 기록"""
+        known = state["authors"][:max_authors]
+        for username in known:
+            if username not in state["completed"]:
+                yield username
+        if state["tag_exhausted"] or len(known) >= max_authors:
+            return
+        yield from self.iter_tag_authors(
+            tag,
+            max_authors=max_authors - len(known),
+            seen=set(state["authors"]),
+            cursor=state["cursor"],
+            on_page=journal.record_page,
+        )
+
+    def iter_frontier_authors(self, frontier, max_authors=50, max_requests=30, pages_per_tag=2, seen=None):
+        """프론티어 모드 - frontier가 꺼내 주는 해시태그를 차례로 수집하며 처음 보는 작성자를 즉시 yield
+
+        수집한 게시물 캡션의 해시태그는 frontier에 후보로 넘겨 다음 태그의 우선순위에 반영합니다.
+        max_requests는 모든 태그를 합친 해시태그 페이지 요청 예산이며(실패한 요청도 차감),
+        seen은 태그 간에 공유되므로 한 실행에서 같은 작성자는 한 번만 수집합니다.
+        """
+        seen = set() if seen is None else seen
+        yielded = 0
+        requests = 0
+        while requests < max_requests and yielded < max_authors:
+            item = frontier.pop()
+            if item is None:
+                return
+            tag, depth = item
+            print(f"[프론티어] #{tag} 수집 (깊이 {depth}, 요청 {requests}/{max_requests})")
+            pages = 0
+            for medias, _ in self.iter_tag_pages(tag, max_pages=min(pages_per_tag, max_requests - requests)):
+                pages += 1
+                new_authors = []
+                for post in medias:
+                    media = post.get('media', {})
+                    caption = (media.get('caption') or {}).get('text')
+                    frontier.observe(tag, depth, extract_hashtags(caption), post_id=media.get('pk') or media.get('id'))
+                    username = media.get('user', {}).get('username')
+                    if not username or username in seen:
+                        continue
+                    seen.add(username)
+                    new_authors.append(username)
+                frontier.record_page(tag, len(new_authors))
+                for username in new_authors:
+                    yielded += 1
+                    yield username
+                    if yielded >= max_authors:
+                        return
+            # 첫 페이지부터 실패한 태그도 요청 1회로 계산
+            requests += max(pages, 1)
+
+    def iter_run_authors(self, journal, state):
+        """open_run 이후 이번 실행에서 수집할 작성자 - 프론티어 모드면 시드에서 확장한 해시태그들, 아니면 category 해시태그
+
+        프론티어는 저널에 태그 커서를 남기지 않으므로 재개할 때는 시드부터 다시 확장하고 이미 완료한 작성자만 건너뜁니다.
+        """
+        if self.frontier is None:
+            return self.iter_journal_authors(self.category, self.max_count, journal, state)
+        self.frontier_state = HashtagFrontier(self.category.split(','), max_depth=self.frontier["max_depth"])
+        return self.iter_frontier_authors(
+            self.frontier_state,
+            max_authors=self.max_count - len(state["completed"]),
+            max_requests=self.frontier["max_requests"],
+            pages_per_tag=self.frontier["pages_per_tag"],
+            seen=set(state["completed"]),
+        )
+
+    def get_recent_posts_by_tag(self, tag, max_count=50, output_dir=None):
+        # output_dir는 이전 호출 방식 호환용 (원본 응답은 raw_archive에 저장)
+        posts = []
+        for medias, _ in self.iter_tag_pages(tag):
+            posts.extend(medias)
+            if len(posts) >= max_count:
+                break
+        return posts[:max_count]
 
     def extract_usernames_from_posts(self, posts):
-        usernames = set()
+        # 게시물 순서를 유지하며 중복 제거
+        usernames = {}
         for post in posts:
             media = post.get('media', {})
             user = media.get('user', {})
             username = user.get('username')
             if username:
-                usernames.add(username)
+                usernames[username] = True
         return list(usernames)
 
-    def fetch_recent_posts_rest_api(self, username, user_id, max_count=None, headers=None, user_dir=None):
-        # max_count가 None이면 self.max_user_posts 사용
-        if max_count is None:
-            max_count = self.max_user_posts
+    def _fetch_feed_pages(self, username, user_id, max_count, headers, next_max_id=None, known_ids=None):
+        """피드 페이지 수집 - known_ids에 있는 (고정되지 않은) 게시물이 나오면 중단
+
+        반환: (items, next_max_id, reached_known)
+        """
         all_posts = []
-        next_max_id = None
-        if headers is None:
-            headers = self.headers
+        reached_known = False
         for _ in range((max_count // 12) + 2):
             posts_url = f"https://i.instagram.com/api/v1/feed/user/{user_id}/?count=12"
             if next_max_id:
                 posts_url += f"&max_id={next_max_id}"
             posts_headers = headers.copy()
             posts_headers["Referer"] = f"https://www.instagram.com/{username}/"
-            resp = requests.get(posts_url, headers=posts_headers)
+            resp = self.transport.get(posts_url, account=self.username, headers=posts_headers, endpoint="feed")
             if resp.status_code == 200:
                 posts_data = resp.json()
+                self.raw_archive.store("feed", f"{user_id}:{next_max_id or ''}", resp.content)
                 items = posts_data.get("items", [])
                 all_posts.extend(items)
                 next_max_id = posts_data.get("next_max_id")
                 print(f"누적 {len(all_posts)}개 수집 (이번에 {len(items)}개)")
+                if known_ids and any(item.get("id") in known_ids and not is_pinned(item) for item in items):
+                    print(f"[{username}] 저장된 게시물에 도달 - 증분 수집 종료")
+                    reached_known = True
+                    break
                 if not next_max_id or not items or len(all_posts) >= max_count:
                     break
-                time.sleep(1)
             else:
                 print(f"[ERROR] 게시물 status_code: {resp.status_code}, message: {resp.text}")
                 break
-        all_posts = all_posts[:max_count]
-        if user_dir is not None:
-            posts_file_path = user_dir / f"ig_posts_{username}_max{max_count}.json"
+        return all_posts, next_max_id, reached_known
+
+    def fetch_recent_posts_rest_api(self, username, user_id, max_count=None, headers=None, user_dir=None):
+        # max_count가 None이면 self.max_user_posts 사용
+        if max_count is None:
+            max_count = self.max_user_posts
+        if headers is None:
+            headers = self._request_headers()
+
+        state = self.feed_store.load(username) if self.feed_store is not None else None
+        if not state or str(state.get("user_id")) != str(user_id):
+            all_posts, next_max_id, _ = self._fetch_feed_pages(username, user_id, max_count, headers)
         else:
-            posts_file_path = self.OUTPUT_DIR / f"ig_posts_{username}_max{max_count}.json"
-        with open(posts_file_path, "w", encoding="utf-8") as f:
-            json.dump({"items": all_posts}, f, ensure_ascii=False, indent=2)
-        print(f"최종 저장된 게시물 개수: {len(all_posts)}개")
+            # 증분 수집: 최신 게시물부터 이미 본 게시물까지만 받고 저장된 목록과 병합
+            stored_items = state.get("items", [])
+            known_ids = {item.get("id") for item in stored_items}
+            fetched, fetched_cursor, reached_known = self._fetch_feed_pages(
+                username, user_id, max_count, headers, known_ids=known_ids
+            )
+            all_posts = merge_feed_items(stored_items, fetched)
+            next_max_id = state.get("next_max_id") if reached_known else fetched_cursor
+            print(f"[{username}] 증분 수집: 새로 받은 게시물 {len(fetched)}개, 병합 후 {len(all_posts)}개")
+            # 저장된 게시물이 부족하면 보관된 커서부터 더 오래된 페이지 이어받기
+            if len(all_posts) < max_count and next_max_id:
+                older, next_max_id, _ = self._fetch_feed_pages(
+                    username, user_id, max_count - len(all_posts), headers, next_max_id=next_max_id
+                )
+                all_posts = merge_feed_items(all_posts, older)
+        if self.feed_store is not None and all_posts:
+            self.feed_store.save(username, user_id, all_posts, next_max_id)
+
+        all_posts = all_posts[:max_count]
+        # 게시물은 ResultSink(posts.ndjson)에, 원본 피드 응답은 raw_archive에 저장되므로 계정별 JSON 파일은 쓰지 않음
+        print(f"최종 수집된 게시물 개수: {len(all_posts)}개")
         return all_posts
 
     def scrape_instagram_profile(self, username, user_dir=None):
         url = f"https://i.instagram.com/api/v1/users/web_profile_info/?username={username}"
         for attempt in range(3):
             try:
-                self.headers["User-Agent"] = self.USER_AGENTS.random
-                resp = requests.get(url, headers=self.headers)
+                resp = self.transport.get(url, account=self.username, headers=self._request_headers(), endpoint="profile")
                 if resp.status_code != 200:
                     print(f"[{username}] 프로필 수집 실패 (status: {resp.status_code})")
+                    self._mark_negative(username, negative_reason_for_status(resp.status_code), resp.status_code)
                     return None
-                # ★ 추가: 전체 API 응답을 username별로 저장
-                if user_dir is not None:
-                    with open(user_dir / f"ig_profile_{username}_raw.json", "w", encoding="utf-8") as f:
-                        json.dump(resp.json(), f, ensure_ascii=False, indent=2)
-                else:
-                    with open(self.OUTPUT_DIR / f"ig_profile_{username}_raw.json", "w", encoding="utf-8") as f:
-                        json.dump(resp.json(), f, ensure_ascii=False, indent=2)
-                data = resp.json().get('data', {}).get('user', {})
+                # 응답은 한 번만 파싱하고 원본 바이트는 압축 아카이브에 저장
+                payload = resp.json()
+                self.raw_archive.store("profile", username, resp.content)
+                data = ig_parsers.profile_user(payload)
 
                 if not data:
                     print(f"[{username}] 데이터 없음 (존재X/비공개/차단일 수 있음)")
+                    self._mark_negative(username, "empty", resp.status_code)
                     return None
 
-                profile_info = {
-                    'username': username,
-                    'full_name': data.get('full_name', ''),
-                    'bio': data.get('biography', ''),
-                    'is_verified': data.get('is_verified', False),
-                    'is_private': data.get('is_private', False),
-                    'followers': data.get('edge_followed_by', {}).get('count', 0),
-                    'following': data.get('edge_follow', {}).get('count', 0),
-                    'posts': data.get('edge_owner_to_timeline_media', {}).get('count', 0),
-                    'profile_pic_url': data.get('profile_pic_url_hd', ''),
-                    'category': data.get('category_name', ''),
-                }
+                profile_info = ig_parsers.parse_profile_info(username, data)
+                if profile_info['is_private']:
+                    self._mark_negative(username, "private", resp.status_code)
                 user_id = data.get('id', None)
-                recent_posts = data.get('edge_owner_to_timeline_media', {}).get('edges', [])
-                print(f"[DEBUG] {username} recent_posts 개수: {len(recent_posts)}")
+                print(f"[DEBUG] {username} recent_posts 개수: {len(ig_parsers.timeline_edges(data))}")
 
                 # recent_posts가 없을 경우 REST API(i.instagram.com)로 self.max_user_posts개 수집
-                if (not recent_posts) and user_id and (not profile_info['is_private']):
+                feed_items = None
+                if ig_parsers.needs_feed_fetch(profile_info, data):
                     print(f"[{username}] REST API로 최근 게시물 fetch 시도 (최대 {self.max_user_posts}개, i.instagram.com 방식)")
-                    recent_posts_raw = self.fetch_recent_posts_rest_api(
-                        username, user_id, max_count=self.max_user_posts, headers=self.headers, user_dir=user_dir
+                    feed_items = self.fetch_recent_posts_rest_api(
+                        username, user_id, max_count=self.max_user_posts, user_dir=user_dir
                     )
-                    print(f"[DEBUG] {username} REST API recent_posts 개수: {len(recent_posts_raw)}")
-                    # 필요 시 가공
-                    parsed_posts = []
-                    for post in recent_posts_raw:
-                        caption_text = post.get('caption', {}).get('text', '') if post.get('caption') else ''
-                        
-                        # 해시태그 추출
-                        hashtags = []
-                        if caption_text:
-                            import re
-                            hashtags = re.findall(r'#(\w+)', caption_text)
-                        
-                        # 음악 정보 추출 (릴스의 경우)
-                        music_info = None
-                        is_reel = post.get('media_type') == 2 or post.get('product_type') == 'clips'
-                        
-                        if is_reel:
-                            # clips_metadata에서 음악 정보 추출
-                            clips_metadata = post.get('clips_metadata', {})
-                            music_info_data = clips_metadata.get('music_info')
-                            
-                            if music_info_data:
-                                music_asset_info = music_info_data.get('music_asset_info', {})
-                                music_info = {
-                                    'song_name': music_asset_info.get('title', ''),
-                                    'artist_name': music_asset_info.get('display_artist', ''),
-                                    'should_mute_audio': music_asset_info.get('is_explicit', False)
-                                }
-                            
-                            # 대체 경로: audio 정보
-                            if not music_info and post.get('audio'):
-                                audio_info = post.get('audio', {})
-                                music_info = {
-                                    'song_name': audio_info.get('audio_asset_id', ''),
-                                    'artist_name': audio_info.get('artist_name', ''),
-                                    'should_mute_audio': False
-                                }
-                        
-                        parsed = {
-                            'id': post.get('id'),
-                            'shortcode': post.get('code', ''),
-                            'is_reel': is_reel,
-                            'post_type': 'reel' if is_reel else 'post',
-                            'media_type': post.get('media_type', ''),
-                            'caption': caption_text,
-                            'hashtags': hashtags,
-                            'music': music_info,
-                            'like_count': post.get('like_count', 0),
-                            'comment_count': post.get('comment_count', 0),
-                            'view_count': post.get('view_count', None) or post.get('play_count', None),
-                            'thumbnail_url': post.get('image_versions2', {}).get('candidates', [{}])[0].get('url', ''),
-                            'media_url': post.get('image_versions2', {}).get('candidates', [{}])[0].get('url', ''),
-                            'video_url': post.get('video_versions', [{}])[0].get('url', None) if post.get('video_versions') else None,
-                            'taken_at_timestamp': post.get('taken_at', None)
-                        }
-                        parsed_posts.append(parsed)
-                    recent_posts = parsed_posts
-                else:
-                    # recent_posts가 API에서 바로 넘어온 경우, parse_post_node로 변환 필요
-                    if recent_posts:
-                        parsed_posts = []
-                        for post in recent_posts:
-                            node = post.get('node', {})
-                            parsed = self.parse_post_node(node)
-                            parsed_posts.append(parsed)
-                        recent_posts = parsed_posts
-
-                if recent_posts and profile_info['followers'] > 0:
-                    total_likes = sum(post.get('like_count', 0) for post in recent_posts)
-                    total_comments = sum(post.get('comment_count', 0) for post in recent_posts)
-                    count_posts = len(recent_posts)
-                    avg_engagement = (total_likes + total_comments) / count_posts if count_posts > 0 else 0
-                    engagement_rate = (avg_engagement / profile_info['followers']) * 100 if profile_info['followers'] > 0 else 0.0
-                    profile_info['engagement_rate'] = round(engagement_rate, 2)
-                else:
-                    profile_info['engagement_rate'] = 0.0 if profile_info['followers'] > 0 else None
-
-                profile_info['ai_grade'], profile_info['ai_score'] = self.get_ai_grade(
-                    profile_info.get('followers', 0), profile_info.get('engagement_rate', 0.0)
-                )
-                # 3. recent_posts_raw는 parse 결과로 저장
-                profile_info['recent_posts_raw'] = recent_posts
-                return profile_info
-            except (requests.exceptions.RequestException, json.JSONDecodeError) as e:
+                    print(f"[DEBUG] {username} REST API recent_posts 개수: {len(feed_items)}")
+                return ig_parsers.build_profile(username, payload, feed_items)
+            except TRANSPORT_ERRORS + (json.JSONDecodeError,) as e:
                 print(f"[{username}] 요청 또는 JSON 파싱 실패: {e} (재시도 {attempt+1}/3)")
                 time.sleep(random.uniform(2,5))
             except Exception as e:
@@ -368,91 +410,313 @@ class InstagramCrawler:
                 time.sleep(random.uniform(2,5))
         return None
 
+    def _mark_negative(self, username, reason, status_code=None):
+        if self.negative_cache is not None and reason:
+            self.negative_cache.add(username, reason, status_code)
+
+    def get_profile(self, username, user_dir=None):
+        """네거티브 캐시 -> 프로필 캐시 순으로 확인하고 없을 때만 scrape_instagram_profile 호출"""
+        if self.negative_cache is not None:
+            entry = self.negative_cache.check(username)
+            if entry:
+                print(f"[{username}] 네거티브 캐시 적중 ({entry['reason']}) - 수집 건너뜀")
+                return None
+        if self.profile_cache is None:
+            return self.scrape_instagram_profile(username, user_dir=user_dir)
+        return self.profile_cache.get_or_fetch(
+            username,
+            lambda: self.scrape_instagram_profile(username, user_dir=user_dir),
+            max_posts=self.max_user_posts,
+        )
+
+    def for_country(self, country):
+        """country만 다른 같은 크롤러 (쿠키 / 전송 계층 / 캐시 / 결과 저장소를 공유, post_listeners에는 이 country가 전달됨)"""
+        if country == self.country:
+            return self
+        view = copy.copy(self)
+        view.country = country
+        return view
+
+    def _notify_listeners(self, profile):
+        for listener in self.post_listeners:
+            try:
+                listener(profile, self)
+            except Exception as e:
+                # 리스너 오류가 크롤링을 중단시키지 않도록 기록만 함
+                print(f"[{profile.get('username')}] 게시물 리스너 오류: {e}")
+
     def get_ai_grade(self, followers, engagement_rate):
-        if followers is None:
-            followers = 0
-        if engagement_rate is None:
-            engagement_rate = 0.0
-        if followers >= 1000000 and engagement_rate >= 4:
-            return "S", 92
-        elif followers >= 100000 and engagement_rate >= 2:
-            return "A", 85
-        elif followers >= 10000 and engagement_rate >= 1:
-            return "B", 78
-        else:
-            return "C", 70
+        return ig_parsers.get_ai_grade(followers, engagement_rate)
 
-    def run(self):
+    def _create_run_dir(self):
         today_str = datetime.now().strftime("%Y-%m-%d_%H_%M")
         self.base_output_dir = self.OUTPUT_DIR / f"{today_str}_{self.category}"
         self.base_output_dir.mkdir(parents=True, exist_ok=True)
+        return self.base_output_dir
 
-        print(f"[INFO] 해시태그 #{self.category} 최신 게시물 {self.max_count}개 수집 중...")
-        posts = self.get_recent_posts_by_tag(self.category, max_count=self.max_count, output_dir=self.base_output_dir)
-        print(f"[INFO] 게시물 {len(posts)}개 수집")
+    def open_run(self, run_dir=None, compress=False, **options):
+        """실행 디렉토리, 저널, 결과 저장소 준비 후 (journal, state) 반환
 
-        usernames = self.extract_usernames_from_posts(posts)
-        print(f"[INFO] 유니크 계정 {len(usernames)}개 추출")
+        run_dir가 주어지고 저널이 있으면 그 실행을 이어서 진행하고, 없으면 새 실행 디렉토리를 만듭니다.
+        compress=True면 결과 NDJSON을 gzip 스트림으로 기록합니다. options는 새 실행의 저널 시작 기록에 함께 남깁니다 (예: batch).
+        """
+        if run_dir:
+            self.base_output_dir = Path(run_dir)
+            self.base_output_dir.mkdir(parents=True, exist_ok=True)
+        else:
+            self._create_run_dir()
+        journal = RunJournal(self.base_output_dir)
+        state = journal.replay()
+        if state["meta"] is None:
+            journal.record_start(self.category, self.max_count, self.max_user_posts, frontier=self.frontier, **options)
+            started_at = time.time()
+        else:
+            print(f"[INFO] 저널에서 재개: 완료 {len(state['completed'])}명 / 발견 {len(state['authors'])}명")
+            started_at = state["meta"]["ts"]
+        self.crawl_date = datetime.fromtimestamp(started_at).strftime("%Y-%m-%d")
+        self.sink = ResultSink(self.base_output_dir, compress=compress)
+        return journal, state
+
+    def get_profile_journaled(self, username, user_dir, journal):
+        """프로필 수집 후 결과 저장소에 즉시 기록하고 저널에 완료 표시"""
+        profile = self.get_profile(username, user_dir=user_dir)
+        if profile:
+            self.sink.write_profile(profile)
+            journal.record_profile(username)
+            self._notify_listeners(profile)
+        else:
+            journal.record_failed(username)
+        return profile
+
+    def run(self, resume_dir=None, compress=False):
+        journal, state = self.open_run(resume_dir, compress=compress)
+        done = len(state["completed"])
+        print(f"[INFO] 해시태그 #{self.category} 작성자 {self.max_count}명 수집 중...")
 
-        results = []
-        recent_posts_json = {}
-        for i, uname in enumerate(usernames, 1):
-            print(f"[{i}/{len(usernames)}] {uname} 프로필 크롤링 중...")
+        for uname in self.iter_run_authors(journal, state):
+            print(f"[{done + 1}/{self.max_count}] {uname} 프로필 크롤링 중...")
             user_dir = self.base_output_dir / uname
             user_dir.mkdir(exist_ok=True)
-            profile = self.scrape_instagram_profile(uname, user_dir=user_dir)
-            if profile:
-                results.append(profile)
-                recent_posts_json[uname] = profile.get('recent_posts_raw', [])
-            time.sleep(random.uniform(self.sleep_sec, self.sleep_sec + 2.5))
-
-        if results:
-            fname = f"insta_{self.category}_profiles.csv"
-            columns = [
-                'username', 'full_name', 'bio', 'is_verified', 'is_private',
-                'followers', 'following', 'posts', 'profile_pic_url', 'category',
-                'engagement_rate', 'ai_grade', 'ai_score'
-            ]
-            df = pd.DataFrame(results)
-            for col in columns:
-                if col not in df.columns:
-                    df[col] = None
-            df = df[columns]
-            df.to_csv(self.base_output_dir / fname, index=False, encoding='utf-8-sig')
-            print(f"[INFO] {len(results)}개 계정 정보가 {(self.base_output_dir / fname)}에 저장되었습니다.")
-
-            recent_posts_fname = f"insta_{self.category}_recent_posts_full.json"
-            with open(self.base_output_dir / recent_posts_fname, "w", encoding="utf-8") as f:
-                json.dump(recent_posts_json, f, ensure_ascii=False, indent=2)
-            print(f"[INFO] 각 계정별 최근 게시물 원본 데이터가 {(self.base_output_dir / recent_posts_fname)}에 저장되었습니다.")
-        else:
+            if self.get_profile_journaled(uname, user_dir, journal):
+                done += 1
+
+        self.save_results()
+        journal.record_finish()
+
+    def save_results(self):
+        """결과 저장소를 닫고 NDJSON을 CSV / 게시물 JSON (+ parquet_dir가 있으면 Parquet)으로 변환"""
+        self.sink.close()
+        if not export_run(self.base_output_dir, self.category):
             print("수집된 프로필 데이터가 없습니다.")
+            return
+        if self.parquet_dir:
+            export_parquet(self.base_output_dir, self.category, self.parquet_dir, crawl_date=self.crawl_date)
+
+
+class AsyncInstagramCrawler:
+    """
+    InstagramCrawler 비동기 엔진
+    프로필(및 프로필별 피드 페이지) 수집을 최대 concurrency개까지 동시에 실행하고,
+    iter_tag_profiles로 해시태그 페이지 수집과 프로필 수집을 겹쳐 실행할 수 있습니다.
+    요청 헤더는 호출마다 사본을 만들기 때문에 하나의 InstagramCrawler를 여러 작업이 공유해도 안전합니다.
+    """
+
+    def __init__(self, crawler, concurrency=4):
+        self.crawler = crawler
+        self.concurrency = max(1, int(concurrency))
+        self._executor = ThreadPoolExecutor(max_workers=self.concurrency, thread_name_prefix="ig-crawl")
+
+    async def scrape_profile(self, username, user_dir=None, journal=None, crawler=None):
+        """프로필 1개 수집 - crawler가 주어지면 self.crawler 대신 사용 (예: for_country로 만든 국가별 크롤러)"""
+        loop = asyncio.get_running_loop()
+        crawler = crawler or self.crawler
+        try:
+            # 요청 간격은 전송 계층의 토큰 버킷 스케줄러가 조절
+            if journal is not None:
+                profile = await loop.run_in_executor(self._executor, crawler.get_profile_journaled, username, user_dir, journal)
+            else:
+                profile = await loop.run_in_executor(self._executor, crawler.get_profile, username, user_dir)
+        except Exception as e:
+            print(f"[{username}] 프로필 수집 오류: {e}")
+            profile = None
+        return username, profile
+
+    async def iter_profiles(self, usernames, base_dir=None):
+        """완료되는 순서대로 (username, profile)을 yield"""
+        loop = asyncio.get_running_loop()
+        tasks = []
+        for uname in usernames:
+            user_dir = None
+            if base_dir is not None:
+                user_dir = base_dir / uname
+                user_dir.mkdir(exist_ok=True)
+            tasks.append(loop.create_task(self.scrape_profile(uname, user_dir)))
+        try:
+            for fut in asyncio.as_completed(tasks):
+                yield await fut
+        finally:
+            for task in tasks:
+                task.cancel()
+
+    async def scrape_profiles(self, usernames, base_dir=None):
+        profiles = {}
+        async for uname, profile in self.iter_profiles(usernames, base_dir=base_dir):
+            profiles[uname] = profile
+        return [profiles[u] for u in usernames if profiles.get(u)]
+
+    async def iter_tag_profiles(self, tag, max_authors=50, base_dir=None, journal=None, state=None):
+        """
+        해시태그 작성자 수집(생산자)과 프로필 수집(소비자)을 겹쳐 실행
+        태그 페이지를 넘기는 동안 먼저 나온 작성자의 프로필 수집이 바로 시작되며,
+        완료되는 순서대로 (username, profile)을 yield 합니다.
+        journal이 주어지면 (crawler.open_run 이후) 결과 저장소에 기록된 완료 프로필을 먼저 yield 하고 남은 작업만 수집합니다.
+        """
+        if journal is not None:
+            state = state or journal.replay()
+            for profile in self.crawler.sink.iter_profiles(state["completed"]):
+                yield profile['username'], profile
+            authors_source = lambda: self.crawler.iter_journal_authors(tag, max_authors, journal, state)
+        else:
+            authors_source = lambda: self.crawler.iter_tag_authors(tag, max_authors=max_authors)
+        async for item in self.iter_source_profiles(authors_source, tag, base_dir, journal):
+            yield item
+
+    async def iter_run_profiles(self, journal, state=None, base_dir=None):
+        """crawler.open_run 이후 실행 설정(category / max_count / 프론티어 모드)대로 iter_tag_profiles처럼 수집"""
+        state = state or journal.replay()
+        for profile in self.crawler.sink.iter_profiles(state["completed"]):
+            yield profile['username'], profile
+        authors_source = lambda: self.crawler.iter_run_authors(journal, state)
+        async for item in self.iter_source_profiles(authors_source, self.crawler.category, base_dir, journal):
+            yield item
+
+    async def iter_source_profiles(self, authors_source, label, base_dir=None, journal=None, crawler_for=None):
+        """authors_source()가 (별도 스레드에서) 내놓는 작성자의 프로필을 동시에 수집해 완료 순서대로 yield
+
+        crawler_for가 주어지면 작성자마다 crawler_for(username)이 돌려주는 크롤러로 수집합니다.
+        """
+        loop = asyncio.get_running_loop()
+        authors = asyncio.Queue()
+        results = asyncio.Queue()
+        stop = threading.Event()
+        done_marker = object()
+
+        def produce():
+            try:
+                for uname in authors_source():
+                    if stop.is_set():
+                        break
+                    loop.call_soon_threadsafe(authors.put_nowait, uname)
+            finally:
+                for _ in range(self.concurrency):
+                    loop.call_soon_threadsafe(authors.put_nowait, None)
+
+        async def consume():
+            while True:
+                uname = await authors.get()
+                if uname is None:
+                    return
+                user_dir = None
+                if base_dir is not None:
+                    user_dir = base_dir / uname
+                    user_dir.mkdir(exist_ok=True)
+                crawler = crawler_for(uname) if crawler_for is not None else None
+                await results.put(await self.scrape_profile(uname, user_dir, journal, crawler))
+
+        async def finish():
+            try:
+                await producer
+            except Exception as e:
+                print(f"[{label}] 해시태그 작성자 수집 오류: {e}")
+            finally:
+                await asyncio.gather(*workers, return_exceptions=True)
+                await results.put(done_marker)
+
+        # 생산자는 기본 executor에서 실행해 프로필 작업자 스레드를 차지하지 않음
+        producer = loop.run_in_executor(None, produce)
+        workers = [loop.create_task(consume()) for _ in range(self.concurrency)]
+        finisher = loop.create_task(finish())
+        try:
+            while True:
+                item = await results.get()
+                if item is done_marker:
+                    break
+                yield item
+        finally:
+            stop.set()
+            for worker in workers:
+                worker.cancel()
+            finisher.cancel()
+
+    async def run(self, resume_dir=None, compress=False):
+        journal, state = self.crawler.open_run(resume_dir, compress=compress)
+        base_dir = self.crawler.base_output_dir
+        print(f"[INFO] 해시태그 #{self.crawler.category} 작성자 수집과 프로필 크롤링을 동시에 진행합니다 (최대 {self.crawler.max_count}명)")
+
+        done = 0
+        async for uname, profile in self.iter_run_profiles(journal, state, base_dir=base_dir):
+            done += 1
+            print(f"[{done}] {uname} 프로필 크롤링 완료")
+
+        self.crawler.save_results()
+        journal.record_finish()
+
+    def close(self):
+        self._executor.shutdown(wait=False)
 
 
 if __name__ == "__main__":
     parser = argparse.ArgumentParser()
     parser.add_argument("--output-dir", type=str, default="results", help="저장할 디렉토리 (기본값: results)")
     parser.add_argument("--max-user-posts", type=int, default=100, help="계정별 최대 게시물 수 (기본값: 100)")
+    parser.add_argument("--concurrency", type=int, default=1, help="동시에 수집할 프로필 수 (기본값: 1, 2 이상이면 비동기 엔진 사용)")
+    parser.add_argument("--resume", type=str, default=None, help="중단된 실행 디렉토리 경로 (저널을 읽어 남은 작업만 이어서 수집)")
+    parser.add_argument("--gzip", action="store_true", help="결과 NDJSON을 gzip으로 압축해 기록")
+    parser.add_argument("--parquet-dir", type=str, default=None, help="Parquet 데이터셋 루트 (기본값: <output-dir>/datasets)")
+    parser.add_argument("--no-raw-archive", action="store_true", help="원본 API 응답 아카이브 저장 끄기")
+    parser.add_argument("--frontier", action="store_true", help="프론티어 모드 - 입력한 해시태그(쉼표로 여러 개)에서 캡션의 인접 해시태그로 확장하며 수집")
+    parser.add_argument("--max-tag-requests", type=int, default=FRONTIER_DEFAULTS["max_requests"], help=f"프론티어 모드 해시태그 페이지 요청 예산 (기본값: {FRONTIER_DEFAULTS['max_requests']})")
+    parser.add_argument("--pages-per-tag", type=int, default=FRONTIER_DEFAULTS["pages_per_tag"], help=f"프론티어 모드 태그당 최대 페이지 수 (기본값: {FRONTIER_DEFAULTS['pages_per_tag']})")
+    parser.add_argument("--max-depth", type=int, default=FRONTIER_DEFAULTS["max_depth"], help=f"프론티어 모드 시드에서 최대 확장 단계 (기본값: {FRONTIER_DEFAULTS['max_depth']})")
     args, unknown = parser.parse_known_args()
     output_dir = args.output_dir
     max_user_posts = args.max_user_posts
+    parquet_dir = args.parquet_dir or str(Path(output_dir) / "datasets")
+    raw_archive = RawArchive(enabled=False) if args.no_raw_archive else None
 
     print("인스타그램 인플루언서 카테고리(해시태그) 크롤러")
-    category = input("크롤링할 카테고리(해시태그, 예: fashion, 헬스, 여행 등)를 입력하세요: ").strip().replace("#", "")
-    if not category:
-        print("카테고리를 입력해주세요.")
-        exit(1)
-    try:
-        max_count = int(input("수집할 게시물(작성자) 최대 개수 (기본 50): ") or "50")
-    except:
-        max_count = 50
-    try:
-        sleep_sec = float(input("요청 간 딜레이(초, 기본 2.0): ") or "2.0")
-    except:
-        sleep_sec = 2.0
-    try:
-        max_user_posts = int(input("계정별 최대 게시물 수 (기본 100): ") or "100")
-    except:
-        max_user_posts = 100
-    crawler = InstagramCrawler(category, max_count=max_count, sleep_sec=sleep_sec, output_dir=output_dir, max_user_posts=max_user_posts)
-    crawler.run()
\ No newline at end of file
+    if args.resume:
+        meta = RunJournal(args.resume).replay()["meta"]
+        if meta is None:
+            print(f"[에러] {args.resume}에서 실행 저널을 찾을 수 없습니다.")
+            exit(1)
+        crawler = InstagramCrawler(meta["category"], max_count=meta["max_count"], output_dir=output_dir, max_user_posts=meta["max_user_posts"], parquet_dir=parquet_dir, raw_archive=raw_archive, frontier=meta.get("frontier"))
+    else:
+        category = input("크롤링할 카테고리(해시태그, 예: fashion, 헬스, 여행 등)를 입력하세요: ").strip().replace("#", "").replace(" ", "")
+        if not category:
+            print("카테고리를 입력해주세요.")
+            exit(1)
+        try:
+            max_count = int(input("수집할 게시물(작성자) 최대 개수 (기본 50): ") or "50")
+        except:
+            max_count = 50
+        try:
+            sleep_sec = float(input("초기 요청 간격(초, 기본 2.0 - 이후 자동 조절): ") or "2.0")
+        except:
+            sleep_sec = 2.0
+        try:
+            max_user_posts = int(input("계정별 최대 게시물 수 (기본 100): ") or "100")
+        except:
+            max_user_posts = 100
+        frontier = None
+        if args.frontier:
+            frontier = {"max_requests": args.max_tag_requests, "pages_per_tag": args.pages_per_tag, "max_depth": args.max_depth}
+        crawler = InstagramCrawler(category, max_count=max_count, sleep_sec=sleep_sec, output_dir=output_dir, max_user_posts=max_user_posts, parquet_dir=parquet_dir, raw_archive=raw_archive, frontier=frontier)
+    if args.concurrency > 1:
+        engine = AsyncInstagramCrawler(crawler, concurrency=args.concurrency)
+        try:
+            asyncio.run(engine.run(resume_dir=args.resume, compress=args.gzip))
+        finally:
+            engine.close()
+    else:
+        crawler.run(resume_dir=args.resume, compress=args.gzip)
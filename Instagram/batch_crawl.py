@@ -0,0 +1,275 @@
+"""
+여러 해시태그 일괄 크롤링 (요청 예산 / 작성자 큐 공유)
+(해시태그, 국가) 대상들의 태그 페이지를 동시에 넘기며 나온 작성자를 중복 없는 큐 하나로 합치고,
+프로필은 크롤러 하나(쿠키 / 전송 계층 / 캐시 공유)로 한 번씩만 수집합니다.
+작성자가 나온 모든 (해시태그, 국가)는 attribution에 모아 결과에 함께 남깁니다.
+
+- 태그 페이지 요청은 모든 대상이 max_tag_requests 하나를 나눠 씁니다.
+  여러 국가의 번역이 같은 해시태그(예: travel)는 한 번만 수집하고 그 국가들 모두의 출처로 기록합니다.
+- post_listeners(패턴 집계 / 트렌딩 등)에는 작성자를 처음 찾은 대상의 국가가 전달됩니다.
+- 실행 저널을 쓰므로 중단된 실행은 같은 실행 디렉토리로 다시 시작하면 완료한 프로필을 건너뛰고 태그부터 다시 훑습니다.
+  작성자별 출처도 저널(source 기록)에 남기므로 재개 전에 찾은 출처와 국가가 결과에 그대로 유지됩니다.
+
+사용법: python batch_crawl.py fitness gym --country kr --country us [--max-profiles 100] [--concurrency 4]
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import queue
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+from InstagramCrawler import InstagramCrawler, AsyncInstagramCrawler
+from result_sink import PROFILES_FILENAME, export_csv, find_ndjson
+from run_journal import RunJournal
+
+DEFAULT_MAX_AUTHORS_PER_TAG = 50
+DEFAULT_MAX_TAG_REQUESTS = 40
+DEFAULT_TAG_CONCURRENCY = 4
+ATTRIBUTION_FILENAME = "batch_attribution.json"
+
+
+class PageBudget:
+    """여러 태그 수집 스레드가 나눠 쓰는 페이지 요청 예산 (스레드 안전)"""
+
+    def __init__(self, limit):
+        self.limit = limit
+        self.used = 0
+        self._lock = threading.Lock()
+
+    def take(self):
+        """요청 1회분을 차감하고 True, 예산이 없으면 False"""
+        with self._lock:
+            if self.used >= self.limit:
+                return False
+            self.used += 1
+            return True
+
+
+class BatchCrawl:
+    """(해시태그, 국가) 대상 여러 개를 작성자 큐 하나로 합쳐 수집하는 실행 1회"""
+
+    def __init__(self, crawler, targets, max_authors_per_tag=DEFAULT_MAX_AUTHORS_PER_TAG, max_profiles=None,
+                 max_tag_requests=DEFAULT_MAX_TAG_REQUESTS, tag_concurrency=DEFAULT_TAG_CONCURRENCY):
+        self.crawler = crawler
+        # 저널 시작 기록의 max_count가 전체 프로필 상한이 되도록 맞춤 (0이면 제한 없음)
+        crawler.max_count = max_profiles or 0
+        # 순서 유지 중복 제거, 해시태그는 '#' 없이
+        self.targets = list(dict.fromkeys((tag.strip().lstrip('#'), country) for tag, country in targets if tag.strip()))
+        self.max_authors_per_tag = max_authors_per_tag
+        self.max_profiles = max_profiles
+        self.max_tag_requests = max_tag_requests
+        self.tag_concurrency = max(1, int(tag_concurrency))
+        self.budget = PageBudget(max_tag_requests)
+        # 해시태그 -> 그 태그를 쓰는 대상 국가들 (태그 페이지는 태그마다 한 번만 수집)
+        self._tag_countries = {}
+        for tag, country in self.targets:
+            self._tag_countries.setdefault(tag, []).append(country)
+        # username -> 작성자가 나온 [(해시태그, 국가)] (발견 순서)
+        self.attribution = {}
+        # username -> 처음 찾은 대상의 국가
+        self.origin = {}
+        self._views = {}
+        self._lock = threading.Lock()
+
+    def options(self):
+        """저널 시작 기록에 남기는 설정 (재개 시 from_options로 복원)"""
+        return {
+            "targets": [list(target) for target in self.targets],
+            "max_authors_per_tag": self.max_authors_per_tag,
+            "max_tag_requests": self.max_tag_requests,
+        }
+
+    @classmethod
+    def from_options(cls, crawler, options, max_profiles=None, tag_concurrency=DEFAULT_TAG_CONCURRENCY):
+        return cls(
+            crawler,
+            [tuple(target) for target in options["targets"]],
+            max_authors_per_tag=options["max_authors_per_tag"],
+            max_profiles=max_profiles,
+            max_tag_requests=options["max_tag_requests"],
+            tag_concurrency=tag_concurrency,
+        )
+
+    def crawler_for(self, username):
+        """작성자를 처음 찾은 대상의 국가로 설정된 크롤러"""
+        country = self.origin.get(username, self.crawler.country)
+        with self._lock:
+            view = self._views.get(country)
+            if view is None:
+                view = self._views[country] = self.crawler.for_country(country)
+            return view
+
+    def _fetch_tag(self, tag, found, stop):
+        """해시태그 하나의 페이지를 넘기며 (username, tag)를 found 큐에 넣음 (태그 안에서 중복 제거)"""
+        local = set()
+        try:
+            for medias, _ in self.crawler.iter_tag_pages(tag, budget=self.budget.take):
+                for post in medias:
+                    username = post.get('media', {}).get('user', {}).get('username')
+                    if not username or username in local:
+                        continue
+                    local.add(username)
+                    found.put((username, tag))
+                    if len(local) >= self.max_authors_per_tag:
+                        return
+                if stop.is_set():
+                    return
+        except Exception as e:
+            print(f"[{tag}] 해시태그 작성자 수집 오류: {e}")
+        finally:
+            found.put(None)
+
+    def restore_sources(self, sources):
+        """저널 replay의 sources(username -> [(해시태그, 국가)])로 출처와 처음 찾은 국가 복원"""
+        with self._lock:
+            for username, targets in sources.items():
+                self.attribution.setdefault(username, []).extend(targets)
+                if targets:
+                    self.origin.setdefault(username, targets[0][1])
+
+    def iter_authors(self, seen=None, max_profiles=None, journal=None):
+        """모든 대상 태그를 동시에 수집하며 처음 보는 작성자를 최대 max_profiles명까지 즉시 yield
+
+        seen은 이미 수집한 작성자이며 이들은 다시 yield 하지 않고 출처만 기록합니다.
+        journal이 주어지면 새로 나온 출처를 source 기록으로 남깁니다.
+        """
+        seen = set() if seen is None else seen
+        found = queue.Queue()
+        stop = threading.Event()
+        pool = ThreadPoolExecutor(max_workers=self.tag_concurrency, thread_name_prefix="ig-batch-tag")
+        for tag in self._tag_countries:
+            pool.submit(self._fetch_tag, tag, found, stop)
+        remaining = len(self._tag_countries)
+        yielded = 0
+        try:
+            while remaining:
+                item = found.get()
+                if item is None:
+                    remaining -= 1
+                    continue
+                username, tag = item
+                countries = self._tag_countries[tag]
+                with self._lock:
+                    known = self.attribution.setdefault(username, [])
+                    new = [(tag, country) for country in countries if (tag, country) not in known]
+                    known.extend(new)
+                    self.origin.setdefault(username, countries[0])
+                if new and journal is not None:
+                    journal.record_source(username, new)
+                if username in seen:
+                    continue
+                seen.add(username)
+                yielded += 1
+                yield username
+                if max_profiles and yielded >= max_profiles:
+                    return
+        finally:
+            stop.set()
+            pool.shutdown(wait=False, cancel_futures=True)
+
+    async def iter_profiles(self, engine, journal, state=None, base_dir=None):
+        """crawler.open_run 이후 (username, profile)을 완료 순서대로 yield (재개 시 완료한 프로필 먼저)"""
+        state = state or journal.replay()
+        self.restore_sources(state["sources"])
+        for profile in self.crawler.sink.iter_profiles(state["completed"]):
+            yield profile['username'], profile
+        seen = set(state["completed"])
+        remaining = None
+        if self.max_profiles:
+            remaining = self.max_profiles - len(seen)
+            if remaining <= 0:
+                return
+        label = ",".join(f"{tag}/{country}" for tag, country in self.targets)
+        async for item in engine.iter_source_profiles(
+            lambda: self.iter_authors(seen=seen, max_profiles=remaining, journal=journal), label, base_dir, journal,
+            crawler_for=self.crawler_for,
+        ):
+            yield item
+
+    def sources(self, username):
+        """작성자가 나온 대상 [{'hashtag', 'country'}] (중복 제거, 발견 순서)"""
+        with self._lock:
+            targets = list(dict.fromkeys(self.attribution.get(username, ())))
+        return [{'hashtag': tag, 'country': country} for tag, country in targets]
+
+    def save_results(self):
+        """통합 결과 파일 + 대상별 CSV(insta_{hashtag}_{country}_profiles.csv) + 작성자별 출처 JSON 기록"""
+        self.crawler.save_results()
+        run_dir = self.crawler.base_output_dir
+        profiles_path = find_ndjson(run_dir, PROFILES_FILENAME)
+        if profiles_path is None:
+            return
+        usernames = {row['username'] for row in self.crawler.sink.iter_profiles()}
+        by_target = {target: set() for target in self.targets}
+        with self._lock:
+            attribution = {username: list(dict.fromkeys(self.attribution.get(username, ()))) for username in usernames}
+        for username, targets in attribution.items():
+            for target in targets:
+                by_target.setdefault(target, set()).add(username)
+        for (tag, country), members in by_target.items():
+            export_csv(profiles_path, run_dir / f"insta_{tag}_{country or 'all'}_profiles.csv", usernames=members)
+        path = run_dir / ATTRIBUTION_FILENAME
+        tmp_path = path.with_suffix(".tmp")
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(
+                {username: [{'hashtag': tag, 'country': country} for tag, country in targets]
+                 for username, targets in attribution.items()},
+                f, ensure_ascii=False, indent=2,
+            )
+        os.replace(tmp_path, path)
+        print(f"[INFO] 작성자별 출처 해시태그가 {path}에 저장되었습니다.")
+
+    async def run(self, concurrency=4, resume_dir=None, compress=False):
+        journal, state = self.crawler.open_run(resume_dir, compress=compress, batch=self.options())
+        engine = AsyncInstagramCrawler(self.crawler, concurrency=concurrency)
+        print(f"[INFO] 해시태그 {len(self.targets)}개 일괄 수집 (태그 페이지 요청 예산 {self.max_tag_requests}회)")
+        done = 0
+        try:
+            async for uname, profile in self.iter_profiles(engine, journal, state, base_dir=self.crawler.base_output_dir):
+                done += 1
+                tags = " ".join(f"#{source['hashtag']}" for source in self.sources(uname))
+                print(f"[{done}] {uname} 프로필 크롤링 완료 ({tags})")
+        finally:
+            engine.close()
+        self.save_results()
+        journal.record_finish()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("hashtags", nargs="*", help="수집할 해시태그들")
+    parser.add_argument("--country", action="append", default=None, help="대상 국가 코드 (여러 번 지정 가능, 해시태그 x 국가 조합을 수집)")
+    parser.add_argument("--max-authors-per-tag", type=int, default=DEFAULT_MAX_AUTHORS_PER_TAG, help=f"대상별 최대 작성자 수 (기본값: {DEFAULT_MAX_AUTHORS_PER_TAG})")
+    parser.add_argument("--max-profiles", type=int, default=None, help="전체 최대 프로필 수 (기본값: 제한 없음)")
+    parser.add_argument("--max-tag-requests", type=int, default=DEFAULT_MAX_TAG_REQUESTS, help=f"모든 대상이 나눠 쓰는 태그 페이지 요청 예산 (기본값: {DEFAULT_MAX_TAG_REQUESTS})")
+    parser.add_argument("--max-user-posts", type=int, default=100, help="계정별 최대 게시물 수 (기본값: 100)")
+    parser.add_argument("--concurrency", type=int, default=4, help="동시에 수집할 프로필 수 (기본값: 4)")
+    parser.add_argument("--output-dir", type=str, default="results", help="저장할 디렉토리 (기본값: results)")
+    parser.add_argument("--resume", type=str, default=None, help="중단된 일괄 실행 디렉토리 경로")
+    parser.add_argument("--gzip", action="store_true", help="결과 NDJSON을 gzip으로 압축해 기록")
+    args = parser.parse_args()
+
+    if args.resume:
+        meta = RunJournal(args.resume).replay()["meta"]
+        if meta is None or "batch" not in meta:
+            print(f"[에러] {args.resume}에서 일괄 실행 저널을 찾을 수 없습니다.")
+            exit(1)
+        crawler = InstagramCrawler(meta["category"], max_count=meta["max_count"] or 0, output_dir=args.output_dir, max_user_posts=meta["max_user_posts"])
+        batch = BatchCrawl.from_options(crawler, meta["batch"], max_profiles=meta["max_count"])
+    else:
+        if not args.hashtags:
+            parser.error("해시태그를 하나 이상 입력해주세요.")
+        countries = args.country or [None]
+        targets = [(tag, country) for tag in args.hashtags for country in countries]
+        crawler = InstagramCrawler("batch", max_count=args.max_profiles or 0, output_dir=args.output_dir, max_user_posts=args.max_user_posts)
+        batch = BatchCrawl(
+            crawler, targets,
+            max_authors_per_tag=args.max_authors_per_tag,
+            max_profiles=args.max_profiles,
+            max_tag_requests=args.max_tag_requests,
+        )
+    asyncio.run(batch.run(concurrency=args.concurrency, resume_dir=args.resume and Path(args.resume), compress=args.gzip))
@@ -0,0 +1,85 @@
+"""
+전송 계층 벤치마크 - 크롤링 1회당 핸드셰이크(새 커넥션) 수 비교
+로컬 keep-alive HTTP 서버에 크롤링과 같은 요청 패턴(태그 1회 + 프로필당 프로필 1회 + 피드 N페이지)을 보내고
+서버 측에서 수락한 TCP 커넥션 수를 셉니다. HTTPS에서는 커넥션마다 TLS 핸드셰이크가 한 번 더 발생합니다.
+
+사용법: python bench_transport.py --profiles 50 --feed-pages 3
+"""
+
+import argparse
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import requests
+
+from ig_transport import TransportPool
+
+
+class _CountingHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    disable_nagle_algorithm = True
+    connections = 0
+    lock = threading.Lock()
+
+    def setup(self):
+        super().setup()
+        with _CountingHandler.lock:
+            _CountingHandler.connections += 1
+
+    def do_GET(self):
+        body = json.dumps({"status": "ok"}).encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+def _crawl_urls(base_url, profiles, feed_pages):
+    urls = [f"{base_url}/api/v1/tags/web_info/?tag_name=bench"]
+    for i in range(profiles):
+        urls.append(f"{base_url}/api/v1/users/web_profile_info/?username=user{i}")
+        for page in range(feed_pages):
+            urls.append(f"{base_url}/api/v1/feed/user/{i}/?count=12&max_id={page}")
+    return urls
+
+
+def _measure(fetch, urls):
+    _CountingHandler.connections = 0
+    started = time.perf_counter()
+    for url in urls:
+        fetch(url).content
+    elapsed = time.perf_counter() - started
+    return _CountingHandler.connections, elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--profiles", type=int, default=50, help="크롤링 1회당 프로필 수 (기본값: 50)")
+    parser.add_argument("--feed-pages", type=int, default=3, help="프로필당 피드 페이지 수 (기본값: 3)")
+    args = parser.parse_args()
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), _CountingHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    base_url = f"http://127.0.0.1:{server.server_address[1]}"
+    urls = _crawl_urls(base_url, args.profiles, args.feed_pages)
+
+    before, before_sec = _measure(lambda url: requests.get(url, timeout=10), urls)
+    # 로컬 서버는 평문 HTTP/1.1이므로 requests 세션 풀로 측정
+    pool = TransportPool(http2=False)
+    after, after_sec = _measure(lambda url: pool.get(url, account="bench"), urls)
+    pool.close()
+    server.shutdown()
+
+    print(f"요청 수: {len(urls)} (프로필 {args.profiles}개, 프로필당 피드 {args.feed_pages}페이지)")
+    print(f"before (requests.get): 핸드셰이크 {before}회, {before_sec:.2f}초")
+    print(f"after  (TransportPool): 핸드셰이크 {after}회, {after_sec:.2f}초")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,220 @@
+"""
+캡션 특징 추출 (한 번 스캔)
+해시태그 / 멘션 / 이모지 / 질문은 미리 컴파일한 정규식 하나로, 카테고리 / 트리거 / 훅 / CTA / 트렌드 / 파워 태그
+키워드는 Aho-Corasick 오토마톤(keyword_matcher) 하나로 캡션을 한 번씩만 훑어 CaptionFeatures로 돌려줍니다.
+PostRecord는 결과를 레코드에 캐시하므로 여러 분석 함수가 같은 게시물의 캡션을 다시 스캔하지 않습니다.
+
+CTA / 공감 / 카테고리 키워드는 이 모듈이 소유합니다. 바이럴 트리거 / 훅 / 트렌드 / 파워 태그 어휘는 지식 베이스
+(dashboard/api/viral_knowledge.json)에 있고, 지식 베이스가 버전마다 그 어휘로 CaptionExtractor를 만들어 features_for에 넘깁니다.
+"""
+
+import re
+from bisect import bisect_right
+
+from keyword_matcher import get_matcher
+from records import PostRecord
+
+# 크롤러 / 정규화와 같은 해시태그 규칙
+HASHTAG_RE = re.compile(r'#(\w+)')
+
+CTA_WORDS = ['댓글', '공유', '태그', '팔로우']
+EMPATHY_WORDS = ['공감', '같이', '함께', '여러분']
+
+# 카테고리 식별 키워드 (캡션 포함 여부 + 해시태그별 포함 여부로 점수 계산)
+CATEGORY_KEYWORDS = {
+    "먹방": ["맛집", "먹방", "음식", "요리", "푸드", "맛있", "배고"],
+    "여행": ["여행", "travel", "여행", "풍경", "관광", "trip"],
+    "패션": ["패션", "옷", "코디", "스타일", "fashion", "ootd"],
+    "뷰티": ["뷰티", "화장", "메이크업", "스킨케어", "코스메틱"],
+    "운동": ["운동", "헬스", "다이어트", "피트니스", "workout"]
+}
+
+# 이모지 분류 (변형 선택자 U+FE0F는 떼고 비교)
+EMOJI_CLASSES = {
+    "emotion": {'😍', '❤', '🔥', '😂', '🤣'},
+    "celebration": {'🎁', '🎉', '🎊'},
+}
+_EMOJI_PATTERN = "[\U0001F300-\U0001FAFF\u2600-\u27BF\u2300-\u23FF\u2B00-\u2BFF]\uFE0F?"
+
+
+class CaptionFeatures:
+    """캡션 1개의 특징
+
+    keywords는 캡션에 나온 어휘(소문자), tag_keywords는 해시태그별로 그 안에 나온 어휘입니다.
+    """
+    __slots__ = (
+        'length', 'hashtags', 'mentions', 'emoji_count', 'emoji_classes', 'has_question', 'keywords',
+        'tag_keywords', 'category_scores', 'extractor',
+    )
+
+    def __init__(self, length, hashtags, mentions, emoji_count, emoji_classes, has_question, keywords,
+                 tag_keywords, category_scores, extractor):
+        self.length = length
+        self.hashtags = hashtags
+        self.mentions = mentions
+        self.emoji_count = emoji_count
+        self.emoji_classes = emoji_classes
+        self.has_question = has_question
+        self.keywords = keywords
+        self.tag_keywords = tag_keywords
+        self.category_scores = category_scores
+        self.extractor = extractor
+
+    def has(self, word):
+        """어휘(키워드 목록)에 있는 단어가 캡션에 나왔는지 (대소문자 무시)"""
+        return word.lower() in self.keywords
+
+    def has_any(self, words):
+        return any(word.lower() in self.keywords for word in words)
+
+    def tags_matching(self, words):
+        """words 중 하나라도 포함한 해시태그 수"""
+        words = {word.lower() for word in words}
+        return sum(1 for found in self.tag_keywords if not found.isdisjoint(words))
+
+    def missing_from_tags(self, words):
+        """어느 해시태그에도 포함되지 않은 words (순서 유지)"""
+        used = frozenset().union(*self.tag_keywords)
+        return [word for word in words if word.lower() not in used]
+
+    @property
+    def has_emoji(self):
+        return self.emoji_count > 0
+
+    @property
+    def has_cta(self):
+        return self.has_any(CTA_WORDS)
+
+    @property
+    def hook_type(self):
+        """추출기의 훅 유형 중 순서대로 처음 맞는 유형 (훅 어휘가 없는 추출기면 None)"""
+        for hook_type, patterns in self.extractor.hook_patterns.items():
+            if self.has_any(patterns):
+                return hook_type
+        return None
+
+    @property
+    def category(self):
+        """점수가 가장 높은 카테고리 (동점이면 CATEGORY_KEYWORDS 순서상 앞의 것)"""
+        return max(self.category_scores, key=self.category_scores.get) if self.category_scores else "기타"
+
+    @property
+    def engagement_triggers(self):
+        triggers = []
+        if self.has_question:
+            triggers.append("질문")
+        if self.has_any(EMPATHY_WORDS):
+            triggers.append("공감 유도")
+        if self.emoji_classes.get("celebration"):
+            triggers.append("이벤트/혜택")
+        return triggers
+
+    def to_dict(self):
+        return {
+            'length': self.length,
+            'hashtags': self.hashtags,
+            'mentions': self.mentions,
+            'emoji_count': self.emoji_count,
+            'emoji_classes': self.emoji_classes,
+            'has_question': self.has_question,
+            'has_cta': self.has_cta,
+            'hook_type': self.hook_type,
+            'category': self.category,
+            'category_scores': self.category_scores,
+        }
+
+
+class CaptionExtractor:
+    """어휘를 오토마톤으로 미리 컴파일해 두고 캡션을 한 번 스캔하는 추출기"""
+
+    # 키워드 외 토큰 (해시태그 / 멘션은 폭 0 전방탐색이라 '#a#b' 같은 연속 태그도 모두 잡힘)
+    _TOKENS = re.compile(
+        r"(?=#(?P<tag>\w+))"
+        r"|(?=@(?P<mention>[\w.]*\w))"
+        rf"|(?P<emoji>{_EMOJI_PATTERN})"
+        r"|(?P<question>[?？])"
+    )
+
+    def __init__(self, vocabulary=(), category_keywords=CATEGORY_KEYWORDS, hook_patterns=None):
+        """vocabulary: 추가로 찾을 어휘, hook_patterns: 훅 유형 -> 표현 목록 (순서대로 처음 맞는 유형 사용)
+
+        CTA / 공감 / 카테고리 키워드와 훅 표현은 항상 어휘에 포함됩니다.
+        """
+        self.category_keywords = {cat: [word.lower() for word in words] for cat, words in category_keywords.items()}
+        self.hook_patterns = {hook: tuple(patterns) for hook, patterns in (hook_patterns or {}).items()}
+        words = {word.lower() for word in list(vocabulary) + CTA_WORDS + EMPATHY_WORDS}
+        words |= {w for ws in self.category_keywords.values() for w in ws}
+        words |= {word.lower() for patterns in self.hook_patterns.values() for word in patterns}
+        self.matcher = get_matcher(words)
+
+    def _scan(self, text):
+        hashtags, mentions, tag_starts, tag_ends = [], [], [], []
+        emoji_count = 0
+        emoji_classes = {}
+        has_question = False
+        for match in self._TOKENS.finditer(text):
+            kind = match.lastgroup
+            if kind == 'tag':
+                tag = match.group('tag')
+                hashtags.append(tag)
+                tag_starts.append(match.start() + 1)
+                tag_ends.append(match.start() + 1 + len(tag))
+            elif kind == 'mention':
+                mentions.append(match.group('mention'))
+            elif kind == 'emoji':
+                emoji_count += 1
+                char = match.group()[0]
+                for name, members in EMOJI_CLASSES.items():
+                    if char in members:
+                        emoji_classes[name] = emoji_classes.get(name, 0) + 1
+                        break
+                else:
+                    emoji_classes["other"] = emoji_classes.get("other", 0) + 1
+            else:
+                has_question = True
+        # 키워드는 오토마톤 한 번으로 모두 찾고, 해시태그 구간 안에 있으면 그 태그에도 기록
+        keywords = set()
+        tag_keywords = [set() for _ in hashtags]
+        for start, word in self.matcher.find(text):
+            keywords.add(word)
+            i = bisect_right(tag_starts, start) - 1
+            if i >= 0 and start + len(word) <= tag_ends[i]:
+                tag_keywords[i].add(word)
+        return keywords, hashtags, mentions, tag_keywords, emoji_count, emoji_classes, has_question
+
+    def extract(self, caption, hashtags=None):
+        """캡션 -> CaptionFeatures
+
+        hashtags를 따로 주면(API 요청처럼 캡션과 별도로 받은 경우) 해시태그별 키워드(tag_keywords)는 그 목록으로 계산합니다.
+        """
+        caption = caption or ''
+        keywords, caption_tags, mentions, tag_keywords, emoji_count, emoji_classes, has_question = self._scan(caption)
+        if hashtags is not None:
+            tag_keywords = [self.matcher.search(tag) for tag in hashtags]
+        category_scores = {}
+        for cat, words in self.category_keywords.items():
+            score = sum(1 for word in words if word in keywords)
+            score += sum(1 for found in tag_keywords for word in words if word in found)
+            category_scores[cat] = score
+        return CaptionFeatures(
+            len(caption), caption_tags, mentions, emoji_count, emoji_classes, has_question,
+            frozenset(keywords), tuple(frozenset(found) for found in tag_keywords), category_scores, self,
+        )
+
+
+# 기본 추출기 (CTA / 공감 / 카테고리만 - 크롤러 쪽 집계용, 바이럴 어휘는 지식 베이스의 추출기 사용)
+_default_extractor = CaptionExtractor()
+
+
+def extract_features(caption, hashtags=None):
+    return _default_extractor.extract(caption, hashtags)
+
+
+def features_for(post, hashtags=None, extractor=None):
+    """게시물의 캡션 특징 - PostRecord는 레코드에 캐시(같은 추출기일 때만 재사용), dict는 매번 추출"""
+    extractor = extractor or _default_extractor
+    if isinstance(post, PostRecord):
+        if post._features is None or post._features.extractor is not extractor:
+            post._features = extractor.extract(post.caption)
+        return post._features
+    return extractor.extract(post.get('caption', ''), hashtags)
@@ -0,0 +1,314 @@
+"""
+해시태그 동시 출현 그래프 (PMI 가중치)
+크롤러가 저장하는 게시물의 해시태그 쌍을 희소 행렬(tag -> {tag: 함께 나온 게시물 수})에 증분으로 더하고,
+주기적으로 태그별 이웃 목록(PMI 내림차순 상위 top_neighbors개)을 미리 계산한 스냅샷으로 만들어 둡니다.
+추천 조회(related)는 입력 해시태그들의 이웃 목록만 합산하므로 게시물을 다시 훑지 않고 수 ms 안에 끝납니다.
+
+- PMI(a, b) = log(c(a, b) * N / (c(a) * c(b))), N은 해시태그가 있는 게시물 수이며, 양수이고 함께 나온 횟수가
+  min_pair_count 이상인 쌍만 이웃으로 씁니다. lift는 exp(PMI)입니다.
+- 쌍 항목이 max_pairs를 넘으면 한 번만 함께 나온 쌍을 정리해 메모리를 제한합니다.
+- 같은 계정을 다시 수집해도 이미 센 게시물은 계정별 마지막 게시 시각으로 건너뜁니다.
+- 스냅샷은 백그라운드 스레드에서 다시 계산하고(행렬은 REBUILD_CHUNK개 태그씩 짧게 잠가 복사) 상태 파일에 함께 저장합니다.
+  조회는 계산을 기다리지 않고 마지막 스냅샷만 읽으며, 아직 스냅샷이 없으면 빈 결과를 돌려줍니다.
+
+벤치마크: python cooccurrence.py --bench [--count 200000]
+"""
+
+import argparse
+import heapq
+import json
+import math
+import os
+import random
+import threading
+import time
+from collections import OrderedDict
+from itertools import combinations
+from pathlib import Path
+
+DEFAULT_STATE_PATH = "cache/cooccurrence_state.json"
+DEFAULT_TOP_NEIGHBORS = 50
+DEFAULT_MIN_PAIR_COUNT = 3
+DEFAULT_REBUILD_INTERVAL = 60
+DEFAULT_MAX_PAIRS = 2000000
+# 게시물 하나에서 쌍을 만드는 최대 해시태그 수 (인스타그램 최대 30개)
+MAX_TAGS_PER_POST = 30
+MAX_TRACKED_ACCOUNTS = 100000
+# 스냅샷 계산 시 잠금 한 번에 복사하는 태그 수 (수집 스레드가 오래 기다리지 않도록)
+REBUILD_CHUNK = 512
+
+
+class CooccurrenceIndex:
+    """해시태그 동시 출현 행렬 + 미리 계산한 이웃 스냅샷 (스레드 안전)"""
+
+    def __init__(self, state_path=DEFAULT_STATE_PATH, top_neighbors=DEFAULT_TOP_NEIGHBORS,
+                 min_pair_count=DEFAULT_MIN_PAIR_COUNT, rebuild_interval=DEFAULT_REBUILD_INTERVAL,
+                 max_pairs=DEFAULT_MAX_PAIRS):
+        self.state_path = Path(state_path) if state_path else None
+        self.top_neighbors = top_neighbors
+        self.min_pair_count = min_pair_count
+        self.rebuild_interval = rebuild_interval
+        self.max_pairs = max_pairs
+        self._lock = threading.Lock()
+        # 스냅샷 계산은 한 번에 하나씩 (_rebuilding: 백그라운드 계산이 예약/진행 중)
+        self._rebuild_lock = threading.Lock()
+        self._rebuilding = False
+        self.posts = 0
+        self._tag_counts = {}
+        self._pairs = {}
+        self._pair_entries = 0
+        self._watermarks = OrderedDict()
+        self._dirty = False
+        self._rebuilt_at = time.monotonic()
+        # tag -> ((이웃, pmi, 함께 나온 수), ...) PMI 내림차순 - 통째로 교체되는 읽기 전용 dict
+        self._snapshot = {}
+        self._load_state()
+
+    def _load_state(self):
+        if self.state_path is None or not self.state_path.exists():
+            return
+        try:
+            with open(self.state_path, "r", encoding="utf-8") as f:
+                state = json.load(f)
+        except (OSError, json.JSONDecodeError):
+            return
+        self.posts = state.get("posts", 0)
+        self._tag_counts = state.get("tags", {})
+        # 파일에는 한 방향(a < b)만 저장
+        for a, neighbors in state.get("pairs", {}).items():
+            for b, count in neighbors.items():
+                self._pairs.setdefault(a, {})[b] = count
+                self._pairs.setdefault(b, {})[a] = count
+                self._pair_entries += 1
+        self._watermarks = OrderedDict(state.get("watermarks", {}))
+        # 저장된 스냅샷이 있으면 그대로 쓰고, 없으면(이전 형식) 백그라운드에서 계산
+        snapshot = state.get("snapshot")
+        if snapshot is not None:
+            self._snapshot = {a: tuple(tuple(row) for row in rows) for a, rows in snapshot.items()}
+        elif self.posts:
+            self._dirty = True
+            self._rebuilding = True
+            self._start_rebuild()
+
+    def observe_posts(self, posts, username=None):
+        """게시물들의 해시태그 쌍을 더하고 더한 게시물 수 반환 (username이 있으면 그 계정에서 이미 센 게시물은 건너뜀)"""
+        rows = []
+        for post in posts:
+            tags = list(dict.fromkeys(tag.lower() for tag in post.get('hashtags') or []))[:MAX_TAGS_PER_POST]
+            rows.append((post.get('taken_at_timestamp') or 0, tags))
+        with self._lock:
+            watermark = self._watermarks.get(username, 0) if username else 0
+            counted = 0
+            newest = watermark
+            tag_counts, pairs = self._tag_counts, self._pairs
+            for taken_at, tags in rows:
+                if username and taken_at and taken_at <= watermark:
+                    continue
+                newest = max(newest, taken_at)
+                if not tags:
+                    continue
+                counted += 1
+                for tag in tags:
+                    tag_counts[tag] = tag_counts.get(tag, 0) + 1
+                for a, b in combinations(tags, 2):
+                    neighbors = pairs.get(a)
+                    if neighbors is None:
+                        neighbors = pairs[a] = {}
+                    if b in neighbors:
+                        neighbors[b] += 1
+                        pairs[b][a] += 1
+                    else:
+                        neighbors[b] = 1
+                        pairs.setdefault(b, {})[a] = 1
+                        self._pair_entries += 1
+            if username and newest > watermark:
+                self._watermarks[username] = newest
+                self._watermarks.move_to_end(username)
+                while len(self._watermarks) > MAX_TRACKED_ACCOUNTS:
+                    self._watermarks.popitem(last=False)
+            self.posts += counted
+            if self._pair_entries > self.max_pairs:
+                self._prune()
+            self._dirty = self._dirty or counted > 0
+            due = (self._dirty and not self._rebuilding
+                   and time.monotonic() - self._rebuilt_at >= self.rebuild_interval)
+            if due:
+                self._rebuilding = True
+        if due:
+            self._start_rebuild()
+        return counted
+
+    def _start_rebuild(self):
+        threading.Thread(target=self._rebuild_in_background, name="cooccurrence-rebuild", daemon=True).start()
+
+    def _rebuild_in_background(self):
+        try:
+            self.rebuild()
+        finally:
+            with self._lock:
+                self._rebuilding = False
+
+    def _prune(self):
+        """한 번만 함께 나온 쌍과 그 뒤 이웃이 없는 1회 태그 정리 (잠금 안에서 호출)"""
+        for a in list(self._pairs):
+            neighbors = self._pairs[a]
+            for b in [b for b, count in neighbors.items() if count <= 1]:
+                del neighbors[b]
+            if not neighbors:
+                del self._pairs[a]
+                if self._tag_counts.get(a, 0) <= 1:
+                    self._tag_counts.pop(a, None)
+        self._pair_entries = sum(len(neighbors) for neighbors in self._pairs.values()) // 2
+
+    def observe_profile(self, profile, country=None):
+        username = (profile.get('username') or '').lower() or None
+        return self.observe_posts(profile.get('recent_posts_raw') or [], username=username)
+
+    def on_profile(self, profile, crawler):
+        """InstagramCrawler post_listeners용 콜백"""
+        self.observe_profile(profile)
+
+    def rebuild(self):
+        """태그별 이웃 목록 스냅샷을 다시 계산해 교체
+
+        행렬 전체를 한 번에 복사하지 않고 REBUILD_CHUNK개 태그씩 잠금 안에서 복사한 뒤 잠금 밖에서 계산합니다.
+        복사하는 동안 더해진 게시물 때문에 쌍 수와 태그 수가 조금 어긋날 수 있지만 다음 계산에서 맞춰집니다.
+        """
+        with self._rebuild_lock:
+            with self._lock:
+                self._dirty = False
+                self._rebuilt_at = time.monotonic()
+                total = self.posts
+                tag_counts = dict(self._tag_counts)
+                tags = list(self._pairs)
+            snapshot = {}
+            if total:
+                log_total = math.log(total)
+                for start in range(0, len(tags), REBUILD_CHUNK):
+                    with self._lock:
+                        chunk = [(a, list(self._pairs.get(a, {}).items())) for a in tags[start:start + REBUILD_CHUNK]]
+                    for a, neighbors in chunk:
+                        if a not in tag_counts:
+                            continue
+                        log_a = math.log(tag_counts[a])
+                        scored = []
+                        for b, count in neighbors:
+                            # 복사 뒤 새로 생긴 태그는 다음 계산에서
+                            if count < self.min_pair_count or b not in tag_counts:
+                                continue
+                            pmi = math.log(count) + log_total - log_a - math.log(tag_counts[b])
+                            if pmi > 0:
+                                scored.append((b, pmi, count))
+                        if scored:
+                            snapshot[a] = tuple(heapq.nlargest(self.top_neighbors, scored, key=lambda row: (row[1], row[2])))
+            self._snapshot = snapshot
+            return len(snapshot)
+
+    def neighbors(self, tag, limit=10):
+        """한 해시태그의 PMI 상위 이웃 [{'tag', 'pmi', 'lift', 'count'}] (스냅샷이 아직 없으면 빈 목록)"""
+        rows = self._snapshot.get(tag.lower().lstrip('#'), ())[:limit]
+        return [{'tag': b, 'pmi': round(pmi, 3), 'lift': round(math.exp(pmi), 2), 'count': count} for b, pmi, count in rows]
+
+    def related(self, tags, limit=10, exclude=()):
+        """입력 해시태그들과 함께 많이 쓰이는 해시태그 [{'tag', 'score', 'support'}]
+
+        score는 입력 태그별 PMI의 합(여러 입력과 관련될수록 높음), support는 입력 태그들과 함께 나온 게시물 수의 합입니다.
+        입력 태그와 exclude는 결과에서 뺍니다. 조회 중에 스냅샷을 계산하지 않으므로 아직 스냅샷이 없으면 빈 목록입니다.
+        """
+        snapshot = self._snapshot
+        inputs = {tag.lower().lstrip('#') for tag in tags if tag}
+        skip = inputs | {tag.lower().lstrip('#') for tag in exclude}
+        scores = {}
+        support = {}
+        for tag in inputs:
+            for other, pmi, count in snapshot.get(tag, ()):
+                if other in skip:
+                    continue
+                scores[other] = scores.get(other, 0.0) + pmi
+                support[other] = support.get(other, 0) + count
+        ranked = heapq.nlargest(limit, scores, key=lambda other: (scores[other], support[other]))
+        return [{'tag': other, 'score': round(scores[other], 3), 'support': support[other]} for other in ranked]
+
+    def save(self):
+        """스냅샷을 갱신하고 행렬(한 방향) / 태그 수 / 계정별 게시 시각 / 스냅샷을 원자적으로 기록 (state_path가 None이면 스냅샷만)
+
+        재시작 직후 첫 조회가 스냅샷 계산을 기다리지 않도록 스냅샷도 함께 저장합니다.
+        """
+        if self._dirty:
+            self.rebuild()
+        if self.state_path is None:
+            return
+        snapshot = self._snapshot
+        with self._lock:
+            state = {
+                "posts": self.posts,
+                "tags": dict(self._tag_counts),
+                "pairs": {
+                    a: {b: count for b, count in neighbors.items() if a < b}
+                    for a, neighbors in self._pairs.items()
+                },
+                "watermarks": dict(self._watermarks),
+            }
+        state["snapshot"] = {a: [list(row) for row in rows] for a, rows in snapshot.items()}
+        self.state_path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = self.state_path.with_suffix(f".{threading.get_ident()}.tmp")
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(state, f, ensure_ascii=False)
+        os.replace(tmp_path, self.state_path)
+
+    def stats(self):
+        with self._lock:
+            return {
+                "posts": self.posts,
+                "tags": len(self._tag_counts),
+                "pairs": self._pair_entries,
+                "indexed_tags": len(self._snapshot),
+                "pending": self._dirty,
+            }
+
+
+_default_index = None
+_default_index_lock = threading.Lock()
+
+
+def get_cooccurrence_index():
+    """프로세스 전역 동시 출현 인덱스 (COOCCURRENCE_STATE_PATH 환경변수로 경로 지정)"""
+    global _default_index
+    with _default_index_lock:
+        if _default_index is None:
+            _default_index = CooccurrenceIndex(os.environ.get("COOCCURRENCE_STATE_PATH", DEFAULT_STATE_PATH))
+        return _default_index
+
+
+def bench(count=200000, vocabulary=20000, topics=200, repeat=1000):
+    """주제별 해시태그 묶음으로 만든 게시물 count개 -> (처리량 posts/sec, 스냅샷 계산 ms, related 조회 µs)"""
+    rng = random.Random(0)
+    topic_tags = [[f"t{rng.randrange(vocabulary)}" for _ in range(40)] for _ in range(topics)]
+    posts = []
+    for _ in range(count):
+        tags = rng.sample(rng.choice(topic_tags), rng.randint(3, 12)) + [f"t{rng.randrange(vocabulary)}" for _ in range(2)]
+        posts.append({'hashtags': tags})
+    index = CooccurrenceIndex(state_path=None, rebuild_interval=math.inf)
+    started = time.perf_counter()
+    for start in range(0, count, 100):
+        index.observe_posts(posts[start:start + 100])
+    rate = round(count / (time.perf_counter() - started))
+    started = time.perf_counter()
+    index.rebuild()
+    rebuild_ms = (time.perf_counter() - started) * 1000
+    queries = [rng.sample(rng.choice(topic_tags), 5) for _ in range(repeat)]
+    started = time.perf_counter()
+    for tags in queries:
+        index.related(tags, limit=10)
+    query_us = (time.perf_counter() - started) / repeat * 1e6
+    return rate, rebuild_ms, query_us
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--bench", action="store_true", help="처리량 / 스냅샷 계산 / 추천 조회 시간 측정")
+    parser.add_argument("--count", type=int, default=200000, help="벤치마크 게시물 수 (기본값: 200000)")
+    args = parser.parse_args()
+    if args.bench:
+        rate, rebuild_ms, query_us = bench(args.count)
+        print(f"ingest: {rate:,} posts/sec, rebuild: {rebuild_ms:.0f} ms, related(5 tags): {query_us:.0f} µs")
@@ -0,0 +1,159 @@
+"""
+게시물 참여 통계 (NumPy 벡터 연산)
+게시물 목록에서 좋아요 / 댓글 / 릴스 여부 / 게시 시각을 한 번만 배열로 뽑은 뒤
+평균 / 중앙값 / 백분위 / 참여율 / 타입별 평균 / 게시 간격 / 상위 k개를 배열 연산으로 계산합니다.
+ig_parsers.finalize_profile(참여율)과 대시보드 분석 API(/analyze/user, /analyze/viral-content)가 함께 사용합니다.
+
+벤치마크: python engagement_stats.py --bench
+"""
+
+import argparse
+import random
+import time
+
+import numpy as np
+
+DEFAULT_PERCENTILES = (25, 50, 75, 90)
+
+
+class EngagementStats:
+    """게시물 묶음의 참여 지표 배열 (게시물 순서 유지)
+
+    engagement = like_count + comment_count, 값이 없거나 None이면 0으로 취급합니다.
+    """
+
+    def __init__(self, posts):
+        self.posts = posts if isinstance(posts, list) else list(posts)
+        likes, comments, reels, timestamps = [], [], [], []
+        for post in self.posts:
+            likes.append(post.get('like_count') or 0)
+            comments.append(post.get('comment_count') or 0)
+            reels.append(bool(post.get('is_reel')))
+            timestamps.append(post.get('taken_at_timestamp') or 0)
+        self.likes = np.array(likes, dtype=np.int64)
+        self.comments = np.array(comments, dtype=np.int64)
+        self.engagement = self.likes + self.comments
+        self.is_reel = np.array(reels, dtype=bool)
+        self.timestamps = np.array(timestamps, dtype=np.int64)
+
+    def __len__(self):
+        return len(self.posts)
+
+    def mean(self):
+        return float(self.engagement.mean()) if len(self.engagement) else 0.0
+
+    def median(self):
+        return float(np.median(self.engagement)) if len(self.engagement) else 0.0
+
+    def percentiles(self, points=DEFAULT_PERCENTILES):
+        if not len(self.engagement):
+            return {p: 0.0 for p in points}
+        values = np.percentile(self.engagement, points)
+        return {p: float(v) for p, v in zip(points, values)}
+
+    def engagement_rate(self, followers):
+        """게시물당 평균 참여 / 팔로워 * 100 (게시물이 없거나 팔로워가 0이면 None)"""
+        if not len(self.engagement) or not followers:
+            return None
+        return self.mean() / followers * 100
+
+    def by_type(self):
+        """{'reel': {count, mean}, 'post': {count, mean}}"""
+        result = {}
+        for name, mask in (('reel', self.is_reel), ('post', ~self.is_reel)):
+            selected = self.engagement[mask]
+            result[name] = {'count': int(len(selected)), 'mean': float(selected.mean()) if len(selected) else 0}
+        return result
+
+    def intervals_days(self):
+        """게시 시각이 있는 게시물의 시간순 게시 간격 (일) 배열"""
+        timestamps = np.sort(self.timestamps[self.timestamps > 0])
+        return np.diff(timestamps) / 86400
+
+    def top_k_indices(self, k=5):
+        """참여가 높은 순서의 게시물 인덱스 k개 (동점이면 원래 순서 유지, sorted(..., reverse=True)와 동일)"""
+        n = len(self.engagement)
+        if k <= 0 or n == 0:
+            return []
+        if k >= n:
+            return np.argsort(-self.engagement, kind='stable').tolist()
+        # k번째 값보다 큰 것은 모두, 같은 것은 앞에서부터 남은 수만큼
+        threshold = np.partition(self.engagement, n - k)[n - k]
+        above = np.flatnonzero(self.engagement > threshold)
+        ties = np.flatnonzero(self.engagement == threshold)[:k - len(above)]
+        selected = np.concatenate([above, ties])
+        order = np.lexsort((selected, -self.engagement[selected]))
+        return selected[order].tolist()
+
+    def top_k(self, k=5):
+        return [self.posts[i] for i in self.top_k_indices(k)]
+
+    def above(self, threshold):
+        """참여가 threshold보다 큰 게시물 (원래 순서)"""
+        return [self.posts[i] for i in np.flatnonzero(self.engagement > threshold)]
+
+    def summary(self, followers=None, top_k=5, points=DEFAULT_PERCENTILES):
+        """한 번에 모든 지표 계산"""
+        intervals = self.intervals_days()
+        return {
+            'count': len(self),
+            'mean': self.mean(),
+            'median': self.median(),
+            'percentiles': self.percentiles(points),
+            'engagement_rate': self.engagement_rate(followers),
+            'by_type': self.by_type(),
+            'interval_days': {
+                'count': int(len(intervals)),
+                'mean': float(intervals.mean()) if len(intervals) else None,
+                'median': float(np.median(intervals)) if len(intervals) else None,
+            },
+            'top_k': self.top_k_indices(top_k),
+        }
+
+
+def _python_summary(posts, followers, top_k=5):
+    """벤치마크 기준: 기존 방식 (파이썬 sum / sorted)"""
+    engagement = [post.get('like_count', 0) + post.get('comment_count', 0) for post in posts]
+    ordered = sorted(engagement)
+    n = len(ordered)
+    reels = [e for e, post in zip(engagement, posts) if post.get('is_reel')]
+    others = [e for e, post in zip(engagement, posts) if not post.get('is_reel')]
+    timestamps = sorted(post['taken_at_timestamp'] for post in posts if post.get('taken_at_timestamp'))
+    intervals = [(b - a) / 86400 for a, b in zip(timestamps, timestamps[1:])]
+    return {
+        'mean': sum(engagement) / n,
+        'median': (ordered[(n - 1) // 2] + ordered[n // 2]) / 2,
+        'percentiles': {p: ordered[min(n - 1, int(n * p / 100))] for p in DEFAULT_PERCENTILES},
+        'engagement_rate': sum(engagement) / n / followers * 100,
+        'by_type': {'reel': sum(reels) / len(reels) if reels else 0, 'post': sum(others) / len(others) if others else 0},
+        'interval_mean': sum(intervals) / len(intervals) if intervals else None,
+        'top_k': sorted(posts, key=lambda x: x.get('like_count', 0) + x.get('comment_count', 0), reverse=True)[:top_k],
+    }
+
+
+def bench(sizes=(100, 1000, 10000, 100000), repeat=5):
+    """게시물 수별 (파이썬 방식, NumPy 방식) 1회 평균 시간 (ms)"""
+    rng = random.Random(0)
+    results = {}
+    for size in sizes:
+        posts = [{
+            'like_count': rng.randint(0, 100000), 'comment_count': rng.randint(0, 2000),
+            'is_reel': rng.random() < 0.4, 'taken_at_timestamp': 1700000000 + rng.randint(0, 86400 * 365),
+        } for _ in range(size)]
+        timings = []
+        for run in (lambda: _python_summary(posts, 50000), lambda: EngagementStats(posts).summary(followers=50000)):
+            started = time.perf_counter()
+            for _ in range(repeat):
+                run()
+            timings.append((time.perf_counter() - started) / repeat * 1000)
+        results[size] = tuple(timings)
+    return results
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--bench", action="store_true", help="게시물 수별 통계 계산 시간 비교")
+    args = parser.parse_args()
+    if args.bench:
+        for size, (python_ms, numpy_ms) in bench().items():
+            print(f"{size:>7,} posts: python {python_ms:9.2f} ms / numpy {numpy_ms:9.2f} ms ({python_ms / numpy_ms:.1f}x)")
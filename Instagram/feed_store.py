@@ -0,0 +1,84 @@
+"""
+계정별 피드 증분 수집 상태 저장소
+username마다 가장 최근에 본 게시물(id, taken_at), 저장된 REST 피드 아이템, 더 오래된 페이지용 커서(next_max_id)를 보관합니다.
+재수집 시에는 이미 본 게시물에 도달할 때까지만 페이지를 받아 기존 목록과 병합합니다.
+"""
+
+import json
+import os
+import threading
+import time
+from pathlib import Path
+
+DEFAULT_FEED_DIR = "cache/feeds"
+# 계정당 보관하는 최대 피드 아이템 수
+MAX_STORED_ITEMS = 500
+
+
+def is_pinned(item):
+    """고정 게시물 여부 (고정 게시물은 오래된 글이어도 피드 맨 앞에 옴)"""
+    return bool(item.get("timeline_pinned_user_ids"))
+
+
+def merge_feed_items(stored_items, fetched_items, limit=MAX_STORED_ITEMS):
+    """새로 받은 아이템을 기존 목록에 병합 (같은 id는 새 아이템으로 교체해 좋아요/댓글 수 갱신)"""
+    merged = {}
+    for item in stored_items:
+        merged[item.get("id")] = item
+    for item in fetched_items:
+        merged[item.get("id")] = item
+    items = sorted(merged.values(), key=lambda item: item.get("taken_at") or 0, reverse=True)
+    return items[:limit]
+
+
+class FeedStateStore:
+    """username -> 피드 상태 JSON 파일 저장소 (스레드 안전)"""
+
+    def __init__(self, state_dir=DEFAULT_FEED_DIR):
+        self.state_dir = Path(state_dir)
+        self.state_dir.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+
+    def _path(self, username):
+        return self.state_dir / f"{username.lower()}.json"
+
+    def load(self, username):
+        path = self._path(username)
+        if not path.exists():
+            return None
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                return json.load(f)
+        except (OSError, json.JSONDecodeError):
+            return None
+
+    def save(self, username, user_id, items, next_max_id=None):
+        newest = next((item for item in items if not is_pinned(item)), items[0] if items else {})
+        state = {
+            "user_id": user_id,
+            "newest_id": newest.get("id"),
+            "newest_taken_at": newest.get("taken_at"),
+            "next_max_id": next_max_id,
+            "items": items,
+            "updated_at": time.time(),
+        }
+        path = self._path(username)
+        tmp_path = path.with_suffix(f".{threading.get_ident()}.tmp")
+        with self._lock:
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump(state, f, ensure_ascii=False)
+            os.replace(tmp_path, path)
+        return state
+
+
+_default_store = None
+_default_store_lock = threading.Lock()
+
+
+def get_feed_store():
+    """프로세스 전역 공유 피드 저장소 (FEED_STATE_DIR 환경변수로 경로 지정)"""
+    global _default_store
+    with _default_store_lock:
+        if _default_store is None:
+            _default_store = FeedStateStore(os.environ.get("FEED_STATE_DIR", DEFAULT_FEED_DIR))
+        return _default_store
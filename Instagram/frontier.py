@@ -0,0 +1,119 @@
+"""
+해시태그 프론티어 (시드 해시태그에서 인접 해시태그로 확장)
+수집한 해시태그 페이지 게시물의 캡션에 함께 나온 해시태그를 후보로 모아 점수를 매기고,
+점수가 높은 순서로 다음에 수집할 해시태그를 꺼냅니다 (InstagramCrawler.iter_frontier_authors가 사용).
+
+- 점수: 후보 태그가 나온 게시물마다 depth_decay ** (그 게시물을 찾은 태그의 깊이)를 더함
+  -> 시드에 가까운 태그에서 여러 번 함께 나온 태그가 먼저 수집됩니다.
+- 서로 다른 게시물 min_support개 이상에서 나온 태그만, 시드에서 max_depth 단계까지만 후보가 됩니다.
+- '일상' / 'instagood' 같은 범용 태그(stop_tags)는 어느 분야에나 붙으므로 후보에서 뺍니다.
+- 힙은 점수가 바뀔 때마다 새 항목을 넣고 꺼낼 때 오래된 항목을 버리는 지연 갱신 방식입니다.
+"""
+
+import heapq
+
+# 분야와 관계없이 붙는 범용 해시태그 (프론티어 후보에서 제외)
+DEFAULT_STOP_TAGS = frozenset(
+    [
+        "일상", "데일리", "오늘", "주말", "좋아요", "팔로우", "소통", "이벤트", "선물", "공유", "댓글", "참여", "질문", "꿀팁",
+        "instagood", "instagram", "love", "photooftheday", "follow", "followme", "like4like", "l4l",
+        "f4f", "likeforlike", "followforfollow", "instadaily", "picoftheday", "reels", "reel", "explore",
+        "선팔", "맞팔", "좋반", "좋아요반사", "팔로우미", "소통해요", "일상스타그램", "데일리그램",
+    ]
+)
+DEFAULT_MAX_DEPTH = 2
+DEFAULT_MIN_SUPPORT = 2
+DEFAULT_DEPTH_DECAY = 0.5
+
+
+class HashtagFrontier:
+    """다음에 수집할 해시태그 우선순위 큐 (크롤러의 태그 수집 스레드 하나에서 사용)"""
+
+    def __init__(self, seeds, max_depth=DEFAULT_MAX_DEPTH, min_support=DEFAULT_MIN_SUPPORT,
+                 depth_decay=DEFAULT_DEPTH_DECAY, stop_tags=DEFAULT_STOP_TAGS):
+        self.max_depth = max_depth
+        self.min_support = min_support
+        self.depth_decay = depth_decay
+        self.stop_tags = stop_tags
+        self.seeds = list(dict.fromkeys(_normalize(tag) for tag in seeds if _normalize(tag)))
+        # 후보 태그 -> 점수 / 서로 다른 게시물 수 / 깊이(후보를 처음 찾은 태그의 깊이 + 1 중 최소)
+        self._scores = {}
+        self._support = {}
+        self._depth = {}
+        self._heap = []
+        self._seen_posts = set()
+        # 꺼낸 태그 -> {'depth', 'score', 'pages', 'posts', 'new_authors'} (꺼낸 순서)
+        self.visited = {}
+        # 시드는 점수와 관계없이 주어진 순서대로 먼저 수집
+        self._seed_queue = list(self.seeds)
+
+    def pop(self):
+        """다음 해시태그 (tag, depth) - 남은 후보가 없으면 None"""
+        while self._seed_queue:
+            tag = self._seed_queue.pop(0)
+            if tag not in self.visited:
+                self.visited[tag] = {'depth': 0, 'score': None, 'pages': 0, 'posts': 0, 'new_authors': 0}
+                return tag, 0
+        while self._heap:
+            neg_score, tag = heapq.heappop(self._heap)
+            # 이미 수집했거나 점수가 그 뒤 바뀐 항목은 버림
+            if tag in self.visited or -neg_score != self._scores.get(tag):
+                continue
+            depth = self._depth[tag]
+            self.visited[tag] = {'depth': depth, 'score': round(-neg_score, 3), 'pages': 0, 'posts': 0, 'new_authors': 0}
+            return tag, depth
+        return None
+
+    def observe(self, source_tag, depth, hashtags, post_id=None):
+        """source_tag(깊이 depth) 페이지에서 수집한 게시물 1개의 캡션 해시태그를 후보에 반영
+
+        post_id가 주어지면 여러 태그 페이지에 함께 나온 같은 게시물은 한 번만 셉니다.
+        """
+        visit = self.visited.get(source_tag)
+        if visit is not None:
+            visit['posts'] += 1
+        if post_id is not None:
+            if post_id in self._seen_posts:
+                return
+            self._seen_posts.add(post_id)
+        if depth + 1 > self.max_depth:
+            return
+        weight = self.depth_decay ** depth
+        for tag in {_normalize(tag) for tag in hashtags}:
+            if not tag or tag == source_tag or tag in self.visited or tag in self.stop_tags:
+                continue
+            score = self._scores.get(tag, 0.0) + weight
+            self._scores[tag] = score
+            self._support[tag] = self._support.get(tag, 0) + 1
+            self._depth[tag] = min(self._depth.get(tag, depth + 1), depth + 1)
+            if self._support[tag] >= self.min_support:
+                heapq.heappush(self._heap, (-score, tag))
+
+    def record_page(self, tag, new_authors):
+        visit = self.visited.get(tag)
+        if visit is not None:
+            visit['pages'] += 1
+            visit['new_authors'] += new_authors
+
+    def candidates(self, limit=10):
+        """아직 수집하지 않은 후보 상위 limit개 [{'tag', 'score', 'support', 'depth'}]"""
+        ranked = heapq.nlargest(
+            limit,
+            (tag for tag, support in self._support.items() if support >= self.min_support and tag not in self.visited),
+            key=self._scores.get,
+        )
+        return [
+            {'tag': tag, 'score': round(self._scores[tag], 3), 'support': self._support[tag], 'depth': self._depth[tag]}
+            for tag in ranked
+        ]
+
+    def stats(self):
+        return {
+            "seeds": self.seeds,
+            "visited": [dict(visit, tag=tag) for tag, visit in self.visited.items()],
+            "candidates": self.candidates(),
+        }
+
+
+def _normalize(tag):
+    return (tag or '').strip().lstrip('#').lower()
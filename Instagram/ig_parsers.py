@@ -0,0 +1,128 @@
+"""
+Instagram API 응답 파서 (순수 함수)
+크롤러와 원본 아카이브 재처리(reprocess.py)가 같은 파서를 사용하도록 네트워크/파일 입출력 없이
+응답 dict -> 정규화된 프로필/게시물 dict 변환만 담당합니다.
+"""
+
+from engagement_stats import EngagementStats
+from post_normalizer import GRAPHQL, REST, normalize, normalize_records
+from records import ProfileRecord
+
+
+def parse_post_node(node):
+    """web_profile_info의 edge_owner_to_timeline_media 노드(GraphQL) -> 게시물 dict"""
+    return normalize(node, GRAPHQL)
+
+
+def parse_feed_item(post):
+    """REST 피드(/api/v1/feed/user/) 아이템 -> 게시물 dict"""
+    return normalize(post, REST)
+
+
+def profile_user(payload):
+    """web_profile_info 응답 -> data.user dict (없으면 빈 dict)"""
+    return payload.get('data', {}).get('user', {}) or {}
+
+
+def parse_profile_info(username, data):
+    """web_profile_info의 data.user -> 프로필 기본 정보"""
+    return {
+        'username': username,
+        'full_name': data.get('full_name', ''),
+        'bio': data.get('biography', ''),
+        'is_verified': data.get('is_verified', False),
+        'is_private': data.get('is_private', False),
+        'followers': data.get('edge_followed_by', {}).get('count', 0),
+        'following': data.get('edge_follow', {}).get('count', 0),
+        'posts': data.get('edge_owner_to_timeline_media', {}).get('count', 0),
+        'profile_pic_url': data.get('profile_pic_url_hd', ''),
+        'category': data.get('category_name', ''),
+    }
+
+
+def timeline_edges(data):
+    return data.get('edge_owner_to_timeline_media', {}).get('edges', [])
+
+
+def needs_feed_fetch(profile_info, data):
+    """프로필 응답에 게시물이 없어 REST 피드를 따로 받아야 하는지 여부"""
+    return (not timeline_edges(data)) and bool(data.get('id')) and (not profile_info['is_private'])
+
+
+def get_ai_grade(followers, engagement_rate):
+    if followers is None:
+        followers = 0
+    if engagement_rate is None:
+        engagement_rate = 0.0
+    if followers >= 1000000 and engagement_rate >= 4:
+        return "S", 92
+    elif followers >= 100000 and engagement_rate >= 2:
+        return "A", 85
+    elif followers >= 10000 and engagement_rate >= 1:
+        return "B", 78
+    else:
+        return "C", 70
+
+
+def finalize_profile(profile_info, recent_posts):
+    """참여율 / AI 등급 계산 후 recent_posts_raw(파싱된 게시물)를 붙여 완성된 프로필 반환"""
+    if recent_posts and profile_info['followers'] > 0:
+        engagement_rate = EngagementStats(recent_posts).engagement_rate(profile_info['followers'])
+        profile_info['engagement_rate'] = round(engagement_rate, 2)
+    else:
+        profile_info['engagement_rate'] = 0.0 if profile_info['followers'] > 0 else None
+
+    profile_info['ai_grade'], profile_info['ai_score'] = get_ai_grade(
+        profile_info.get('followers', 0), profile_info.get('engagement_rate', 0.0)
+    )
+    profile_info['recent_posts_raw'] = recent_posts
+    return profile_info
+
+
+def build_profile(username, payload, feed_items=None):
+    """web_profile_info 응답 (+ 필요 시 REST 피드 아이템) -> 완성된 프로필 ProfileRecord (데이터가 없으면 None)"""
+    data = profile_user(payload)
+    if not data:
+        return None
+    profile_info = parse_profile_info(username, data)
+    if needs_feed_fetch(profile_info, data):
+        recent_posts = normalize_records(feed_items or [], REST)
+    else:
+        recent_posts = normalize_records([edge.get('node', {}) for edge in timeline_edges(data)], GRAPHQL)
+    return ProfileRecord.from_dict(finalize_profile(profile_info, recent_posts))
+
+
+def medias_from_sections(sections):
+    medias = []
+    for sec in sections:
+        medias.extend(sec.get("layout_content", {}).get("medias", []))
+    return medias
+
+
+def parse_tag_page(data, tab=None):
+    """해시태그 응답 -> (medias, next_cursor)
+
+    tab이 None이면 web_info 첫 페이지 응답, 아니면 해당 탭의 sections API 응답으로 해석합니다.
+    """
+    if tab is None:
+        body = data.get("data", {})
+        if body.get("top", {}).get("sections"):
+            section_data, tab = body["top"], "top"
+        elif body.get("recent", {}).get("sections"):
+            section_data, tab = body["recent"], "recent"
+        else:
+            medias = body.get("top", {}).get("layout_content", {}).get("medias", [])
+            medias += body.get("recent", {}).get("layout_content", {}).get("medias", [])
+            return medias, None
+    else:
+        section_data = data
+    medias = medias_from_sections(section_data.get("sections", []))
+    next_cursor = None
+    if section_data.get("more_available") and section_data.get("next_max_id"):
+        next_cursor = {
+            "tab": tab,
+            "max_id": section_data["next_max_id"],
+            "page": section_data.get("next_page"),
+            "next_media_ids": section_data.get("next_media_ids", []),
+        }
+    return medias, next_cursor
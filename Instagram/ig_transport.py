@@ -0,0 +1,159 @@
+"""
+Instagram 공용 HTTP 전송 계층
+계정/프록시별 커넥션 풀 세션을 재사용하여 keep-alive로 TCP/TLS 핸드셰이크를 줄입니다.
+httpx + h2가 설치되어 있으면 HTTP/2 세션을, 아니면 requests.Session을 사용합니다.
+endpoint를 지정한 요청은 RateScheduler의 토큰을 받은 뒤 전송되고, 응답 상태가 스케줄러에 반영됩니다.
+"""
+
+import http.cookiejar
+import inspect
+import threading
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from rate_scheduler import get_scheduler
+
+try:
+    import httpx
+    import h2  # noqa: F401 (HTTP/2 지원 여부 확인용)
+    HTTP2_AVAILABLE = True
+except ImportError:
+    httpx = None
+    HTTP2_AVAILABLE = False
+
+# (connect, read) 초
+DEFAULT_TIMEOUT = (5.0, 20.0)
+# 호스트당 최대 동시 커넥션 수
+DEFAULT_MAX_CONNECTIONS_PER_HOST = 8
+
+if httpx is not None:
+    TRANSPORT_ERRORS = (requests.exceptions.RequestException, httpx.HTTPError)
+else:
+    TRANSPORT_ERRORS = (requests.exceptions.RequestException,)
+
+
+class _RejectAllCookies(http.cookiejar.DefaultCookiePolicy):
+    """쿠키는 호출 측이 헤더로 직접 관리하므로 세션 쿠키 저장을 막음"""
+
+    def set_ok(self, cookie, request):
+        return False
+
+
+class TransportPool:
+    """(계정, 프록시) 단위로 keep-alive 세션을 보관하는 커넥션 풀"""
+
+    def __init__(self, max_connections_per_host=DEFAULT_MAX_CONNECTIONS_PER_HOST, timeout=DEFAULT_TIMEOUT, http2=True, scheduler=None):
+        self.max_connections_per_host = max_connections_per_host
+        self.scheduler = scheduler
+        self.timeout = timeout
+        self.use_http2 = http2 and HTTP2_AVAILABLE
+        self._sessions = {}
+        self._lock = threading.Lock()
+        self._stats = {"requests": 0, "sessions_created": 0, "errors": 0}
+
+    def _create_http2_session(self, proxy):
+        connect_timeout, read_timeout = self.timeout
+        kwargs = {
+            "http2": True,
+            "limits": httpx.Limits(
+                max_connections=self.max_connections_per_host,
+                max_keepalive_connections=self.max_connections_per_host,
+            ),
+            "timeout": httpx.Timeout(read_timeout, connect=connect_timeout),
+        }
+        if proxy:
+            # httpx 버전에 따라 proxy / proxies 인자 이름이 다름
+            proxy_arg = "proxy" if "proxy" in inspect.signature(httpx.Client).parameters else "proxies"
+            kwargs[proxy_arg] = proxy
+        client = httpx.Client(**kwargs)
+        client.cookies.jar.set_policy(_RejectAllCookies())
+        return client
+
+    def _create_requests_session(self, proxy):
+        session = requests.Session()
+        session.cookies.set_policy(_RejectAllCookies())
+        adapter = HTTPAdapter(
+            pool_connections=4,
+            pool_maxsize=self.max_connections_per_host,
+            pool_block=True,
+            max_retries=0,
+        )
+        session.mount("https://", adapter)
+        session.mount("http://", adapter)
+        if proxy:
+            session.proxies = {"http": proxy, "https": proxy}
+        return session
+
+    def session(self, account=None, proxy=None):
+        """(계정, 프록시)에 해당하는 세션 반환 (없으면 생성)"""
+        key = (account or "", proxy or "")
+        with self._lock:
+            session = self._sessions.get(key)
+            if session is None:
+                if self.use_http2:
+                    session = self._create_http2_session(proxy)
+                else:
+                    session = self._create_requests_session(proxy)
+                self._sessions[key] = session
+                self._stats["sessions_created"] += 1
+            return session
+
+    def request(self, method, url, account=None, proxy=None, headers=None, params=None, data=None, timeout=None, endpoint=None):
+        session = self.session(account, proxy)
+        scheduler = self.scheduler if endpoint else None
+        if scheduler is not None:
+            scheduler.acquire(account, endpoint)
+        with self._lock:
+            self._stats["requests"] += 1
+        try:
+            if httpx is not None and isinstance(session, httpx.Client):
+                resp = session.request(method, url, headers=headers, params=params, data=data,
+                                       timeout=timeout if timeout is not None else httpx.USE_CLIENT_DEFAULT)
+            else:
+                resp = session.request(method, url, headers=headers, params=params, data=data,
+                                       timeout=timeout if timeout is not None else self.timeout)
+        except TRANSPORT_ERRORS:
+            with self._lock:
+                self._stats["errors"] += 1
+            if scheduler is not None:
+                scheduler.feedback(account, endpoint, error=True)
+            raise
+        if scheduler is not None:
+            scheduler.feedback(account, endpoint, status_code=resp.status_code)
+        return resp
+
+    def get(self, url, **kwargs):
+        return self.request("GET", url, **kwargs)
+
+    def post(self, url, **kwargs):
+        return self.request("POST", url, **kwargs)
+
+    def stats(self):
+        with self._lock:
+            stats = dict(self._stats)
+            stats["sessions"] = len(self._sessions)
+        stats["http2"] = self.use_http2
+        if self.scheduler is not None:
+            stats["scheduler"] = self.scheduler.stats()
+        return stats
+
+    def close(self):
+        with self._lock:
+            sessions = list(self._sessions.values())
+            self._sessions.clear()
+        for session in sessions:
+            session.close()
+
+
+_default_pool = None
+_default_pool_lock = threading.Lock()
+
+
+def get_transport():
+    """프로세스 전역에서 공유하는 기본 TransportPool 반환"""
+    global _default_pool
+    with _default_pool_lock:
+        if _default_pool is None:
+            _default_pool = TransportPool(scheduler=get_scheduler())
+        return _default_pool
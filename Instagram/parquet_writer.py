@@ -0,0 +1,196 @@
+"""
+Parquet 데이터셋 출력 (크롤링 날짜 / 해시태그 파티션)
+실행이 끝난 뒤 result_sink의 profiles.ndjson / posts.ndjson을 고정 스키마의 Parquet으로 변환해
+{root}/{profiles|posts}/crawl_date=YYYY-MM-DD/hashtag=<tag>/part-<run>.parquet 에 기록합니다.
+여러 실행을 분석할 때는 load_dataset으로 날짜/해시태그 파티션만 골라 한 번에 읽습니다.
+
+pyarrow가 설치되어 있지 않으면 export_parquet는 아무것도 하지 않고 None을 반환합니다.
+
+사용법: python parquet_writer.py <run_dir> --hashtag fashion --root datasets
+"""
+
+import argparse
+import os
+from datetime import datetime
+from pathlib import Path
+from urllib.parse import quote
+
+from result_sink import PROFILES_FILENAME, POSTS_FILENAME, find_ndjson, iter_latest_post_blocks, iter_ndjson
+
+try:
+    import pyarrow as pa
+    import pyarrow.dataset as ds
+    import pyarrow.parquet as pq
+except ImportError:
+    pa = ds = pq = None
+
+# 변환 시 한 번에 메모리에 올리는 행 수 (= Parquet row group 크기)
+BATCH_ROWS = 2000
+
+# scrape_instagram_profile 결과 스키마
+PROFILE_FIELDS = [
+    ("run_id", "string"),
+    ("username", "string"),
+    ("full_name", "string"),
+    ("bio", "string"),
+    ("is_verified", "bool"),
+    ("is_private", "bool"),
+    ("followers", "int64"),
+    ("following", "int64"),
+    ("posts", "int64"),
+    ("profile_pic_url", "string"),
+    ("category", "string"),
+    ("engagement_rate", "float64"),
+    ("ai_grade", "string"),
+    ("ai_score", "int64"),
+]
+# parse_post_node / REST 피드 파서 공통 결과 스키마 (music은 평탄화)
+POST_FIELDS = [
+    ("run_id", "string"),
+    ("username", "string"),
+    ("id", "string"),
+    ("shortcode", "string"),
+    ("is_reel", "bool"),
+    ("post_type", "string"),
+    ("media_type", "string"),
+    ("caption", "string"),
+    ("hashtags", "list<string>"),
+    ("music_song_name", "string"),
+    ("music_artist_name", "string"),
+    ("like_count", "int64"),
+    ("comment_count", "int64"),
+    ("view_count", "int64"),
+    ("thumbnail_url", "string"),
+    ("media_url", "string"),
+    ("video_url", "string"),
+    ("taken_at_timestamp", "int64"),
+]
+
+
+def _arrow_type(name):
+    if name == "list<string>":
+        return pa.list_(pa.string())
+    return {"string": pa.string(), "bool": pa.bool_(), "int64": pa.int64(), "float64": pa.float64()}[name]
+
+
+def _schema(fields):
+    return pa.schema([(name, _arrow_type(kind)) for name, kind in fields])
+
+
+def _cast(value, kind):
+    if value is None or value == "":
+        return None if kind != "string" else value
+    if kind == "string":
+        return str(value)
+    if kind == "int64":
+        return int(value)
+    if kind == "float64":
+        return float(value)
+    if kind == "bool":
+        return bool(value)
+    return list(value)
+
+
+def normalize_profile(row, run_id):
+    return {name: (run_id if name == "run_id" else _cast(row.get(name), kind)) for name, kind in PROFILE_FIELDS}
+
+
+def normalize_post(row, run_id):
+    music = row.get("music") or {}
+    flat = dict(row, run_id=run_id, music_song_name=music.get("song_name"), music_artist_name=music.get("artist_name"))
+    return {name: _cast(flat.get(name), kind) for name, kind in POST_FIELDS}
+
+
+def _partition_dir(root, kind, crawl_date, hashtag):
+    # 파티션 값은 URI 인코딩 (pyarrow hive 파티셔닝이 읽을 때 디코딩)
+    return Path(root) / kind / f"crawl_date={crawl_date}" / f"hashtag={quote(hashtag, safe='')}"
+
+
+def _write_partition(rows, fields, normalize, path, run_id):
+    """rows를 BATCH_ROWS씩 row group으로 기록 (임시 파일에 쓴 뒤 교체), 기록한 행 수 반환"""
+    schema = _schema(fields)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    # 점으로 시작하는 임시 파일은 데이터셋 스캔에서 제외됨
+    tmp_path = path.parent / f".{path.name}.tmp"
+    count = 0
+    batch = []
+    with pq.ParquetWriter(tmp_path, schema, compression="zstd") as writer:
+        for row in rows:
+            batch.append(normalize(row, run_id))
+            if len(batch) >= BATCH_ROWS:
+                writer.write_table(pa.Table.from_pylist(batch, schema=schema))
+                count += len(batch)
+                batch = []
+        if batch:
+            writer.write_table(pa.Table.from_pylist(batch, schema=schema))
+            count += len(batch)
+    os.replace(tmp_path, path)
+    return count
+
+
+def export_parquet(run_dir, hashtag, root, crawl_date=None):
+    """실행 디렉토리의 NDJSON을 파티션된 Parquet으로 변환 - {profiles, posts} 행 수 반환 (pyarrow 없으면 None)
+
+    파일 이름에 실행 디렉토리 이름을 쓰므로 같은 실행을 다시 변환해도 파일이 중복되지 않습니다.
+    """
+    if pq is None:
+        print("[INFO] pyarrow가 설치되어 있지 않아 Parquet 출력을 건너뜁니다.")
+        return None
+    run_dir = Path(run_dir)
+    profiles_path = find_ndjson(run_dir, PROFILES_FILENAME)
+    if profiles_path is None:
+        return None
+    run_id = run_dir.name
+    crawl_date = crawl_date or datetime.now().strftime("%Y-%m-%d")
+    usernames = {row.get("username") for row in iter_ndjson(profiles_path)}
+
+    def profile_rows():
+        seen = set()
+        for row in iter_ndjson(profiles_path):
+            if row.get("username") not in seen:
+                seen.add(row.get("username"))
+                yield row
+
+    def post_rows():
+        # 중복 기록된 계정은 마지막 블록만, 프로필이 없는 게시물은 제외
+        for _, block in iter_latest_post_blocks(find_ndjson(run_dir, POSTS_FILENAME), usernames):
+            yield from block
+
+    counts = {}
+    for kind, rows, fields, normalize in (
+        ("profiles", profile_rows(), PROFILE_FIELDS, normalize_profile),
+        ("posts", post_rows(), POST_FIELDS, normalize_post),
+    ):
+        path = _partition_dir(root, kind, crawl_date, hashtag) / f"part-{run_id}.parquet"
+        counts[kind] = _write_partition(rows, fields, normalize, path, run_id)
+    print(f"[INFO] Parquet 저장: 프로필 {counts['profiles']}행, 게시물 {counts['posts']}행 -> {Path(root)}")
+    return counts
+
+
+def load_dataset(root, kind="posts", start_date=None, end_date=None, hashtags=None, columns=None):
+    """파티션 조건(날짜 범위, 해시태그)에 맞는 파일만 읽어 pandas DataFrame으로 반환"""
+    if ds is None:
+        raise ImportError("load_dataset에는 pyarrow가 필요합니다 (pip install pyarrow)")
+    partitioning = ds.partitioning(pa.schema([("crawl_date", pa.string()), ("hashtag", pa.string())]), flavor="hive")
+    dataset = ds.dataset(Path(root) / kind, format="parquet", partitioning=partitioning)
+    conditions = []
+    if start_date:
+        conditions.append(ds.field("crawl_date") >= start_date)
+    if end_date:
+        conditions.append(ds.field("crawl_date") <= end_date)
+    if hashtags:
+        conditions.append(ds.field("hashtag").isin(list(hashtags)))
+    expr = None
+    for condition in conditions:
+        expr = condition if expr is None else expr & condition
+    return dataset.to_table(columns=columns, filter=expr).to_pandas()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("run_dir", type=str, help="profiles.ndjson / posts.ndjson이 있는 실행 디렉토리")
+    parser.add_argument("--hashtag", type=str, required=True, help="파티션에 쓸 해시태그")
+    parser.add_argument("--root", type=str, default="datasets", help="Parquet 데이터셋 루트 (기본값: datasets)")
+    parser.add_argument("--crawl-date", type=str, default=None, help="파티션에 쓸 크롤링 날짜 YYYY-MM-DD (기본값: 오늘)")
+    args = parser.parse_args()
+    export_parquet(args.run_dir, args.hashtag, args.root, crawl_date=args.crawl_date)
@@ -0,0 +1,323 @@
+"""
+수집 게시물 기반 바이럴 패턴 증분 집계
+크롤러가 프로필을 저장할 때마다(post_listeners) 게시물을 (카테고리, 국가)별 스트리밍 히스토그램에 더하고,
+주기적으로 / 크롤링이 끝날 때 패턴 표(best_times / hashtag_count / avg_viral_rate / 릴스 비중)를 파일로 게시합니다.
+대시보드 지식 베이스(knowledge_base)가 게시된 표를 읽어 ViralContentAnalyzer의 바이럴 패턴을 갱신합니다.
+
+- 누적값(시간대별 / 해시태그 수별 게시물 수와 참여율 합계)과 계정별 마지막 게시 시각만 상태 파일에 보관하므로
+  새 크롤링마다 과거 게시물을 다시 읽지 않고, 같은 계정을 다시 수집해도 이미 센 게시물은 건너뜁니다.
+- 참여율은 게시물 참여(좋아요 + 댓글) / 팔로워 * 100, 바이럴 게시물은 계정 중앙값의 VIRAL_MULTIPLE배 이상인 게시물입니다.
+- 카테고리는 캡션 특징(caption_features)의 카테고리 키워드 점수로 정하고, 키워드가 없으면 "기타"입니다.
+
+기존 실행 결과로 초기화: python pattern_aggregator.py --ingest temp_results/runs/* [--country kr]
+"""
+
+import argparse
+import json
+import os
+import threading
+import time
+from collections import OrderedDict
+from pathlib import Path
+from statistics import median
+
+from caption_features import features_for
+from result_sink import POSTS_FILENAME, PROFILES_FILENAME, find_ndjson, iter_ndjson
+
+DEFAULT_STATE_PATH = "cache/pattern_state.json"
+DEFAULT_PATTERNS_PATH = "cache/learned_patterns.json"
+# 게시 간격 (초) - 이보다 자주 들어오는 프로필은 누적만 하고 다음 게시 때 반영
+DEFAULT_PUBLISH_INTERVAL = 60
+# 모든 국가를 합친 그룹의 국가 키
+ALL_COUNTRIES = "*"
+UNKNOWN_COUNTRY = "unknown"
+# 국가별 게시 시각 기준 (UTC 오프셋, 시간) - 없는 국가는 한국 시간 기준
+COUNTRY_UTC_OFFSETS = {
+    "kr": 9, "jp": 9, "cn": 8, "sg": 8, "my": 8, "ph": 8, "id": 7, "th": 7, "vn": 7, "us": -5,
+}
+DEFAULT_UTC_OFFSET = 9
+# 해시태그 수 히스토그램 구간 (마지막 구간은 그 이상 전부)
+MAX_HASHTAG_BIN = 30
+# 추천 해시태그 개수 범위의 폭
+HASHTAG_WINDOW = 4
+VIRAL_MULTIPLE = 2.0
+# 패턴을 게시하는 데 필요한 최소 게시물 수 (그룹 전체 / 시간대·해시태그 구간별)
+MIN_GROUP_POSTS = 100
+MIN_BIN_POSTS = 10
+# 중복 집계 방지용으로 마지막 게시 시각을 기억하는 최대 계정 수 (오래 안 본 계정부터 잊음)
+MAX_TRACKED_ACCOUNTS = 100000
+BEST_TIME_SLOTS = 3
+
+
+class GroupStats:
+    """(카테고리, 국가) 한 그룹의 누적 히스토그램"""
+    __slots__ = (
+        "posts", "reels", "viral", "rate_sum", "reel_rate_sum",
+        "hour_posts", "hour_rate", "tag_posts", "tag_rate",
+    )
+
+    def __init__(self, state=None):
+        state = state or {}
+        self.posts = state.get("posts", 0)
+        self.reels = state.get("reels", 0)
+        self.viral = state.get("viral", 0)
+        self.rate_sum = state.get("rate_sum", 0.0)
+        self.reel_rate_sum = state.get("reel_rate_sum", 0.0)
+        self.hour_posts = state.get("hour_posts") or [0] * 24
+        self.hour_rate = state.get("hour_rate") or [0.0] * 24
+        self.tag_posts = state.get("tag_posts") or [0] * (MAX_HASHTAG_BIN + 1)
+        self.tag_rate = state.get("tag_rate") or [0.0] * (MAX_HASHTAG_BIN + 1)
+
+    def add(self, rate, hour, hashtag_count, is_reel, is_viral):
+        self.posts += 1
+        self.rate_sum += rate
+        if is_reel:
+            self.reels += 1
+            self.reel_rate_sum += rate
+        if is_viral:
+            self.viral += 1
+        if hour is not None:
+            self.hour_posts[hour] += 1
+            self.hour_rate[hour] += rate
+        tag_bin = min(hashtag_count, MAX_HASHTAG_BIN)
+        self.tag_posts[tag_bin] += 1
+        self.tag_rate[tag_bin] += rate
+
+    def to_state(self):
+        return {slot: list(value) if isinstance(value, list) else value
+                for slot, value in ((slot, getattr(self, slot)) for slot in self.__slots__)}
+
+    def best_times(self):
+        """평균 참여율이 높은 시간대 BEST_TIME_SLOTS개 -> 연속된 시간은 묶어서 'HH:00-HH:00' 목록"""
+        ranked = sorted(
+            (hour for hour in range(24) if self.hour_posts[hour] >= MIN_BIN_POSTS),
+            key=lambda hour: self.hour_rate[hour] / self.hour_posts[hour],
+            reverse=True,
+        )
+        hours = sorted(ranked[:BEST_TIME_SLOTS])
+        ranges = []
+        for hour in hours:
+            if ranges and ranges[-1][1] == hour:
+                ranges[-1][1] = hour + 1
+            else:
+                ranges.append([hour, hour + 1])
+        return [f"{start:02d}:00-{end:02d}:00" for start, end in ranges]
+
+    def hashtag_count(self):
+        """평균 참여율이 가장 높은 HASHTAG_WINDOW개 연속 구간 -> 'N-M개' (표본이 부족하면 None)"""
+        best = None
+        for start in range(MAX_HASHTAG_BIN + 2 - HASHTAG_WINDOW):
+            posts = sum(self.tag_posts[start:start + HASHTAG_WINDOW])
+            if posts < MIN_BIN_POSTS:
+                continue
+            mean_rate = sum(self.tag_rate[start:start + HASHTAG_WINDOW]) / posts
+            if best is None or mean_rate > best[0]:
+                best = (mean_rate, start)
+        if best is None:
+            return None
+        return f"{best[1]}-{best[1] + HASHTAG_WINDOW - 1}개"
+
+    def pattern(self):
+        """게시할 패턴 (표본이 MIN_GROUP_POSTS 미만이면 None)"""
+        if self.posts < MIN_GROUP_POSTS:
+            return None
+        others = self.posts - self.reels
+        reel_mean = self.reel_rate_sum / self.reels if self.reels else None
+        other_mean = (self.rate_sum - self.reel_rate_sum) / others if others else None
+        pattern = {
+            "best_times": self.best_times(),
+            "hashtag_count": self.hashtag_count(),
+            "avg_viral_rate": round(self.viral / self.posts, 3),
+            "reel_share": round(self.reels / self.posts, 3),
+            "reel_engagement_lift": round(reel_mean / other_mean, 2) if reel_mean is not None and other_mean else None,
+            "avg_engagement_rate": round(self.rate_sum / self.posts, 3),
+            "sample_size": self.posts,
+        }
+        return {key: value for key, value in pattern.items() if value not in (None, [])}
+
+
+def post_category(post):
+    """캡션 키워드 점수가 가장 높은 카테고리 (키워드가 하나도 없으면 '기타')"""
+    scores = features_for(post).category_scores
+    best = max(scores, key=scores.get) if scores else None
+    return best if best and scores[best] > 0 else "기타"
+
+
+def post_hour(timestamp, country):
+    if not timestamp:
+        return None
+    offset = COUNTRY_UTC_OFFSETS.get(country, DEFAULT_UTC_OFFSET)
+    return int((timestamp + offset * 3600) // 3600 % 24)
+
+
+class PatternAggregator:
+    """프로필 단위로 게시물을 누적하고 패턴 표를 게시하는 집계기 (스레드 안전)"""
+
+    def __init__(self, state_path=DEFAULT_STATE_PATH, patterns_path=DEFAULT_PATTERNS_PATH,
+                 publish_interval=DEFAULT_PUBLISH_INTERVAL):
+        self.state_path = Path(state_path)
+        self.patterns_path = Path(patterns_path)
+        self.publish_interval = publish_interval
+        self._lock = threading.Lock()
+        # 파일 기록은 한 번에 하나씩 (늦게 만든 표가 먼저 만든 표에 덮이지 않도록)
+        self._publish_lock = threading.Lock()
+        self._groups = {}
+        # username -> 이미 센 게시물 중 가장 최근 게시 시각 (LRU)
+        self._watermarks = OrderedDict()
+        self._dirty = False
+        self._published_at = 0.0
+        self._load_state()
+
+    def _load_state(self):
+        if not self.state_path.exists():
+            return
+        try:
+            with open(self.state_path, "r", encoding="utf-8") as f:
+                state = json.load(f)
+        except (OSError, json.JSONDecodeError):
+            return
+        for key, group in state.get("groups", {}).items():
+            category, country = key.split("|", 1)
+            self._groups[(category, country)] = GroupStats(group)
+        self._watermarks = OrderedDict(state.get("watermarks", {}))
+
+    def _group(self, category, country):
+        group = self._groups.get((category, country))
+        if group is None:
+            group = self._groups[(category, country)] = GroupStats()
+        return group
+
+    def observe_profile(self, profile, country=None):
+        """프로필의 새 게시물(계정별 마지막으로 센 게시 시각 이후)을 누적하고 센 게시물 수 반환"""
+        followers = profile.get('followers') or 0
+        username = (profile.get('username') or '').lower()
+        posts = [post for post in profile.get('recent_posts_raw') or [] if post.get('taken_at_timestamp')]
+        if not followers or not username or not posts:
+            return 0
+        country = (country or UNKNOWN_COUNTRY).lower()
+        engagement = [(post.get('like_count') or 0) + (post.get('comment_count') or 0) for post in posts]
+        viral_threshold = median(engagement) * VIRAL_MULTIPLE
+        # 캡션 분석은 잠금 밖에서 (PostRecord는 특징이 레코드에 캐시됨)
+        rows = [
+            (post['taken_at_timestamp'], post_category(post), value / followers * 100,
+             post_hour(post['taken_at_timestamp'], country), len(post.get('hashtags') or []),
+             bool(post.get('is_reel')), viral_threshold > 0 and value >= viral_threshold)
+            for post, value in zip(posts, engagement)
+        ]
+        with self._lock:
+            watermark = self._watermarks.get(username, 0)
+            counted = 0
+            for taken_at, category, rate, hour, hashtag_count, is_reel, is_viral in rows:
+                if taken_at <= watermark:
+                    continue
+                for group_country in (country, ALL_COUNTRIES):
+                    self._group(category, group_country).add(rate, hour, hashtag_count, is_reel, is_viral)
+                counted += 1
+            if counted:
+                self._watermarks[username] = max(taken_at for taken_at, *_ in rows)
+                self._watermarks.move_to_end(username)
+                while len(self._watermarks) > MAX_TRACKED_ACCOUNTS:
+                    self._watermarks.popitem(last=False)
+                self._dirty = True
+            due = self._dirty and time.monotonic() - self._published_at >= self.publish_interval
+        if due:
+            self.publish()
+        return counted
+
+    def on_profile(self, profile, crawler):
+        """InstagramCrawler post_listeners용 콜백 (crawler.country를 국가로 사용)"""
+        self.observe_profile(profile, getattr(crawler, "country", None))
+
+    def patterns(self):
+        """{category: {country: pattern}} - 표본이 충분한 그룹만"""
+        with self._lock:
+            table = {}
+            for (category, country), group in sorted(self._groups.items()):
+                pattern = group.pattern()
+                if pattern:
+                    table.setdefault(category, {})[country] = pattern
+            return table
+
+    def publish(self, force=False):
+        """변경이 있으면(force면 무조건) 패턴 표와 누적 상태를 원자적으로 기록하고 게시한 표 반환"""
+        with self._publish_lock:
+            with self._lock:
+                if not self._dirty and not force:
+                    return None
+                self._dirty = False
+                self._published_at = time.monotonic()
+                state = {
+                    "groups": {f"{category}|{country}": group.to_state() for (category, country), group in self._groups.items()},
+                    "watermarks": dict(self._watermarks),
+                }
+            table = self.patterns()
+            _write_json(self.state_path, state)
+            _write_json(self.patterns_path, {"updated_at": time.time(), "patterns": table})
+            return table
+
+    def stats(self):
+        with self._lock:
+            return {
+                "groups": len(self._groups),
+                "accounts": len(self._watermarks),
+                "posts": sum(group.posts for (category, country), group in self._groups.items() if country == ALL_COUNTRIES),
+                "pending": self._dirty,
+            }
+
+
+def _write_json(path, data):
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = path.with_suffix(f".{threading.get_ident()}.tmp")
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(data, f, ensure_ascii=False)
+    os.replace(tmp_path, path)
+
+
+def load_patterns(path=DEFAULT_PATTERNS_PATH):
+    """게시된 패턴 표 {category: {country: pattern}} (파일이 없으면 빈 dict)"""
+    path = Path(path)
+    if not path.exists():
+        return {}
+    with open(path, "r", encoding="utf-8") as f:
+        return json.load(f).get("patterns", {})
+
+
+_default_aggregator = None
+_default_aggregator_lock = threading.Lock()
+
+
+def get_pattern_aggregator():
+    """프로세스 전역 공유 집계기 (PATTERN_STATE_PATH / LEARNED_PATTERNS_PATH 환경변수로 경로 지정)"""
+    global _default_aggregator
+    with _default_aggregator_lock:
+        if _default_aggregator is None:
+            _default_aggregator = PatternAggregator(
+                state_path=os.environ.get("PATTERN_STATE_PATH", DEFAULT_STATE_PATH),
+                patterns_path=os.environ.get("LEARNED_PATTERNS_PATH", DEFAULT_PATTERNS_PATH),
+            )
+        return _default_aggregator
+
+
+def ingest_run(aggregator, run_dir, country=None):
+    """기존 실행 디렉토리의 profiles.ndjson / posts.ndjson을 집계에 추가 (계정별 게시물을 모아 observe_profile)"""
+    posts_by_user = {}
+    for post in iter_ndjson(find_ndjson(run_dir, POSTS_FILENAME)):
+        posts_by_user.setdefault(post.get('username'), []).append(post)
+    counted = 0
+    for profile in iter_ndjson(find_ndjson(run_dir, PROFILES_FILENAME)):
+        posts = posts_by_user.pop(profile.get('username'), None)
+        if posts:
+            counted += aggregator.observe_profile(dict(profile, recent_posts_raw=posts), country)
+    return counted
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--ingest", nargs="+", default=[], help="집계에 추가할 실행 디렉토리 (profiles.ndjson / posts.ndjson)")
+    parser.add_argument("--country", type=str, default=None, help="실행 디렉토리의 국가 코드 (예: kr)")
+    args = parser.parse_args()
+    aggregator = get_pattern_aggregator()
+    for run_dir in args.ingest:
+        print(f"{run_dir}: 게시물 {ingest_run(aggregator, run_dir, args.country)}개 추가")
+    table = aggregator.publish(force=True)
+    print(f"게시: {sum(len(countries) for countries in table.values())}개 그룹 -> {aggregator.patterns_path}")
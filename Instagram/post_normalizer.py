@@ -0,0 +1,265 @@
+"""
+게시물 정규화 (GraphQL 노드 / REST 피드 아이템 공통)
+두 응답 형식의 필드 매핑을 선언적으로 정의하고, normalize / normalize_many가 매핑을 읽어
+같은 형식의 게시물 dict를 만듭니다.
+크롤링과 아카이브 재처리(reprocess.py)의 가장 안쪽 루프입니다.
+
+벤치마크: python post_normalizer.py --bench [--count 200000]
+"""
+
+import argparse
+import time
+
+from caption_features import HASHTAG_RE
+from records import POST_FIELDS, PostRecord
+
+GRAPHQL = "graphql"
+REST = "rest"
+
+
+def extract_hashtags(caption):
+    return HASHTAG_RE.findall(caption) if caption else []
+
+
+class P:
+    """dict 키 / list 인덱스 경로 - 중간에 값이 없거나 None이면 default"""
+    __slots__ = ("keys", "default")
+
+    def __init__(self, *keys, default=None):
+        self.keys = keys
+        self.default = default
+
+
+class FirstTruthy:
+    """앞의 값이 비어 있으면(falsy) 다음 값 사용 (`a or b`)"""
+    __slots__ = ("options",)
+
+    def __init__(self, *options):
+        self.options = options
+
+
+class Const:
+    __slots__ = ("value",)
+
+    def __init__(self, value):
+        self.value = value
+
+
+# 출력 필드 순서 (parse_post_node / REST 파서의 기존 출력과 동일)
+OUTPUT_FIELDS = POST_FIELDS
+
+# web_profile_info의 edge_owner_to_timeline_media 노드
+GRAPHQL_SPEC = {
+    "name": GRAPHQL,
+    "fields": {
+        'id': P('id'),
+        'shortcode': P('shortcode', default=''),
+        'media_type': FirstTruthy(P('__typename'), P('typename')),
+        'caption': P('edge_media_to_caption', 'edges', 0, 'node', 'text', default=''),
+        'like_count': P('edge_media_preview_like', 'count', default=0),
+        'comment_count': P('edge_media_to_comment', 'count', default=0),
+        'view_count': P('video_view_count'),
+        'thumbnail_url': P('display_url', default=''),
+        'media_url': P('display_url', default=''),
+        'video_url': P('video_url'),
+        'taken_at_timestamp': P('taken_at_timestamp'),
+    },
+    "is_reel": lambda item, fields: item.get('media_product_type') == 'REELS' or '/reel/' in f"/{fields['shortcode']}/",
+    # 릴스만: clips_music_attribution_info, 없으면 music
+    "music": [
+        (P('clips_music_attribution_info'), {
+            'song_name': P('song_name', default=''),
+            'artist_name': P('artist_name', default=''),
+            'should_mute_audio': P('should_mute_audio', default=False),
+        }),
+        (P('music'), {
+            'song_name': P('song_name', default=''),
+            'artist_name': P('artist_name', default=''),
+            'should_mute_audio': Const(False),
+        }),
+    ],
+}
+
+# /api/v1/feed/user/ 및 해시태그 sections의 media 아이템
+REST_SPEC = {
+    "name": REST,
+    "fields": {
+        'id': P('id'),
+        'shortcode': P('code', default=''),
+        'media_type': P('media_type', default=''),
+        'caption': P('caption', 'text', default=''),
+        'like_count': P('like_count', default=0),
+        'comment_count': P('comment_count', default=0),
+        'view_count': FirstTruthy(P('view_count'), P('play_count')),
+        'thumbnail_url': P('image_versions2', 'candidates', 0, 'url', default=''),
+        'media_url': P('image_versions2', 'candidates', 0, 'url', default=''),
+        'video_url': P('video_versions', 0, 'url'),
+        'taken_at_timestamp': P('taken_at'),
+    },
+    "is_reel": lambda item, fields: item.get('media_type') == 2 or item.get('product_type') == 'clips',
+    # 릴스만: clips_metadata.music_info.music_asset_info, 없으면 audio
+    "music": [
+        (P('clips_metadata', 'music_info', 'music_asset_info'), {
+            'song_name': P('title', default=''),
+            'artist_name': P('display_artist', default=''),
+            'should_mute_audio': P('is_explicit', default=False),
+        }),
+        (P('audio'), {
+            'song_name': P('audio_asset_id', default=''),
+            'artist_name': P('artist_name', default=''),
+            'should_mute_audio': Const(False),
+        }),
+    ],
+}
+
+
+def _path_getter(keys, default):
+    """P 경로 값을 읽는 함수 - 중간에 값이 없거나 형식이 다르면 default"""
+    first, rest = keys[0], keys[1:]
+    if not rest:
+        if default is None:
+            return lambda obj: obj.get(first)
+
+        def get_key(obj):
+            value = obj.get(first)
+            return default if value is None else value
+        return get_key
+
+    def get_path(obj):
+        value = obj.get(first)
+        for key in rest:
+            if type(key) is int:
+                value = value[key] if type(value) is list and len(value) > key else None
+            elif type(value) is dict:
+                value = value.get(key)
+            else:
+                return default
+        return default if value is None else value
+    return get_path
+
+
+def _getter(spec):
+    """spec(P / FirstTruthy / Const) -> obj에서 그 값을 읽는 함수"""
+    if isinstance(spec, Const):
+        value = spec.value
+        return lambda obj: value
+    if isinstance(spec, FirstTruthy):
+        getters = [_getter(option) for option in spec.options]
+
+        def first_truthy(obj):
+            value = None
+            for get in getters:
+                value = get(obj)
+                if value:
+                    break
+            return value
+        return first_truthy
+    return _path_getter(spec.keys, spec.default)
+
+
+class _Normalizer:
+    """선언적 매핑 하나를 읽어 만든 필드별 getter 모음 (모듈 로드 시 한 번 생성)"""
+
+    def __init__(self, spec):
+        # 같은 경로를 쓰는 필드(thumbnail_url / media_url 등)는 한 번만 계산해 복사
+        self.fields = []
+        self.copies = []
+        first = {}
+        for name, field in spec["fields"].items():
+            signature = (field.keys, field.default) if isinstance(field, P) else name
+            if signature in first:
+                self.copies.append((name, first[signature]))
+            else:
+                first[signature] = name
+                self.fields.append((name, _getter(field)))
+        self.is_reel = spec["is_reel"]
+        self.music = [
+            (_getter(source), [(name, _getter(field)) for name, field in fields.items()])
+            for source, fields in spec["music"]
+        ]
+
+    def fields_of(self, item):
+        """item -> 정규화한 필드 dict (OUTPUT_FIELDS 순서)"""
+        fields = {name: get(item) for name, get in self.fields}
+        for name, source in self.copies:
+            fields[name] = fields[source]
+        is_reel = bool(self.is_reel(item, fields))
+        # 음악 정보는 릴스일 때만, 앞의 원본부터 처음으로 존재하는 것을 사용
+        music = None
+        if is_reel:
+            for get_source, music_fields in self.music:
+                source = get_source(item)
+                if source:
+                    music = {name: get(source) for name, get in music_fields}
+                    break
+        caption = fields['caption']
+        fields['is_reel'] = is_reel
+        fields['post_type'] = 'reel' if is_reel else 'post'
+        fields['hashtags'] = HASHTAG_RE.findall(caption) if caption else []
+        fields['music'] = music
+        return {name: fields[name] for name in OUTPUT_FIELDS}
+
+    def record_of(self, item):
+        fields = self.fields_of(item)
+        # post_type은 is_reel에서 계산되므로 생성자에 넘기지 않음
+        del fields['post_type']
+        return PostRecord(**fields)
+
+
+_NORMALIZERS = {GRAPHQL: _Normalizer(GRAPHQL_SPEC), REST: _Normalizer(REST_SPEC)}
+
+
+def normalize(item, shape):
+    """게시물 1개 정규화 - shape는 'graphql' 또는 'rest'"""
+    return _NORMALIZERS[shape].fields_of(item)
+
+
+def normalize_many(items, shape):
+    """같은 형식의 게시물 여러 개를 한 번에 정규화"""
+    normalize_one = _NORMALIZERS[shape].fields_of
+    return [normalize_one(item) for item in items]
+
+
+def normalize_records(items, shape):
+    """normalize_many와 같지만 dict 대신 PostRecord 목록 반환 (프로필에 보관할 게시물용)"""
+    normalize_one = _NORMALIZERS[shape].record_of
+    return [normalize_one(item) for item in items]
+
+
+def _bench_payloads():
+    caption = "오늘의 맛집 추천 #먹방 #food #맛집 " * 3
+    graphql_node = {
+        "id": "1", "shortcode": "abc", "media_product_type": "REELS", "__typename": "GraphVideo",
+        "edge_media_preview_like": {"count": 5}, "edge_media_to_comment": {"count": 2}, "video_view_count": 100,
+        "display_url": "https://example.com/p.jpg", "video_url": "https://example.com/v.mp4",
+        "edge_media_to_caption": {"edges": [{"node": {"text": caption}}]},
+        "clips_music_attribution_info": {"song_name": "song", "artist_name": "artist"}, "taken_at_timestamp": 1,
+    }
+    rest_item = {
+        "id": "1", "code": "abc", "media_type": 2, "product_type": "clips", "like_count": 5, "comment_count": 2,
+        "play_count": 100, "caption": {"text": caption}, "image_versions2": {"candidates": [{"url": "https://example.com/p.jpg"}]},
+        "video_versions": [{"url": "https://example.com/v.mp4"}],
+        "clips_metadata": {"music_info": {"music_asset_info": {"title": "song", "display_artist": "artist"}}}, "taken_at": 1,
+    }
+    return {GRAPHQL: graphql_node, REST: rest_item}
+
+
+def bench(count=200000):
+    """형식별 normalize_many 처리량 (posts/sec)"""
+    results = {}
+    for shape, item in _bench_payloads().items():
+        items = [item] * count
+        started = time.perf_counter()
+        normalize_many(items, shape)
+        results[shape] = round(count / (time.perf_counter() - started))
+    return results
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--bench", action="store_true", help="정규화 처리량 측정")
+    parser.add_argument("--count", type=int, default=200000, help="벤치마크 게시물 수 (기본값: 200000)")
+    args = parser.parse_args()
+    if args.bench:
+        for shape, rate in bench(args.count).items():
+            print(f"{shape:8s}: {rate:,} posts/sec")
@@ -0,0 +1,282 @@
+"""
+프로필/게시물 2단 캐시 (메모리 LRU + 디스크)
+username 기준으로 scrape_instagram_profile 결과를 저장하고,
+TTL이 지난 항목은 stale-while-revalidate 방식으로 즉시 반환한 뒤 백그라운드에서 갱신합니다.
+없는/비공개 계정과 빈 프로필은 NegativeCache에 사유와 만료시각을 기록해 재수집 비용을 줄입니다 (401/403/429는 세션 상태라 기록하지 않음).
+"""
+
+import copy
+import json
+import os
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+from records import ProfileRecord, to_plain
+
+DEFAULT_CACHE_DIR = "cache/profiles"
+# 신선한 것으로 간주하는 시간 (초)
+DEFAULT_TTL = 3600
+# TTL 이후에도 갱신 중에 그대로 반환할 수 있는 시간 (초)
+DEFAULT_STALE_TTL = 6 * 3600
+DEFAULT_MAX_ENTRIES = 512
+
+
+class ProfileCache:
+    """username -> {profile, fetched_at, max_posts} 2단 캐시 (스레드 안전)"""
+
+    def __init__(self, cache_dir=DEFAULT_CACHE_DIR, ttl=DEFAULT_TTL, stale_ttl=DEFAULT_STALE_TTL, max_entries=DEFAULT_MAX_ENTRIES):
+        self.cache_dir = Path(cache_dir)
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        self.ttl = ttl
+        self.stale_ttl = stale_ttl
+        self.max_entries = max_entries
+        self._memory = OrderedDict()
+        self._lock = threading.Lock()
+        self._refreshing = set()
+        self._refresh_executor = ThreadPoolExecutor(max_workers=2, thread_name_prefix="profile-cache")
+        self._metrics = {
+            "memory_hits": 0,
+            "disk_hits": 0,
+            "stale_hits": 0,
+            "misses": 0,
+            "refreshes": 0,
+            "stores": 0,
+        }
+
+    def _disk_path(self, username):
+        return self.cache_dir / f"{username.lower()}.json"
+
+    def _count(self, metric):
+        with self._lock:
+            self._metrics[metric] += 1
+
+    def _remember(self, username, entry):
+        # 메모리 계층에는 ProfileRecord로 보관 (dict보다 게시물당 메모리가 작음)
+        if isinstance(entry.get("profile"), dict):
+            entry = dict(entry, profile=ProfileRecord.from_dict(entry["profile"]))
+        with self._lock:
+            self._memory[username] = entry
+            self._memory.move_to_end(username)
+            while len(self._memory) > self.max_entries:
+                self._memory.popitem(last=False)
+        return entry
+
+    def _load_entry(self, username):
+        with self._lock:
+            entry = self._memory.get(username)
+            if entry is not None:
+                self._memory.move_to_end(username)
+                return entry, "memory"
+        path = self._disk_path(username)
+        if not path.exists():
+            return None, None
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                entry = json.load(f)
+        except (OSError, json.JSONDecodeError):
+            return None, None
+        return self._remember(username, entry), "disk"
+
+    def lookup(self, username, max_posts=0):
+        """(profile, state) 반환 - state는 'fresh' / 'stale' / 'miss'"""
+        entry, tier = self._load_entry(username.lower())
+        if entry is None or entry.get("max_posts", 0) < max_posts:
+            return None, "miss"
+        age = time.time() - entry["fetched_at"]
+        if age > self.ttl + self.stale_ttl:
+            return None, "miss"
+        state = "fresh" if age <= self.ttl else "stale"
+        if state == "fresh":
+            self._count("memory_hits" if tier == "memory" else "disk_hits")
+        return copy.deepcopy(entry["profile"]), state
+
+    def put(self, username, profile, max_posts=0):
+        username = username.lower()
+        entry = {"profile": profile, "fetched_at": time.time(), "max_posts": max_posts}
+        self._remember(username, copy.deepcopy(entry))
+        path = self._disk_path(username)
+        tmp_path = path.with_suffix(f".{threading.get_ident()}.tmp")
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(dict(entry, profile=to_plain(profile)), f, ensure_ascii=False)
+        os.replace(tmp_path, path)
+        self._count("stores")
+
+    def invalidate(self, username):
+        username = username.lower()
+        with self._lock:
+            self._memory.pop(username, None)
+        try:
+            self._disk_path(username).unlink()
+        except FileNotFoundError:
+            pass
+
+    def _refresh(self, username, fetch, max_posts):
+        try:
+            profile = fetch()
+            if profile:
+                self.put(username, profile, max_posts)
+                self._count("refreshes")
+        except Exception as e:
+            print(f"[{username}] 캐시 백그라운드 갱신 실패: {e}")
+        finally:
+            with self._lock:
+                self._refreshing.discard(username.lower())
+
+    def get_or_fetch(self, username, fetch, max_posts=0):
+        """캐시 우선 조회 - stale이면 즉시 반환 후 백그라운드 갱신, miss면 fetch() 결과를 저장 후 반환"""
+        profile, state = self.lookup(username, max_posts)
+        if state == "fresh":
+            return profile
+        if state == "stale":
+            self._count("stale_hits")
+            with self._lock:
+                should_refresh = username.lower() not in self._refreshing
+                if should_refresh:
+                    self._refreshing.add(username.lower())
+            if should_refresh:
+                self._refresh_executor.submit(self._refresh, username, fetch, max_posts)
+            return profile
+        self._count("misses")
+        profile = fetch()
+        if profile:
+            self.put(username, profile, max_posts)
+        return profile
+
+    def stats(self):
+        with self._lock:
+            stats = dict(self._metrics)
+            stats["memory_entries"] = len(self._memory)
+        lookups = stats["memory_hits"] + stats["disk_hits"] + stats["stale_hits"] + stats["misses"]
+        stats["hit_rate"] = round((lookups - stats["misses"]) / lookups, 3) if lookups else 0.0
+        return stats
+
+
+_default_cache = None
+_default_cache_lock = threading.Lock()
+
+
+def get_profile_cache():
+    """프로세스 전역 공유 캐시 (PROFILE_CACHE_DIR / PROFILE_CACHE_TTL 환경변수로 설정)"""
+    global _default_cache
+    with _default_cache_lock:
+        if _default_cache is None:
+            _default_cache = ProfileCache(
+                cache_dir=os.environ.get("PROFILE_CACHE_DIR", DEFAULT_CACHE_DIR),
+                ttl=int(os.environ.get("PROFILE_CACHE_TTL", DEFAULT_TTL)),
+            )
+        return _default_cache
+
+
+# 사유별 네거티브 캐시 유지 시간 (초)
+NEGATIVE_TTLS = {
+    "not_found": 7 * 86400,
+    "private": 3 * 86400,
+    "empty": 86400,
+    "error": 1800,
+}
+NEGATIVE_REASON_LABELS = {
+    "not_found": "존재하지 않는 계정",
+    "private": "비공개 계정",
+    "empty": "프로필 데이터 없음",
+    # 이전 버전이 기록한 401/403 항목 표시용 (새로 기록하지 않음, 만료되면 사라짐)
+    "blocked": "접근 차단/제한",
+    "error": "일시적 수집 오류",
+}
+DEFAULT_NEGATIVE_PATH = "cache/negative_profiles.json"
+
+
+def negative_reason_for_status(status_code):
+    """프로필 응답 상태 코드 -> 네거티브 캐시 사유
+
+    429와 401/403은 대상 계정이 아니라 수집 계정/세션 상태(속도 제한, 로그인 요구, 일시 차단)를 뜻하므로 None을
+    돌려 기록하지 않습니다. 감속은 RateScheduler가 맡고, 세션이 회복되면 같은 username을 바로 다시 수집할 수 있습니다.
+    """
+    if status_code in (401, 403, 429):
+        return None
+    if status_code == 404:
+        return "not_found"
+    return "error"
+
+
+class NegativeCache:
+    """없는/비공개/빈 프로필 username을 사유·만료시각과 함께 기억하는 캐시 (스레드 안전)"""
+
+    def __init__(self, path=DEFAULT_NEGATIVE_PATH, ttls=None):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.ttls = ttls or NEGATIVE_TTLS
+        self._lock = threading.Lock()
+        self._entries = self._load()
+        self._metrics = {"hits": 0, "adds": 0}
+
+    def _load(self):
+        if not self.path.exists():
+            return {}
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                entries = json.load(f)
+        except (OSError, json.JSONDecodeError):
+            return {}
+        now = time.time()
+        return {u: e for u, e in entries.items() if e.get("expires_at", 0) > now}
+
+    def _save(self):
+        tmp_path = self.path.with_suffix(f".{threading.get_ident()}.tmp")
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(self._entries, f, ensure_ascii=False)
+        os.replace(tmp_path, self.path)
+
+    def check(self, username):
+        """유효한 항목이 있으면 {reason, status_code, expires_at} 반환, 없으면 None"""
+        username = username.lower()
+        with self._lock:
+            entry = self._entries.get(username)
+            if entry is None:
+                return None
+            if entry["expires_at"] <= time.time():
+                del self._entries[username]
+                return None
+            self._metrics["hits"] += 1
+            return dict(entry)
+
+    def add(self, username, reason, status_code=None):
+        entry = {
+            "reason": reason,
+            "status_code": status_code,
+            "expires_at": time.time() + self.ttls.get(reason, NEGATIVE_TTLS["error"]),
+        }
+        with self._lock:
+            self._entries[username.lower()] = entry
+            self._metrics["adds"] += 1
+            self._save()
+
+    def remove(self, username):
+        with self._lock:
+            if self._entries.pop(username.lower(), None) is not None:
+                self._save()
+
+    def stats(self):
+        with self._lock:
+            stats = dict(self._metrics)
+            stats["entries"] = len(self._entries)
+            reasons = {}
+            for entry in self._entries.values():
+                reasons[entry["reason"]] = reasons.get(entry["reason"], 0) + 1
+        stats["by_reason"] = reasons
+        return stats
+
+
+_default_negative_cache = None
+
+
+def get_negative_cache():
+    """프로세스 전역 공유 네거티브 캐시 (PROFILE_CACHE_DIR 환경변수 기준)"""
+    global _default_negative_cache
+    with _default_cache_lock:
+        if _default_negative_cache is None:
+            cache_dir = Path(os.environ.get("PROFILE_CACHE_DIR", DEFAULT_CACHE_DIR))
+            _default_negative_cache = NegativeCache(path=cache_dir.parent / "negative_profiles.json")
+        return _default_negative_cache
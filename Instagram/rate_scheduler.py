@@ -0,0 +1,154 @@
+"""
+적응형 토큰 버킷 요청 스케줄러
+계정별 버킷과 (계정, 엔드포인트)별 버킷을 함께 사용하며,
+성공 시 속도를 조금씩 올리고(additive increase) 429/오류 시 크게 낮춰(multiplicative decrease)
+고정 딜레이 대신 지속 가능한 최대 속도로 요청합니다.
+"""
+
+import threading
+import time
+
+# 엔드포인트별 초기/최대 요청 속도 (요청/초)
+ENDPOINT_RATES = {
+    "tag": {"rate": 0.5, "max_rate": 1.0},
+    "profile": {"rate": 0.5, "max_rate": 2.0},
+    "feed": {"rate": 1.0, "max_rate": 3.0},
+    "followers": {"rate": 0.5, "max_rate": 1.5},
+}
+DEFAULT_ENDPOINT_RATE = {"rate": 0.5, "max_rate": 1.0}
+# 계정 전체(모든 엔드포인트 합산) 속도
+ACCOUNT_RATE = {"rate": 1.0, "max_rate": 4.0}
+
+
+class TokenBucket:
+    """AIMD로 속도가 조절되는 토큰 버킷 (스레드 안전)"""
+
+    def __init__(self, rate, max_rate, min_rate=0.02, burst=2.0, increase=0.02, decrease=0.5, error_decrease=0.8):
+        self.rate = rate
+        self.max_rate = max_rate
+        self.min_rate = min_rate
+        self.burst = burst
+        self.increase = increase
+        self.decrease = decrease
+        self.error_decrease = error_decrease
+        self.tokens = burst
+        self.updated = time.monotonic()
+        self.waiting = 0
+        self.throttled = 0
+        self._lock = threading.Lock()
+
+    def _refill(self, now):
+        self.tokens = min(self.burst, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def reserve(self):
+        """토큰 1개를 예약하고 기다려야 할 시간(초)을 반환"""
+        with self._lock:
+            self._refill(time.monotonic())
+            self.tokens -= 1
+            if self.tokens >= 0:
+                return 0.0
+            return -self.tokens / self.rate
+
+    def on_success(self):
+        with self._lock:
+            self.rate = min(self.max_rate, self.rate + self.increase)
+
+    def on_throttle(self):
+        with self._lock:
+            self._refill(time.monotonic())
+            self.rate = max(self.min_rate, self.rate * self.decrease)
+            # 남은 버스트도 비워 곧바로 재요청하지 않도록 함
+            self.tokens = min(self.tokens, 0.0)
+            self.throttled += 1
+
+    def on_error(self):
+        with self._lock:
+            self.rate = max(self.min_rate, self.rate * self.error_decrease)
+
+    def stats(self):
+        with self._lock:
+            return {
+                "rate": round(self.rate, 3),
+                "tokens": round(self.tokens, 2),
+                "queue_depth": self.waiting,
+                "throttled": self.throttled,
+            }
+
+
+class RateScheduler:
+    """계정/엔드포인트 단위 토큰 버킷 모음"""
+
+    def __init__(self, endpoint_rates=None, account_rate=None):
+        self.endpoint_rates = endpoint_rates or ENDPOINT_RATES
+        self.account_rate = account_rate or ACCOUNT_RATE
+        self._buckets = {}
+        self._lock = threading.Lock()
+
+    def _bucket(self, key, config):
+        with self._lock:
+            bucket = self._buckets.get(key)
+            if bucket is None:
+                bucket = TokenBucket(rate=config["rate"], max_rate=config["max_rate"])
+                self._buckets[key] = bucket
+            return bucket
+
+    def _buckets_for(self, account, endpoint):
+        account = account or "default"
+        account_bucket = self._bucket((account, "*"), self.account_rate)
+        endpoint_bucket = self._bucket((account, endpoint), self.endpoint_rates.get(endpoint, DEFAULT_ENDPOINT_RATE))
+        return account_bucket, endpoint_bucket
+
+    def set_initial_rate(self, account, endpoint, rate):
+        """(계정, 엔드포인트) 버킷이 아직 없을 때만 초기 속도 지정 (이미 학습된 속도는 유지)"""
+        account = account or "default"
+        config = dict(self.endpoint_rates.get(endpoint, DEFAULT_ENDPOINT_RATE))
+        config["rate"] = min(rate, config["max_rate"])
+        self._bucket((account, endpoint), config)
+
+    def acquire(self, account, endpoint):
+        """요청 전에 호출 - 두 버킷 모두 토큰이 생길 때까지 대기 (블로킹)"""
+        buckets = self._buckets_for(account, endpoint)
+        wait = max(bucket.reserve() for bucket in buckets)
+        if wait > 0:
+            for bucket in buckets:
+                with bucket._lock:
+                    bucket.waiting += 1
+            try:
+                time.sleep(wait)
+            finally:
+                for bucket in buckets:
+                    with bucket._lock:
+                        bucket.waiting -= 1
+        return wait
+
+    def feedback(self, account, endpoint, status_code=None, error=False):
+        """응답 결과 반영 - 429는 강한 감속, 401/403(차단/로그인 요구)과 5xx/네트워크 오류는 약한 감속,
+        404 등 그 밖의 4xx는 속도와 무관하므로 그대로, 2xx/3xx는 가속"""
+        for bucket in self._buckets_for(account, endpoint):
+            if status_code == 429:
+                bucket.on_throttle()
+            elif error or status_code in (401, 403) or (status_code is not None and status_code >= 500):
+                bucket.on_error()
+            elif status_code is not None and status_code >= 400:
+                continue
+            else:
+                bucket.on_success()
+
+    def stats(self):
+        with self._lock:
+            items = list(self._buckets.items())
+        return {f"{account}|{endpoint}": bucket.stats() for (account, endpoint), bucket in items}
+
+
+_default_scheduler = None
+_default_scheduler_lock = threading.Lock()
+
+
+def get_scheduler():
+    """프로세스 전역에서 공유하는 기본 RateScheduler 반환"""
+    global _default_scheduler
+    with _default_scheduler_lock:
+        if _default_scheduler is None:
+            _default_scheduler = RateScheduler()
+        return _default_scheduler
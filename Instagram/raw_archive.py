@@ -0,0 +1,146 @@
+"""
+원본 API 응답 아카이브 (압축 + 내용 주소 저장)
+응답 바이트를 SHA-256 해시를 이름으로 한 번만 압축 저장하고(같은 내용은 중복 저장하지 않음),
+index.ndjson에 (endpoint, key, fetched_at, sha256) 한 줄을 추가합니다.
+zstandard가 설치되어 있으면 zstd, 없으면 gzip으로 압축합니다.
+
+RAW_ARCHIVE=off 환경변수 또는 RawArchive(enabled=False)로 아카이브를 완전히 끌 수 있습니다.
+"""
+
+import gzip
+import hashlib
+import json
+import os
+import threading
+import time
+from pathlib import Path
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+DEFAULT_ARCHIVE_DIR = "cache/raw"
+INDEX_FILENAME = "index.ndjson"
+
+
+class RawArchive:
+    """내용 주소 기반 원본 응답 저장소 (스레드 안전)"""
+
+    def __init__(self, root=DEFAULT_ARCHIVE_DIR, compression=None, enabled=True):
+        self.root = Path(root)
+        self.enabled = enabled
+        if compression is None:
+            compression = "zstd" if zstandard is not None else "gzip"
+        if compression == "zstd" and zstandard is None:
+            raise ImportError("zstd 압축에는 zstandard 패키지가 필요합니다 (pip install zstandard)")
+        self.compression = compression
+        self.index_path = self.root / INDEX_FILENAME
+        self._lock = threading.Lock()
+        self._metrics = {"stored": 0, "deduped": 0, "bytes_in": 0, "bytes_out": 0}
+        if self.enabled:
+            (self.root / "objects").mkdir(parents=True, exist_ok=True)
+
+    def _suffix(self, compression):
+        return ".zst" if compression == "zstd" else ".gz"
+
+    def _object_path(self, digest, compression=None):
+        return self.root / "objects" / digest[:2] / f"{digest}{self._suffix(compression or self.compression)}"
+
+    def _compress(self, content):
+        if self.compression == "zstd":
+            return zstandard.ZstdCompressor(level=3).compress(content)
+        return gzip.compress(content, compresslevel=6)
+
+    def store(self, endpoint, key, content, fetched_at=None):
+        """응답 바이트 저장 후 sha256 반환 (비활성화 상태면 None)"""
+        if not self.enabled:
+            return None
+        digest = hashlib.sha256(content).hexdigest()
+        path = self._object_path(digest)
+        entry = {
+            "endpoint": endpoint,
+            "key": str(key),
+            "fetched_at": fetched_at or time.time(),
+            "sha256": digest,
+            "size": len(content),
+            "compression": self.compression,
+        }
+        if path.exists():
+            with self._lock:
+                self._metrics["deduped"] += 1
+        else:
+            compressed = self._compress(content)
+            path.parent.mkdir(exist_ok=True)
+            tmp_path = path.with_name(f".{path.name}.{threading.get_ident()}.tmp")
+            with open(tmp_path, "wb") as f:
+                f.write(compressed)
+            os.replace(tmp_path, path)
+            with self._lock:
+                self._metrics["stored"] += 1
+                self._metrics["bytes_in"] += len(content)
+                self._metrics["bytes_out"] += len(compressed)
+        line = json.dumps(entry, ensure_ascii=False) + "\n"
+        with self._lock:
+            with open(self.index_path, "a", encoding="utf-8") as f:
+                f.write(line)
+        return digest
+
+    def load(self, digest, compression=None):
+        """sha256에 해당하는 원본 응답 바이트 반환"""
+        compression = compression or self.compression
+        with open(self._object_path(digest, compression), "rb") as f:
+            data = f.read()
+        if compression == "zstd":
+            if zstandard is None:
+                raise ImportError("zstd 아카이브를 읽으려면 zstandard 패키지가 필요합니다")
+            return zstandard.ZstdDecompressor().decompress(data)
+        return gzip.decompress(data)
+
+    def iter_index(self, endpoint=None, key=None):
+        """인덱스 항목을 기록 순서대로 yield (endpoint / key로 필터)"""
+        if not self.index_path.exists():
+            return
+        with open(self.index_path, "r", encoding="utf-8") as f:
+            for line in f:
+                try:
+                    entry = json.loads(line)
+                except json.JSONDecodeError:
+                    continue
+                if endpoint is not None and entry["endpoint"] != endpoint:
+                    continue
+                if key is not None and entry["key"] != str(key):
+                    continue
+                yield entry
+
+    def latest(self, endpoint, key):
+        """(endpoint, key)의 가장 최근 응답 바이트 반환 (없으면 None)"""
+        latest = None
+        for entry in self.iter_index(endpoint, key):
+            if latest is None or entry["fetched_at"] >= latest["fetched_at"]:
+                latest = entry
+        if latest is None:
+            return None
+        return self.load(latest["sha256"], latest["compression"])
+
+    def stats(self):
+        with self._lock:
+            stats = dict(self._metrics)
+        stats["enabled"] = self.enabled
+        stats["compression"] = self.compression
+        stats["ratio"] = round(stats["bytes_out"] / stats["bytes_in"], 3) if stats["bytes_in"] else None
+        return stats
+
+
+_default_archive = None
+_default_archive_lock = threading.Lock()
+
+
+def get_raw_archive():
+    """프로세스 전역 공유 아카이브 (RAW_ARCHIVE_DIR로 경로 지정, RAW_ARCHIVE=off면 비활성화)"""
+    global _default_archive
+    with _default_archive_lock:
+        if _default_archive is None:
+            enabled = os.environ.get("RAW_ARCHIVE", "on").lower() not in ("off", "0", "false")
+            _default_archive = RawArchive(os.environ.get("RAW_ARCHIVE_DIR", DEFAULT_ARCHIVE_DIR), enabled=enabled)
+        return _default_archive
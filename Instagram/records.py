@@ -0,0 +1,243 @@
+"""
+게시물 / 프로필 레코드 (__slots__ 기반 경량 객체)
+파싱된 게시물을 dict 대신 __slots__ 객체로 보관해 계정별 recent_posts_raw와 프로필 캐시의 메모리를 줄입니다.
+- media_url은 thumbnail_url과 같으면 따로 저장하지 않고, post_type은 is_reel에서 계산합니다.
+- get / [] / in / keys / items를 지원하므로 dict를 받던 분석 함수에 그대로 넘길 수 있습니다.
+- JSON 응답 / 파일 기록 등 외부로 내보낼 때만 to_dict()(또는 to_plain)로 dict로 변환합니다.
+
+메모리 비교: python records.py --bench [--count 10000]
+"""
+
+import argparse
+import json
+import tracemalloc
+
+# 게시물 dict 키 순서 (post_normalizer 출력과 동일)
+POST_FIELDS = (
+    'id', 'shortcode', 'is_reel', 'post_type', 'media_type', 'caption', 'hashtags', 'music',
+    'like_count', 'comment_count', 'view_count', 'thumbnail_url', 'media_url', 'video_url',
+    'taken_at_timestamp',
+)
+# 프로필 dict 키 순서 (ig_parsers.build_profile 출력과 동일)
+PROFILE_FIELDS = (
+    'username', 'full_name', 'bio', 'is_verified', 'is_private', 'followers', 'following', 'posts',
+    'profile_pic_url', 'category', 'engagement_rate', 'ai_grade', 'ai_score', 'recent_posts_raw',
+)
+
+
+class _Same:
+    """media_url이 thumbnail_url과 같음을 나타내는 표시 (None과 구분, pickle / deepcopy 후에도 같은 객체)"""
+    __slots__ = ()
+
+    def __reduce__(self):
+        return "_SAME"
+
+
+_SAME = _Same()
+
+
+class _Record:
+    """dict처럼 읽고 쓸 수 있는 __slots__ 레코드 공통 동작
+
+    FIELDS에 없는 키는 _extra dict에 보관합니다 (예: ResultSink가 붙이는 username).
+    """
+    __slots__ = ("_extra",)
+    FIELDS = ()
+    _FIELD_SET = frozenset()
+
+    def __getitem__(self, key):
+        if key in self._FIELD_SET:
+            return getattr(self, key)
+        if self._extra is not None and key in self._extra:
+            return self._extra[key]
+        raise KeyError(key)
+
+    def __setitem__(self, key, value):
+        if key in self._FIELD_SET:
+            setattr(self, key, value)
+        else:
+            if self._extra is None:
+                self._extra = {}
+            self._extra[key] = value
+
+    def __contains__(self, key):
+        return key in self._FIELD_SET or (self._extra is not None and key in self._extra)
+
+    def get(self, key, default=None):
+        try:
+            return self[key]
+        except KeyError:
+            return default
+
+    def keys(self):
+        if not self._extra:
+            return list(self.FIELDS)
+        return list(self.FIELDS) + list(self._extra)
+
+    def __iter__(self):
+        return iter(self.keys())
+
+    def __len__(self):
+        return len(self.FIELDS) + (len(self._extra) if self._extra else 0)
+
+    def items(self):
+        return [(key, self[key]) for key in self.keys()]
+
+    def to_dict(self):
+        return {key: self[key] for key in self.keys()}
+
+    def __eq__(self, other):
+        if isinstance(other, (_Record, dict)):
+            return self.to_dict() == (other.to_dict() if isinstance(other, _Record) else other)
+        return NotImplemented
+
+    __hash__ = None
+
+    def __repr__(self):
+        return f"{type(self).__name__}({self.to_dict()!r})"
+
+
+class PostRecord(_Record):
+    """정규화된 게시물 1개"""
+    __slots__ = (
+        'id', 'shortcode', 'is_reel', 'media_type', 'caption', 'hashtags', 'music', 'like_count',
+        'comment_count', 'view_count', 'thumbnail_url', '_media_url', 'video_url', 'taken_at_timestamp',
+        '_features',
+    )
+    FIELDS = POST_FIELDS
+    _FIELD_SET = frozenset(POST_FIELDS)
+
+    def __init__(self, id, shortcode, is_reel, media_type, caption, hashtags, music, like_count,
+                 comment_count, view_count, thumbnail_url, video_url, taken_at_timestamp,
+                 media_url=_SAME, extra=None):
+        self.id = id
+        self.shortcode = shortcode
+        self.is_reel = is_reel
+        self.media_type = media_type
+        self.caption = caption
+        self.hashtags = hashtags
+        self.music = music
+        self.like_count = like_count
+        self.comment_count = comment_count
+        self.view_count = view_count
+        self.thumbnail_url = thumbnail_url
+        self._media_url = _SAME if media_url is _SAME or media_url == thumbnail_url else media_url
+        self.video_url = video_url
+        self.taken_at_timestamp = taken_at_timestamp
+        self._features = None
+        self._extra = extra
+
+    @property
+    def media_url(self):
+        return self.thumbnail_url if self._media_url is _SAME else self._media_url
+
+    @media_url.setter
+    def media_url(self, value):
+        self._media_url = _SAME if value == self.thumbnail_url else value
+
+    @property
+    def post_type(self):
+        return 'reel' if self.is_reel else 'post'
+
+    @post_type.setter
+    def post_type(self, value):
+        self.is_reel = value == 'reel'
+
+    @classmethod
+    def from_dict(cls, data):
+        if isinstance(data, PostRecord):
+            return data
+        extra = {key: value for key, value in data.items() if key not in cls._FIELD_SET} or None
+        record = cls(
+            data.get('id'), data.get('shortcode', ''), bool(data.get('is_reel')), data.get('media_type'),
+            data.get('caption', ''), data.get('hashtags') or [], data.get('music'), data.get('like_count', 0),
+            data.get('comment_count', 0), data.get('view_count'), data.get('thumbnail_url', ''),
+            data.get('video_url'), data.get('taken_at_timestamp'),
+            media_url=data.get('media_url', data.get('thumbnail_url', '')), extra=extra,
+        )
+        if 'post_type' in data:
+            record.post_type = data['post_type']
+        return record
+
+    def __getstate__(self):
+        # 캐시된 캡션 특징(_features)은 복사/직렬화하지 않음
+        return None, {slot: getattr(self, slot) for slot in self.__slots__ + _Record.__slots__ if slot != '_features'}
+
+    def __setstate__(self, state):
+        for slot, value in state[1].items():
+            setattr(self, slot, value)
+        self._features = None
+
+
+class ProfileRecord(_Record):
+    """완성된 프로필 (recent_posts_raw는 PostRecord 목록)"""
+    __slots__ = tuple(PROFILE_FIELDS)
+    FIELDS = PROFILE_FIELDS
+    _FIELD_SET = frozenset(PROFILE_FIELDS)
+
+    def __init__(self, extra=None, **fields):
+        for key in PROFILE_FIELDS:
+            setattr(self, key, fields.get(key))
+        self._extra = extra
+
+    @classmethod
+    def from_dict(cls, data):
+        if isinstance(data, ProfileRecord):
+            return data
+        fields = {key: value for key, value in data.items() if key in cls._FIELD_SET}
+        fields['recent_posts_raw'] = [PostRecord.from_dict(post) for post in data.get('recent_posts_raw') or []]
+        extra = {key: value for key, value in data.items() if key not in cls._FIELD_SET} or None
+        return cls(extra=extra, **fields)
+
+    def to_dict(self, include_posts=True):
+        row = {}
+        for key in self.keys():
+            if key == 'recent_posts_raw':
+                if include_posts:
+                    row[key] = [to_plain(post) for post in self.recent_posts_raw or []]
+            else:
+                row[key] = self[key]
+        return row
+
+
+def to_plain(value):
+    """레코드가 섞인 dict / list를 JSON으로 보낼 수 있는 순수 dict / list로 변환"""
+    if isinstance(value, _Record):
+        value = value.to_dict()
+    if isinstance(value, dict):
+        return {key: to_plain(item) for key, item in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [to_plain(item) for item in value]
+    return value
+
+
+def _bench_posts(count):
+    from post_normalizer import REST, _bench_payloads, normalize
+    template = normalize(_bench_payloads()[REST], REST)
+    # JSON 왕복으로 게시물마다 별도의 문자열 객체를 갖게 함 (실제 응답 파싱과 같은 조건)
+    return [json.loads(json.dumps(dict(template, id=str(i)))) for i in range(count)]
+
+
+def bench(count=10000):
+    """dict 게시물 vs PostRecord 게시물 count개의 메모리 (bytes)"""
+    posts = _bench_posts(count)
+    results = {}
+    for name, convert in (("dict", dict), ("record", PostRecord.from_dict)):
+        tracemalloc.start()
+        converted = [convert(json.loads(json.dumps(post))) for post in posts]
+        results[name] = tracemalloc.get_traced_memory()[0]
+        tracemalloc.stop()
+        del converted
+    return results
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--bench", action="store_true", help="게시물 메모리 사용량 비교")
+    parser.add_argument("--count", type=int, default=10000, help="벤치마크 게시물 수 (기본값: 10000)")
+    args = parser.parse_args()
+    if args.bench:
+        results = bench(args.count)
+        for name, size in results.items():
+            print(f"{name:6s}: {size / 1024 / 1024:.2f} MB ({size // args.count} bytes/post)")
+        print(f"절감: {1 - results['record'] / results['dict']:.1%}")
@@ -0,0 +1,171 @@
+"""
+원본 아카이브 재처리
+raw_archive에 저장된 프로필 / 피드 / 해시태그 응답을 현재 ig_parsers로 다시 파싱해 정규화된 결과를 새로 씁니다.
+파서를 고친 뒤 재크롤링 없이 과거 데이터를 다시 만들 때 사용하며, 프로세스 풀에서 병렬로 처리하고
+처리한 응답 수 / 초를 출력합니다.
+
+출력 (out 디렉토리):
+  profiles.ndjson / posts.ndjson   - ResultSink 형식 (계정별 가장 최근 프로필 응답 기준)
+  tag_posts.ndjson                 - 해시태그 페이지의 게시물 (tag, username 포함)
+  insta_{category}_profiles.csv 등 - result_sink.export_run 변환 결과
+
+사용법: python reprocess.py --out reprocessed --workers 8 [--since 2026-01-01] [--parquet-root datasets --hashtag all]
+"""
+
+import argparse
+import json
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+from pathlib import Path
+
+import ig_parsers
+from feed_store import merge_feed_items
+from parquet_writer import export_parquet
+from raw_archive import DEFAULT_ARCHIVE_DIR, RawArchive
+from result_sink import POSTS_FILENAME, PROFILES_FILENAME, ResultSink, export_run, find_ndjson
+
+TAG_POSTS_FILENAME = "tag_posts.ndjson"
+# 워커 프로세스 전역 상태 (_init_worker에서 설정)
+_archive = None
+_feed_pages = None
+_max_posts = None
+
+
+def plan_jobs(archive, since=None):
+    """인덱스를 한 번 읽어 재처리 대상 선정
+
+    프로필은 username별 가장 최근 응답, 피드는 user_id별 페이지(key)마다 가장 최근 응답,
+    해시태그는 페이지(key)마다 가장 최근 응답만 사용합니다.
+    """
+    profiles, feeds, tags = {}, {}, {}
+    for entry in archive.iter_index():
+        if since and entry["fetched_at"] < since:
+            continue
+        endpoint, key = entry["endpoint"], entry["key"]
+        if endpoint == "profile":
+            target, slot = profiles, key
+        elif endpoint == "feed":
+            target, slot = feeds.setdefault(key.split(":", 1)[0], {}), key
+        elif endpoint == "tag":
+            target, slot = tags, key
+        else:
+            continue
+        if slot not in target or entry["fetched_at"] >= target[slot]["fetched_at"]:
+            target[slot] = entry
+    feed_pages = {user_id: [(e["sha256"], e["compression"]) for e in pages.values()] for user_id, pages in feeds.items()}
+    profile_jobs = [(username, e["sha256"], e["compression"]) for username, e in profiles.items()]
+    tag_jobs = [(key, e["sha256"], e["compression"]) for key, e in tags.items()]
+    return profile_jobs, feed_pages, tag_jobs
+
+
+def _init_worker(archive_root, feed_pages, max_posts):
+    global _archive, _feed_pages, _max_posts
+    _archive = RawArchive(archive_root)
+    _feed_pages = feed_pages
+    _max_posts = max_posts
+
+
+def _load_json(digest, compression):
+    return json.loads(_archive.load(digest, compression))
+
+
+def _reprocess_profile(job):
+    """(username, sha256, compression) -> (프로필 또는 None, 처리한 응답 수)"""
+    username, digest, compression = job
+    try:
+        payload = _load_json(digest, compression)
+    except (OSError, ValueError):
+        return None, 0
+    responses = 1
+    feed_items = None
+    data = ig_parsers.profile_user(payload)
+    if data and ig_parsers.needs_feed_fetch(ig_parsers.parse_profile_info(username, data), data):
+        feed_items = []
+        for page_digest, page_compression in _feed_pages.get(str(data.get('id')), []):
+            try:
+                feed_items = merge_feed_items(feed_items, _load_json(page_digest, page_compression).get("items", []))
+                responses += 1
+            except (OSError, ValueError):
+                continue
+        feed_items = feed_items[:_max_posts]
+    return ig_parsers.build_profile(username, payload, feed_items), responses
+
+
+def _reprocess_tag(job):
+    """(tag:max_id, sha256, compression) -> (tag_posts 행 목록, 처리한 응답 수)"""
+    key, digest, compression = job
+    tag, max_id = key.rsplit(":", 1)
+    try:
+        data = _load_json(digest, compression)
+    except (OSError, ValueError):
+        return [], 0
+    # 첫 페이지(max_id 없음)는 web_info 형식, 이후 페이지는 sections 형식
+    medias, _ = ig_parsers.parse_tag_page(data, tab="recent" if max_id else None)
+    rows = []
+    for item in medias:
+        media = item.get("media", {})
+        row = ig_parsers.parse_feed_item(media)
+        row["tag"] = tag
+        row["username"] = media.get("user", {}).get("username")
+        rows.append(row)
+    return rows, 1
+
+
+def reprocess(archive_root, out_dir, workers=None, since=None, max_posts=100, compress=False):
+    """아카이브 전체 재처리 - {profiles, tag_posts, responses, seconds, responses_per_sec} 반환"""
+    archive = RawArchive(archive_root)
+    profile_jobs, feed_pages, tag_jobs = plan_jobs(archive, since=since)
+    out_dir = Path(out_dir)
+    # 결과는 매번 새로 씀 (ResultSink는 추가 모드이므로 이전 재처리 결과를 먼저 제거)
+    for filename in (PROFILES_FILENAME, POSTS_FILENAME):
+        previous = find_ndjson(out_dir, filename)
+        if previous is not None:
+            previous.unlink()
+    sink = ResultSink(out_dir, compress=compress)
+    started = time.perf_counter()
+    responses = profiles = tag_posts = 0
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker, initargs=(archive_root, feed_pages, max_posts)) as pool:
+        for profile, count in pool.map(_reprocess_profile, profile_jobs, chunksize=32):
+            responses += count
+            if profile:
+                sink.write_profile(profile)
+                profiles += 1
+        with open(out_dir / TAG_POSTS_FILENAME, "w", encoding="utf-8") as f:
+            for rows, count in pool.map(_reprocess_tag, tag_jobs, chunksize=32):
+                responses += count
+                for row in rows:
+                    f.write(json.dumps(row, ensure_ascii=False) + "\n")
+                tag_posts += len(rows)
+    sink.close()
+    seconds = time.perf_counter() - started
+    return {
+        "profiles": profiles,
+        "tag_posts": tag_posts,
+        "responses": responses,
+        "seconds": round(seconds, 2),
+        "responses_per_sec": round(responses / seconds, 1) if seconds > 0 else None,
+    }
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--archive", type=str, default=os.environ.get("RAW_ARCHIVE_DIR", DEFAULT_ARCHIVE_DIR), help="원본 아카이브 경로 (기본값: cache/raw)")
+    parser.add_argument("--out", type=str, required=True, help="재처리 결과를 쓸 디렉토리 (이전 재처리 결과는 덮어씀)")
+    parser.add_argument("--workers", type=int, default=None, help="워커 프로세스 수 (기본값: CPU 수)")
+    parser.add_argument("--since", type=str, default=None, help="이 날짜(YYYY-MM-DD) 이후에 받은 응답만 재처리")
+    parser.add_argument("--max-posts", type=int, default=100, help="계정별 최대 게시물 수 (기본값: 100)")
+    parser.add_argument("--category", type=str, default="reprocessed", help="CSV/JSON 결과 파일 이름에 쓸 카테고리")
+    parser.add_argument("--gzip", action="store_true", help="결과 NDJSON을 gzip으로 압축해 기록")
+    parser.add_argument("--parquet-root", type=str, default=None, help="Parquet 데이터셋 루트 (지정 시 --hashtag 파티션으로 기록)")
+    parser.add_argument("--hashtag", type=str, default="reprocessed", help="Parquet 파티션에 쓸 해시태그")
+    args = parser.parse_args()
+
+    since = datetime.strptime(args.since, "%Y-%m-%d").timestamp() if args.since else None
+    stats = reprocess(args.archive, args.out, workers=args.workers, since=since, max_posts=args.max_posts, compress=args.gzip)
+    print(f"[INFO] 프로필 {stats['profiles']}개, 해시태그 게시물 {stats['tag_posts']}개 재처리")
+    print(f"[INFO] 응답 {stats['responses']}개 / {stats['seconds']}초 = {stats['responses_per_sec']} responses/sec")
+    export_run(args.out, args.category)
+    if args.parquet_root:
+        export_parquet(args.out, args.hashtag, args.parquet_root)
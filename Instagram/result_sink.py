@@ -0,0 +1,262 @@
+"""
+스트리밍 NDJSON 결과 저장소
+프로필이 파싱되는 즉시 profiles.ndjson(프로필 1줄)과 posts.ndjson(게시물 1줄씩)에 추가 기록하고,
+CSV/JSON 결과 파일은 실행이 끝난 뒤 NDJSON을 한 줄씩 읽어 변환합니다.
+크롤링 중에는 결과를 메모리에 모으지 않으므로 프로필 수와 관계없이 메모리 사용량이 일정합니다.
+
+사용법 (변환만 다시 실행): python result_sink.py <run_dir> [--category fashion]
+"""
+
+import argparse
+import csv
+import gzip
+import json
+import os
+import threading
+import zlib
+from pathlib import Path
+
+PROFILES_FILENAME = "profiles.ndjson"
+POSTS_FILENAME = "posts.ndjson"
+PROFILE_COLUMNS = [
+    'username', 'full_name', 'bio', 'is_verified', 'is_private',
+    'followers', 'following', 'posts', 'profile_pic_url', 'category',
+    'engagement_rate', 'ai_grade', 'ai_score'
+]
+
+
+def _open_text(path, mode):
+    """확장자가 .gz면 gzip 스트림으로 연다 (추가 모드에서는 gzip 멤버가 이어 붙음 - 재개 전 _repair_ndjson 필요)"""
+    path = Path(path)
+    if path.suffix == ".gz":
+        return gzip.open(path, mode + "t", encoding="utf-8")
+    return open(path, mode, encoding="utf-8")
+
+
+def find_ndjson(run_dir, filename):
+    """run_dir에서 filename 또는 filename.gz 경로 반환 (둘 다 없으면 None)"""
+    for path in (Path(run_dir) / filename, Path(run_dir) / f"{filename}.gz"):
+        if path.exists():
+            return path
+    return None
+
+
+def iter_ndjson(path):
+    """NDJSON(.gz 포함)을 한 줄씩 dict로 yield - 기록 도중 잘린 마지막 줄은 무시"""
+    if path is None or not Path(path).exists():
+        return
+    with _open_text(path, "r") as f:
+        try:
+            for line in f:
+                try:
+                    yield json.loads(line)
+                except json.JSONDecodeError:
+                    continue
+        except (EOFError, gzip.BadGzipFile, zlib.error):
+            # 강제 종료로 gzip 스트림이 끝까지 기록되지 않은 경우 읽은 데까지만 사용
+            return
+
+
+def _gzip_intact(path):
+    """gzip NDJSON이 끝까지 읽히고 마지막 줄이 줄바꿈으로 끝나는지"""
+    last = "\n"
+    try:
+        with gzip.open(path, "rt", encoding="utf-8") as f:
+            for last in f:
+                pass
+    except (EOFError, gzip.BadGzipFile, zlib.error):
+        return False
+    return last.endswith("\n")
+
+
+def _repair_ndjson(path):
+    """강제 종료로 잘린 꼬리를 정리해 이어 쓸 수 있게 함 (재개 시 ResultSink가 호출)
+
+    - 일반 파일: 마지막 줄바꿈 뒤의 잘린 줄을 잘라냄 (다음 줄과 붙어 둘 다 깨지는 것 방지)
+    - gzip: 끝나지 않은 멤버 뒤에 새 멤버를 이어 붙이면 그 뒤는 읽을 수 없으므로,
+      읽히는 완전한 줄만 새 gzip 파일로 다시 쓰고 원자적으로 교체
+    """
+    path = Path(path)
+    if not path.exists():
+        return
+    if path.suffix != ".gz":
+        with open(path, "rb+") as f:
+            end = f.seek(0, os.SEEK_END)
+            pos = end
+            keep = 0
+            while pos > 0:
+                start = max(0, pos - 65536)
+                f.seek(start)
+                newline = f.read(pos - start).rfind(b"\n")
+                if newline >= 0:
+                    keep = start + newline + 1
+                    break
+                pos = start
+            if keep < end:
+                f.truncate(keep)
+        return
+    if _gzip_intact(path):
+        return
+    tmp_path = path.with_name(f"{path.name}.{threading.get_ident()}.tmp")
+    kept = 0
+    with gzip.open(path, "rt", encoding="utf-8") as src, gzip.open(tmp_path, "wt", encoding="utf-8") as dst:
+        try:
+            for line in src:
+                if not line.endswith("\n"):
+                    break
+                dst.write(line)
+                kept += 1
+        except (EOFError, gzip.BadGzipFile, zlib.error):
+            pass
+    os.replace(tmp_path, path)
+    print(f"[INFO] 잘린 gzip 결과 파일 복구: {path.name} ({kept}줄 유지)")
+
+
+class ResultSink:
+    """프로필/게시물을 NDJSON으로 즉시 추가 기록하는 저장소 (스레드 안전)"""
+
+    def __init__(self, run_dir, compress=False):
+        self.run_dir = Path(run_dir)
+        self.run_dir.mkdir(parents=True, exist_ok=True)
+        suffix = ".gz" if compress else ""
+        # 재개 시에는 기존 파일 형식(gzip 여부)을 그대로 따름
+        self.profiles_path = find_ndjson(self.run_dir, PROFILES_FILENAME) or self.run_dir / f"{PROFILES_FILENAME}{suffix}"
+        self.posts_path = find_ndjson(self.run_dir, POSTS_FILENAME) or self.run_dir / f"{POSTS_FILENAME}{suffix}"
+        # 이전 실행이 강제 종료됐다면 잘린 꼬리를 정리한 뒤 이어 씀
+        _repair_ndjson(self.profiles_path)
+        _repair_ndjson(self.posts_path)
+        self._lock = threading.Lock()
+        self._profiles = _open_text(self.profiles_path, "a")
+        self._posts = _open_text(self.posts_path, "a")
+
+    def write_profile(self, profile):
+        """프로필 1줄 + 게시물 N줄 기록 (recent_posts_raw는 posts 파일로 분리)"""
+        username = profile['username']
+        row = {k: v for k, v in profile.items() if k != 'recent_posts_raw'}
+        profile_line = json.dumps(row, ensure_ascii=False) + "\n"
+        post_lines = "".join(
+            json.dumps(dict(post, username=username), ensure_ascii=False) + "\n"
+            for post in profile.get('recent_posts_raw') or []
+        )
+        with self._lock:
+            # 게시물을 먼저 기록해 프로필 줄이 있으면 그 게시물도 모두 있도록 함
+            self._posts.write(post_lines)
+            self._posts.flush()
+            self._profiles.write(profile_line)
+            self._profiles.flush()
+
+    def iter_profiles(self, usernames=None):
+        """기록된 프로필을 순서대로 yield (usernames가 주어지면 해당 계정만, 중복 기록은 첫 줄만)"""
+        seen = set()
+        for row in iter_ndjson(self.profiles_path):
+            username = row.get('username')
+            if username in seen or (usernames is not None and username not in usernames):
+                continue
+            seen.add(username)
+            yield row
+
+    def close(self):
+        with self._lock:
+            self._profiles.close()
+            self._posts.close()
+
+
+def export_csv(profiles_path, csv_path, columns=PROFILE_COLUMNS, usernames=None):
+    """profiles.ndjson -> CSV (utf-8-sig), 기록한 행 수 반환 (usernames가 주어지면 해당 계정만)"""
+    seen = set()
+    count = 0
+    with open(csv_path, "w", encoding="utf-8-sig", newline="") as f:
+        writer = csv.DictWriter(f, fieldnames=columns, extrasaction="ignore")
+        writer.writeheader()
+        for row in iter_ndjson(profiles_path):
+            if row.get('username') in seen or (usernames is not None and row.get('username') not in usernames):
+                continue
+            seen.add(row.get('username'))
+            writer.writerow(row)
+            count += 1
+    return count
+
+
+def iter_post_blocks(posts_path):
+    """posts.ndjson을 write_profile 1회분씩 (username, [게시물]) 블록으로 yield
+
+    같은 계정이 연달아 다시 기록된 경우(재개 직후 중단됐던 계정 재수집)는 이미 나온 게시물 id가 다시 나오면 새 블록으로 나눕니다.
+    """
+    current, block, ids = None, [], set()
+    for post in iter_ndjson(posts_path):
+        username = post.get('username')
+        post_id = post.get('id')
+        if block and (username != current or (post_id is not None and post_id in ids)):
+            yield current, block
+            block, ids = [], set()
+        current = username
+        block.append(post)
+        if post_id is not None:
+            ids.add(post_id)
+    if block:
+        yield current, block
+
+
+def iter_latest_post_blocks(posts_path, usernames=None):
+    """계정마다 마지막으로 기록된 블록만 yield (usernames가 주어지면 해당 계정만)
+
+    강제 종료 시 프로필 줄 없이 남은 일부 블록은 재개한 실행이 그 뒤에 온전한 블록으로 다시 기록하므로
+    마지막 블록을 씁니다. 파일을 두 번 읽어 블록 하나씩만 메모리에 올립니다.
+    """
+    last = {}
+    for index, (username, _) in enumerate(iter_post_blocks(posts_path)):
+        last[username] = index
+    for index, (username, block) in enumerate(iter_post_blocks(posts_path)):
+        if last[username] == index and (usernames is None or username in usernames):
+            yield username, block
+
+
+def export_posts_json(posts_path, json_path, usernames=None):
+    """posts.ndjson -> {username: [posts]} JSON
+
+    계정마다 마지막 블록(iter_latest_post_blocks)을 스트리밍으로 씁니다.
+    usernames가 주어지면 해당 계정만 (재개 전 중단된 실행이 남긴 프로필 없는 게시물 제외) 포함합니다.
+    """
+    written = 0
+    with open(json_path, "w", encoding="utf-8") as f:
+        f.write("{")
+        for username, posts in iter_latest_post_blocks(posts_path, usernames):
+            f.write(",\n" if written else "\n")
+            f.write(f"  {json.dumps(username, ensure_ascii=False)}: [")
+            for i, post in enumerate(posts):
+                post.pop('username', None)
+                f.write(",\n    " if i else "\n    ")
+                f.write(json.dumps(post, ensure_ascii=False))
+            f.write("\n  ]")
+            written += 1
+        f.write("\n}\n")
+    return written
+
+
+def export_run(run_dir, category):
+    """실행 디렉토리의 NDJSON을 기존 결과 파일(insta_{category}_profiles.csv, insta_{category}_recent_posts_full.json)로 변환"""
+    run_dir = Path(run_dir)
+    profiles_path = find_ndjson(run_dir, PROFILES_FILENAME)
+    if profiles_path is None:
+        return 0
+    csv_path = run_dir / f"insta_{category}_profiles.csv"
+    count = export_csv(profiles_path, csv_path)
+    if count == 0:
+        return 0
+    usernames = {row['username'] for row in iter_ndjson(profiles_path)}
+    json_path = run_dir / f"insta_{category}_recent_posts_full.json"
+    export_posts_json(find_ndjson(run_dir, POSTS_FILENAME), json_path, usernames=usernames)
+    print(f"[INFO] {count}개 계정 정보가 {csv_path}에 저장되었습니다.")
+    print(f"[INFO] 각 계정별 최근 게시물 원본 데이터가 {json_path}에 저장되었습니다.")
+    return count
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("run_dir", type=str, help="profiles.ndjson / posts.ndjson이 있는 실행 디렉토리")
+    parser.add_argument("--category", type=str, default=None, help="결과 파일 이름에 쓸 카테고리 (기본값: 디렉토리 이름에서 추출)")
+    args = parser.parse_args()
+    # 실행 디렉토리 이름: {YYYY-MM-DD}_{HH}_{MM}_{category}
+    category = args.category or Path(args.run_dir).name.split("_", 3)[-1]
+    if not export_run(args.run_dir, category):
+        print("수집된 프로필 데이터가 없습니다.")
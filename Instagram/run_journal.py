@@ -0,0 +1,125 @@
+"""
+크롤링 실행 저널 (추가 전용 NDJSON)
+실행 디렉토리의 run_journal.ndjson에 해시태그 페이지 커서, 발견한 작성자, 완료된 username을 한 줄씩 기록합니다.
+프로세스가 중간에 종료되어도 저널을 다시 읽어 완료된 작업은 건너뛰고 남은 작성자와 태그 커서부터 이어서 수집합니다.
+"""
+
+import json
+import os
+import threading
+import time
+from pathlib import Path
+
+JOURNAL_FILENAME = "run_journal.ndjson"
+
+
+class RunJournal:
+    """실행 1회분의 추가 전용 저널 (스레드 안전)
+
+    기록 종류:
+      start   - 실행 설정 (category, max_count, max_user_posts, 실행 모드 설정 frontier / batch)
+      page    - 해시태그 페이지에서 새로 발견한 작성자와 다음 페이지 커서
+      source  - 일괄 실행에서 작성자가 새로 나온 (해시태그, 국가)들
+      profile - 수집 완료된 username (프로필 데이터는 ResultSink의 NDJSON에 기록)
+      failed  - 프로필 수집 실패 (재개 시 다시 시도)
+      finish  - 결과 파일 저장까지 완료
+    """
+
+    def __init__(self, run_dir):
+        self.run_dir = Path(run_dir)
+        self.path = self.run_dir / JOURNAL_FILENAME
+        self._lock = threading.Lock()
+        # 첫 기록 전에 잘린 마지막 줄을 정리했는지
+        self._trimmed = False
+
+    def exists(self):
+        return self.path.exists()
+
+    def _append(self, record):
+        record["ts"] = time.time()
+        line = json.dumps(record, ensure_ascii=False) + "\n"
+        with self._lock:
+            if not self._trimmed:
+                self._trim_partial_line()
+                self._trimmed = True
+            with open(self.path, "a", encoding="utf-8") as f:
+                f.write(line)
+                f.flush()
+                os.fsync(f.fileno())
+
+    def _trim_partial_line(self):
+        """강제 종료로 줄 중간에서 끊긴 마지막 기록을 잘라냄 (재개 후 첫 기록이 그 뒤에 붙어 함께 버려지지 않도록)"""
+        if not self.path.exists():
+            return
+        with open(self.path, "rb+") as f:
+            data = f.read()
+            if data and not data.endswith(b"\n"):
+                f.truncate(data.rfind(b"\n") + 1)
+
+    def record_start(self, category, max_count, max_user_posts, **options):
+        """options는 실행 모드 설정 (frontier / batch 등, None이면 기록 안 함) - 재개 시 같은 설정으로 다시 시작"""
+        self.run_dir.mkdir(parents=True, exist_ok=True)
+        record = {"type": "start", "category": category, "max_count": max_count, "max_user_posts": max_user_posts}
+        record.update({key: value for key, value in options.items() if value is not None})
+        self._append(record)
+
+    def record_page(self, authors, cursor):
+        self._append({"type": "page", "authors": list(authors), "cursor": cursor})
+
+    def record_source(self, username, targets):
+        """targets: 작성자가 나온 [(해시태그, 국가)] - 재개 시 출처/국가를 복원"""
+        self._append({"type": "source", "username": username, "targets": [list(target) for target in targets]})
+
+    def record_profile(self, username):
+        self._append({"type": "profile", "username": username})
+
+    def record_failed(self, username):
+        self._append({"type": "failed", "username": username})
+
+    def record_finish(self):
+        self._append({"type": "finish"})
+
+    def replay(self):
+        """저널을 처음부터 읽어 현재 상태를 복원
+
+        반환값: {meta, authors(발견 순서), cursor, tag_exhausted, sources(username -> [(해시태그, 국가)] 발견 순서),
+                 completed(username 집합), failed, finished}
+        마지막 줄이 기록 도중 잘린 경우 해당 줄은 무시합니다.
+        """
+        state = {
+            "meta": None,
+            "authors": [],
+            "cursor": None,
+            "tag_exhausted": False,
+            "sources": {},
+            "completed": set(),
+            "failed": set(),
+            "finished": False,
+        }
+        if not self.path.exists():
+            return state
+        with open(self.path, "r", encoding="utf-8") as f:
+            for line in f:
+                try:
+                    record = json.loads(line)
+                except json.JSONDecodeError:
+                    continue
+                kind = record.get("type")
+                if kind == "start":
+                    state["meta"] = record
+                elif kind == "page":
+                    state["authors"].extend(record["authors"])
+                    state["cursor"] = record["cursor"]
+                    state["tag_exhausted"] = record["cursor"] is None
+                elif kind == "source":
+                    state["sources"].setdefault(record["username"], []).extend(
+                        tuple(target) for target in record["targets"]
+                    )
+                elif kind == "profile":
+                    state["completed"].add(record["username"])
+                    state["failed"].discard(record["username"])
+                elif kind == "failed":
+                    state["failed"].add(record["username"])
+                elif kind == "finish":
+                    state["finished"] = True
+        return state
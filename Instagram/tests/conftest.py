@@ -0,0 +1,7 @@
+import sys
+from pathlib import Path
+
+# 크롤러 모듈은 Instagram/ 디렉토리 기준으로 import 함
+INSTAGRAM_DIR = Path(__file__).resolve().parent.parent
+if str(INSTAGRAM_DIR) not in sys.path:
+    sys.path.insert(0, str(INSTAGRAM_DIR))
@@ -0,0 +1,25 @@
+from caption_features import CaptionExtractor, features_for
+from records import PostRecord
+
+
+def test_extractor_vocabulary_and_hooks():
+    extractor = CaptionExtractor(["새트리거", "맛집투어"], hook_patterns={"tips": ["꿀팁"], "story": ["경험담"]})
+    features = features_for({'caption': "새트리거 경험담 꿀팁 #맛집투어 #일상"}, extractor=extractor)
+    assert features.has("새트리거")
+    assert features.tags_matching(["맛집투어"]) == 1
+    # 순서대로 처음 맞는 훅 유형
+    assert features.hook_type == "tips"
+
+    # 기본 추출기는 지식 베이스 어휘를 모름
+    default = features_for({'caption': "새트리거 경험담 댓글"})
+    assert not default.has("새트리거") and default.hook_type is None
+    assert default.has_cta
+
+
+def test_post_record_features_follow_extractor():
+    post = PostRecord.from_dict({'id': "1", 'caption': "오늘의 새트리거 #먹방"})
+    first = features_for(post)
+    assert features_for(post) is first
+    extractor = CaptionExtractor(["새트리거"])
+    assert features_for(post, extractor=extractor).has("새트리거")
+    assert post._features.extractor is extractor
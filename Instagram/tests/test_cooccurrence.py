@@ -0,0 +1,76 @@
+import json
+import math
+
+from cooccurrence import CooccurrenceIndex
+
+
+def _posts():
+    # food / yum / tasty는 자주 함께, travel / beach는 함께, daily는 어디에나
+    return (
+        [{'hashtags': ['food', 'yum', 'tasty', 'daily']}] * 6
+        + [{'hashtags': ['food', 'yum']}] * 2
+        + [{'hashtags': ['travel', 'beach', 'daily']}] * 6
+        + [{'hashtags': ['daily', 'ootd']}] * 6
+    )
+
+
+def _index(tmp_path=None, **kwargs):
+    state_path = tmp_path / "state.json" if tmp_path else None
+    index = CooccurrenceIndex(state_path=state_path, rebuild_interval=math.inf, **kwargs)
+    index.observe_posts(_posts())
+    index.rebuild()
+    return index
+
+
+def test_related_ranks_cooccurring_tags_and_skips_inputs():
+    related = _index().related(['#Food'], limit=5)
+    assert [row['tag'] for row in related] == ['yum', 'tasty']
+    assert related[0]['score'] > 0 and related[0]['support'] == 8
+    # daily는 어디에나 붙어 PMI가 양수가 아님
+    assert 'daily' not in {row['tag'] for row in related}
+
+
+def test_related_sums_scores_over_inputs_and_honours_exclude():
+    index = _index()
+    related = index.related(['food', 'yum'], limit=5)
+    pmi = {(tag, row['tag']): row['pmi'] for tag in ('food', 'yum') for row in index.neighbors(tag)}
+    assert related[0]['tag'] == 'tasty'
+    assert math.isclose(related[0]['score'], pmi[('food', 'tasty')] + pmi[('yum', 'tasty')], abs_tol=0.01)
+    assert related[0]['support'] == 12
+    assert index.related(['food', 'yum'], limit=5, exclude=['#tasty']) == []
+    # 강하게 묶인 태그가 어디에나 붙는 태그보다 먼저
+    tags = [row['tag'] for row in index.related(['food', 'travel'], limit=5)]
+    assert set(tags[:3]) == {'yum', 'tasty', 'beach'} and tags[-1] == 'daily'
+
+
+def test_min_pair_count_filters_rare_pairs():
+    index = _index(min_pair_count=7)
+    assert [row['tag'] for row in index.related(['food'])] == ['yum']
+
+
+def test_queries_do_not_rebuild_on_request_path():
+    index = CooccurrenceIndex(state_path=None, rebuild_interval=math.inf)
+    index.observe_posts(_posts())
+    assert index.related(['food']) == []
+    assert index.stats()['pending']
+    index.rebuild()
+    assert index.related(['food'])
+
+
+def test_recrawled_posts_are_counted_once_per_account():
+    index = CooccurrenceIndex(state_path=None, rebuild_interval=math.inf)
+    posts = [{'hashtags': ['a', 'b'], 'taken_at_timestamp': 100 + i} for i in range(3)]
+    assert index.observe_posts(posts, username='alice') == 3
+    assert index.observe_posts(posts, username='alice') == 0
+    assert index.stats()['posts'] == 3
+
+
+def test_snapshot_is_persisted_and_served_after_restart(tmp_path):
+    index = _index(tmp_path)
+    expected = index.related(['food'])
+    index.save()
+    assert 'snapshot' in json.loads((tmp_path / "state.json").read_text(encoding="utf-8"))
+
+    restarted = CooccurrenceIndex(state_path=tmp_path / "state.json", rebuild_interval=math.inf)
+    assert restarted.related(['food']) == expected
+    assert not restarted.stats()['pending']
@@ -0,0 +1,82 @@
+import json
+
+import pytest
+
+pytest.importorskip("pyarrow")
+pytest.importorskip("pandas")
+
+from parquet_writer import export_parquet, load_dataset  # noqa: E402
+from result_sink import ResultSink  # noqa: E402
+
+
+def _profile(username, posts=2, followers=100):
+    return {
+        'username': username,
+        'full_name': username.upper(),
+        'followers': followers,
+        'engagement_rate': 1.5,
+        'recent_posts_raw': [
+            {'id': f"{username}_{i}", 'shortcode': f"s{i}", 'is_reel': i == 0, 'hashtags': ['food', 'yum'],
+             'music': {'song_name': 'song', 'artist_name': 'artist'} if i == 0 else None,
+             'like_count': 10 + i, 'comment_count': 1, 'taken_at_timestamp': 1700000000 + i}
+            for i in range(posts)
+        ],
+    }
+
+
+def _run(tmp_path, name, usernames):
+    run_dir = tmp_path / "runs" / name
+    sink = ResultSink(run_dir)
+    for username in usernames:
+        sink.write_profile(_profile(username))
+    sink.close()
+    return run_dir
+
+
+def test_round_trip_with_partition_filters(tmp_path):
+    root = tmp_path / "datasets"
+    # '/'와 공백이 들어간 해시태그는 URI 인코딩된 디렉토리에 기록
+    escaped_tag = "맛집 추천/서울"
+    assert export_parquet(_run(tmp_path, "r1", ["a", "b"]), "food", root, crawl_date="2024-01-01") == {"profiles": 2, "posts": 4}
+    assert export_parquet(_run(tmp_path, "r2", ["c"]), escaped_tag, root, crawl_date="2024-01-02") == {"profiles": 1, "posts": 2}
+    assert export_parquet(_run(tmp_path, "r3", ["d"]), "food", root, crawl_date="2024-02-01") == {"profiles": 1, "posts": 2}
+    assert [path.name for path in (root / "posts" / "crawl_date=2024-01-02").iterdir()] == [
+        "hashtag=%EB%A7%9B%EC%A7%91%20%EC%B6%94%EC%B2%9C%2F%EC%84%9C%EC%9A%B8"
+    ]
+
+    profiles = load_dataset(root, "profiles")
+    assert sorted(profiles["username"]) == ["a", "b", "c", "d"]
+    assert set(profiles["run_id"]) == {"r1", "r2", "r3"}
+    row = profiles[profiles["username"] == "a"].iloc[0]
+    assert row["full_name"] == "A" and row["followers"] == 100 and row["engagement_rate"] == 1.5
+
+    january = load_dataset(root, "posts", start_date="2024-01-01", end_date="2024-01-31")
+    assert sorted(set(january["username"])) == ["a", "b", "c"]
+
+    escaped = load_dataset(root, "posts", hashtags=[escaped_tag])
+    assert sorted(escaped["id"]) == ["c_0", "c_1"]
+    assert set(escaped["hashtag"]) == {escaped_tag}
+
+    food = load_dataset(root, "posts", start_date="2024-02-01", hashtags=["food"], columns=["id", "music_song_name", "hashtags"])
+    assert list(food.columns) == ["id", "music_song_name", "hashtags"]
+    by_id = food.set_index("id")
+    assert by_id.loc["d_0", "music_song_name"] == "song"
+    assert list(by_id.loc["d_0", "hashtags"]) == ["food", "yum"]
+
+
+def test_posts_keep_last_block_and_require_profile(tmp_path):
+    run_dir = _run(tmp_path, "r1", ["a"])
+    with open(run_dir / "posts.ndjson", "a", encoding="utf-8") as f:
+        # 프로필 줄 없이 남은 게시물 (강제 종료) - 결과에서 제외
+        f.write(json.dumps({'id': "orphan_0", 'username': "orphan"}) + "\n")
+        # 중단됐던 b의 일부 블록 뒤에 재개한 실행이 온전한 블록을 기록
+        f.write(json.dumps({'id': "b_0", 'username': "b"}) + "\n")
+    sink = ResultSink(run_dir)
+    sink.write_profile(_profile("b", posts=3))
+    sink.close()
+
+    root = tmp_path / "datasets"
+    assert export_parquet(run_dir, "food", root, crawl_date="2024-01-01") == {"profiles": 2, "posts": 5}
+    posts = load_dataset(root, "posts")
+    assert sorted(posts["id"]) == ["a_0", "a_1", "b_0", "b_1", "b_2"]
+    assert posts[posts["id"] == "b_2"].iloc[0]["like_count"] == 12
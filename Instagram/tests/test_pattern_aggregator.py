@@ -0,0 +1,30 @@
+import math
+
+import pattern_aggregator
+from pattern_aggregator import PatternAggregator
+
+
+def _profile(username, *timestamps):
+    posts = [{'taken_at_timestamp': ts, 'like_count': 10, 'comment_count': 1, 'caption': '#food'} for ts in timestamps]
+    return {'username': username, 'followers': 1000, 'recent_posts_raw': posts}
+
+
+def _aggregator(tmp_path):
+    return PatternAggregator(tmp_path / "state.json", tmp_path / "patterns.json", publish_interval=math.inf)
+
+
+def test_recrawled_posts_are_not_counted_twice(tmp_path):
+    aggregator = _aggregator(tmp_path)
+    assert aggregator.observe_profile(_profile("alice", 100, 200)) == 2
+    assert aggregator.observe_profile(_profile("alice", 100, 200)) == 0
+    assert aggregator.observe_profile(_profile("alice", 200, 300)) == 1
+
+
+def test_watermarks_are_capped_least_recently_seen_first(tmp_path, monkeypatch):
+    monkeypatch.setattr(pattern_aggregator, "MAX_TRACKED_ACCOUNTS", 2)
+    aggregator = _aggregator(tmp_path)
+    aggregator.observe_profile(_profile("a", 100))
+    aggregator.observe_profile(_profile("b", 100))
+    aggregator.observe_profile(_profile("a", 200))
+    aggregator.observe_profile(_profile("c", 100))
+    assert list(aggregator._watermarks) == ["a", "c"]
@@ -0,0 +1,38 @@
+from post_normalizer import GRAPHQL, REST, OUTPUT_FIELDS, _bench_payloads, normalize, normalize_records
+
+
+def test_reel_payloads_normalize_to_same_shape():
+    for shape, item in _bench_payloads().items():
+        post = normalize(item, shape)
+        assert list(post) == list(OUTPUT_FIELDS)
+        assert post['is_reel'] is True and post['post_type'] == 'reel'
+        assert post['hashtags'][:3] == ['먹방', 'food', '맛집']
+        assert post['like_count'] == 5 and post['comment_count'] == 2 and post['view_count'] == 100
+        assert post['thumbnail_url'] == post['media_url'] == "https://example.com/p.jpg"
+        assert post['video_url'] == "https://example.com/v.mp4"
+        assert post['music']['song_name'] == "song" and post['music']['artist_name'] == "artist"
+
+
+def test_missing_fields_use_defaults():
+    assert normalize({}, GRAPHQL) == {
+        'id': None, 'shortcode': '', 'is_reel': False, 'post_type': 'post', 'media_type': None, 'caption': '',
+        'hashtags': [], 'music': None, 'like_count': 0, 'comment_count': 0, 'view_count': None,
+        'thumbnail_url': '', 'media_url': '', 'video_url': None, 'taken_at_timestamp': None,
+    }
+    # 경로 중간의 형식이 다르면(빈 목록 / 문자열) 기본값
+    post = normalize({'caption': 'text', 'image_versions2': {'candidates': []}, 'video_versions': 'x'}, REST)
+    assert post['caption'] == '' and post['thumbnail_url'] == '' and post['video_url'] is None
+
+
+def test_music_falls_back_only_for_reels():
+    item = {'media_type': 2, 'view_count': 0, 'play_count': 7, 'audio': {'audio_asset_id': 'a1'}}
+    post = normalize(item, REST)
+    assert post['view_count'] == 7
+    assert post['music'] == {'song_name': 'a1', 'artist_name': '', 'should_mute_audio': False}
+    assert normalize(dict(item, media_type=1), REST)['music'] is None
+
+
+def test_records_match_dicts():
+    for shape, item in _bench_payloads().items():
+        record, = normalize_records([item], shape)
+        assert record.to_dict() == normalize(item, shape)
@@ -0,0 +1,19 @@
+import pytest
+
+from profile_cache import NegativeCache, negative_reason_for_status
+
+
+@pytest.mark.parametrize("status_code", [401, 403, 429])
+def test_session_statuses_are_not_negatively_cached(status_code):
+    assert negative_reason_for_status(status_code) is None
+
+
+def test_profile_statuses_are_negatively_cached(tmp_path):
+    assert negative_reason_for_status(404) == "not_found"
+    assert negative_reason_for_status(500) == "error"
+
+    cache = NegativeCache(tmp_path / "negative.json")
+    cache.add("Alice", negative_reason_for_status(404), 404)
+    assert cache.check("alice")["reason"] == "not_found"
+    # 디스크에서 다시 읽어도 유지
+    assert NegativeCache(tmp_path / "negative.json").check("ALICE")["status_code"] == 404
@@ -0,0 +1,62 @@
+import pytest
+
+from rate_scheduler import RateScheduler
+
+CONFIG = {"rate": 1.0, "max_rate": 2.0}
+
+
+def _rates(scheduler, account="acc", endpoint="profile"):
+    account_bucket, endpoint_bucket = scheduler._buckets_for(account, endpoint)
+    return account_bucket.rate, endpoint_bucket.rate
+
+
+@pytest.fixture
+def scheduler():
+    return RateScheduler(endpoint_rates={"profile": dict(CONFIG)}, account_rate=dict(CONFIG))
+
+
+def test_success_increases_rate(scheduler):
+    scheduler.feedback("acc", "profile", status_code=200)
+    assert _rates(scheduler) == (pytest.approx(1.02), pytest.approx(1.02))
+
+
+def test_throttle_halves_rate_and_drains_burst(scheduler):
+    scheduler.feedback("acc", "profile", status_code=429)
+    account_bucket, endpoint_bucket = scheduler._buckets_for("acc", "profile")
+    assert endpoint_bucket.rate == pytest.approx(0.5)
+    assert endpoint_bucket.tokens <= 0
+    assert endpoint_bucket.throttled == 1
+    assert account_bucket.rate == pytest.approx(0.5)
+
+
+@pytest.mark.parametrize("kwargs", [
+    {"status_code": 401},
+    {"status_code": 403},
+    {"status_code": 500},
+    {"status_code": 503},
+    {"error": True},
+])
+def test_blocks_and_errors_back_off(scheduler, kwargs):
+    scheduler.feedback("acc", "profile", **kwargs)
+    assert _rates(scheduler) == (pytest.approx(0.8), pytest.approx(0.8))
+
+
+@pytest.mark.parametrize("status_code", [400, 404])
+def test_other_client_errors_are_neutral(scheduler, status_code):
+    scheduler.feedback("acc", "profile", status_code=status_code)
+    assert _rates(scheduler) == (1.0, 1.0)
+
+
+def test_rate_stays_within_bounds(scheduler):
+    for _ in range(200):
+        scheduler.feedback("acc", "profile", status_code=200)
+    assert _rates(scheduler) == (2.0, 2.0)
+    for _ in range(200):
+        scheduler.feedback("acc", "profile", status_code=429)
+    account_bucket, endpoint_bucket = scheduler._buckets_for("acc", "profile")
+    assert endpoint_bucket.rate == endpoint_bucket.min_rate
+
+
+def test_accounts_are_independent(scheduler):
+    scheduler.feedback("a", "profile", status_code=429)
+    assert _rates(scheduler, account="b") == (1.0, 1.0)
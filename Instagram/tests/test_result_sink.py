@@ -0,0 +1,111 @@
+import csv
+import json
+import shutil
+
+import pytest
+
+from result_sink import (
+    POSTS_FILENAME,
+    PROFILES_FILENAME,
+    ResultSink,
+    export_run,
+    iter_latest_post_blocks,
+    iter_ndjson,
+)
+
+
+def _profile(username, posts=2):
+    return {
+        'username': username,
+        'followers': 100,
+        'recent_posts_raw': [{'id': f"{username}_{i}", 'likes': i} for i in range(posts)],
+    }
+
+
+def _crash_copy(sink, crashed_dir):
+    """닫지 않은(강제 종료된) 실행의 파일을 그대로 복사 - gzip 끝 표시가 없는 상태"""
+    crashed_dir.mkdir()
+    for path in (sink.profiles_path, sink.posts_path):
+        shutil.copyfile(path, crashed_dir / path.name)
+    sink.close()
+
+
+def test_iter_ndjson_reads_unterminated_gzip(tmp_path):
+    sink = ResultSink(tmp_path / "run", compress=True)
+    for name in ("a", "b"):
+        sink.write_profile(_profile(name))
+    _crash_copy(sink, tmp_path / "crashed")
+
+    rows = list(iter_ndjson(tmp_path / "crashed" / f"{PROFILES_FILENAME}.gz"))
+    assert [row['username'] for row in rows] == ["a", "b"]
+
+
+def test_gzip_resume_after_crash_keeps_all_rows(tmp_path):
+    sink = ResultSink(tmp_path / "run", compress=True)
+    for name in ("a", "b", "c"):
+        sink.write_profile(_profile(name))
+    run_dir = tmp_path / "crashed"
+    _crash_copy(sink, run_dir)
+
+    # 재개: 기존 .gz 형식을 따라 이어 씀
+    resumed = ResultSink(run_dir, compress=False)
+    assert resumed.profiles_path.name == f"{PROFILES_FILENAME}.gz"
+    for name in ("d", "e"):
+        resumed.write_profile(_profile(name))
+    resumed.close()
+
+    assert [row['username'] for row in iter_ndjson(resumed.profiles_path)] == ["a", "b", "c", "d", "e"]
+    assert len(list(iter_ndjson(run_dir / f"{POSTS_FILENAME}.gz"))) == 10
+
+    assert export_run(run_dir, "test") == 5
+    with open(run_dir / "insta_test_profiles.csv", encoding="utf-8-sig") as f:
+        assert [row['username'] for row in csv.DictReader(f)] == ["a", "b", "c", "d", "e"]
+    with open(run_dir / "insta_test_recent_posts_full.json", encoding="utf-8") as f:
+        posts = json.load(f)
+    assert sorted(posts) == ["a", "b", "c", "d", "e"]
+    assert all(len(rows) == 2 for rows in posts.values())
+
+
+def test_plain_resume_drops_truncated_line(tmp_path):
+    sink = ResultSink(tmp_path, compress=False)
+    sink.write_profile(_profile("a"))
+    sink.close()
+    # 줄 중간에서 끊긴 기록
+    with open(sink.profiles_path, "a", encoding="utf-8") as f:
+        f.write('{"username": "trunc')
+
+    resumed = ResultSink(tmp_path)
+    resumed.write_profile(_profile("b"))
+    resumed.close()
+
+    assert [row['username'] for row in iter_ndjson(resumed.profiles_path)] == ["a", "b"]
+
+
+def _write_partial_posts(sink, username, count):
+    """게시물 일부만 기록하고 프로필 줄은 쓰지 못한 채 강제 종료된 상태"""
+    with open(sink.posts_path, "a", encoding="utf-8") as f:
+        for post in _profile(username, count)['recent_posts_raw']:
+            f.write(json.dumps(dict(post, username=username)) + "\n")
+
+
+@pytest.mark.parametrize("resumed_order", [["c", "d"], ["d", "c"]])
+def test_resumed_block_replaces_partial_block(tmp_path, resumed_order):
+    sink = ResultSink(tmp_path)
+    sink.write_profile(_profile("a", 3))
+    _write_partial_posts(sink, "c", 1)
+    sink.close()
+
+    # 재개: 중단됐던 c를 다시 수집 (바로 다음이든 다른 계정 뒤든)
+    resumed = ResultSink(tmp_path)
+    for name in resumed_order:
+        resumed.write_profile(_profile(name, 3))
+    resumed.close()
+
+    blocks = dict(iter_latest_post_blocks(resumed.posts_path))
+    assert [post['id'] for post in blocks["c"]] == ["c_0", "c_1", "c_2"]
+
+    assert export_run(tmp_path, "test") == 3
+    with open(tmp_path / "insta_test_recent_posts_full.json", encoding="utf-8") as f:
+        posts = json.load(f)
+    assert {username: len(rows) for username, rows in posts.items()} == {"a": 3, "c": 3, "d": 3}
+    assert "username" not in posts["c"][0]
@@ -0,0 +1,80 @@
+from run_journal import RunJournal
+
+
+def test_replay_restores_batch_sources(tmp_path):
+    journal = RunJournal(tmp_path)
+    journal.record_start("batch", 10, 5, batch={"targets": [["fitness", "kr"], ["gym", "us"]]})
+    journal.record_source("alice", [("fitness", "kr")])
+    journal.record_source("bob", [("gym", "us")])
+    journal.record_source("alice", [("gym", "us")])
+    journal.record_profile("alice")
+
+    state = RunJournal(tmp_path).replay()
+    assert state["meta"]["batch"]["targets"] == [["fitness", "kr"], ["gym", "us"]]
+    assert state["sources"] == {
+        "alice": [("fitness", "kr"), ("gym", "us")],
+        "bob": [("gym", "us")],
+    }
+    assert state["completed"] == {"alice"}
+
+
+def test_replay_of_missing_journal_is_empty(tmp_path):
+    journal = RunJournal(tmp_path / "new")
+    assert not journal.exists()
+    state = journal.replay()
+    assert state["meta"] is None and state["authors"] == [] and state["cursor"] is None
+    assert state["completed"] == set() and not state["finished"]
+
+
+def test_replay_restores_progress_for_resume(tmp_path):
+    journal = RunJournal(tmp_path)
+    journal.record_start("food", 20, 30, frontier={"max_requests": 5})
+    journal.record_page(["a", "b"], {"tab": "recent", "max_id": "m1"})
+    journal.record_profile("a")
+    journal.record_failed("b")
+    journal.record_page(["c"], {"tab": "recent", "max_id": "m2"})
+
+    state = RunJournal(tmp_path).replay()
+    assert state["meta"]["category"] == "food"
+    assert (state["meta"]["max_count"], state["meta"]["max_user_posts"]) == (20, 30)
+    assert state["meta"]["frontier"] == {"max_requests": 5}
+    assert state["authors"] == ["a", "b", "c"]
+    # 재개 시 마지막 커서부터 다음 페이지를 요청
+    assert state["cursor"] == {"tab": "recent", "max_id": "m2"}
+    assert not state["tag_exhausted"]
+    assert state["completed"] == {"a"}
+    assert state["failed"] == {"b"}
+    assert not state["finished"]
+
+
+def test_retried_profile_leaves_failed_set(tmp_path):
+    journal = RunJournal(tmp_path)
+    journal.record_start("food", 5, 10)
+    journal.record_failed("a")
+    journal.record_profile("a")
+    state = journal.replay()
+    assert state["completed"] == {"a"} and state["failed"] == set()
+
+
+def test_last_page_and_finish(tmp_path):
+    journal = RunJournal(tmp_path)
+    journal.record_start("food", 5, 10)
+    journal.record_page(["a"], None)
+    journal.record_finish()
+    state = journal.replay()
+    assert state["tag_exhausted"] and state["cursor"] is None
+    assert state["finished"]
+
+
+def test_truncated_last_line_is_dropped_on_resume(tmp_path):
+    journal = RunJournal(tmp_path)
+    journal.record_start("food", 5, 10)
+    journal.record_profile("a")
+    # 기록 도중 강제 종료
+    with open(journal.path, "a", encoding="utf-8") as f:
+        f.write('{"type": "profile", "usern')
+    state = RunJournal(tmp_path).replay()
+    assert state["completed"] == {"a"}
+    # 재개 후 첫 기록이 잘린 줄에 붙어 함께 버려지지 않음
+    RunJournal(tmp_path).record_profile("b")
+    assert RunJournal(tmp_path).replay()["completed"] == {"a", "b"}
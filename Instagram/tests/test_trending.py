@@ -0,0 +1,46 @@
+import random
+from collections import Counter
+
+from trending import SpaceSaving
+
+
+def test_exact_counts_below_capacity():
+    counter = SpaceSaving(capacity=10)
+    for tag, weight in [("a", 1), ("b", 2), ("a", 3), ("c", 0.5)]:
+        counter.add(tag, weight)
+    assert counter.top(3) == [("a", 4, 0.0), ("b", 2, 0.0), ("c", 0.5, 0.0)]
+
+
+def test_evicted_minimum_becomes_error_of_new_tag():
+    counter = SpaceSaving(capacity=2)
+    counter.add("a", 5)
+    counter.add("b", 1)
+    counter.add("c", 2)
+    assert "b" not in counter.counters
+    assert counter.counters["c"] == [3, 1]
+
+
+def test_heavy_hitters_survive_with_bounded_error():
+    rng = random.Random(0)
+    # 상위 5개 태그가 전체의 절반, 나머지는 1000개 태그에 고르게
+    stream = [f"hot{rng.randrange(5)}" if rng.random() < 0.5 else f"cold{rng.randrange(1000)}" for _ in range(20000)]
+    counter = SpaceSaving(capacity=50)
+    for tag in stream:
+        counter.add(tag, 1)
+    truth = Counter(stream)
+    assert {tag for tag, _, _ in counter.top(5)} == {f"hot{i}" for i in range(5)}
+    for tag, (count, error) in counter.counters.items():
+        # count는 실제 빈도의 상한, count - error는 하한
+        assert count - error <= truth[tag] <= count
+    assert len(counter.counters) == 50
+
+
+def test_top_is_refreshed_after_add_and_scale():
+    counter = SpaceSaving(capacity=10)
+    counter.add("a", 2)
+    counter.add("b", 1)
+    assert counter.top(1) == [("a", 2, 0.0)]
+    counter.add("b", 5)
+    assert counter.top(1) == [("b", 6, 0.0)]
+    counter.scale(0.5)
+    assert counter.top(2) == [("b", 3, 0.0), ("a", 1, 0.0)]
@@ -0,0 +1,302 @@
+"""
+실시간 트렌딩 해시태그 (시간 감쇠 Space-Saving)
+크롤러가 저장하는 프로필의 게시물(정규화된 hashtags)을 (카테고리, 국가)별 스트림에 더하고,
+스트림마다 최대 capacity개의 카운터만 유지하는 Space-Saving 구조로 상위 해시태그를 추적합니다.
+- 감쇠는 forward decay: 게시 시각 t의 가중치를 2^((t - landmark) / half_life)로 더해 두고,
+  조회 시 2^((now - landmark) / half_life)로 나누므로 카운터를 주기적으로 줄이는 작업이 없습니다.
+- 카운터 수가 고정이라 게시물이 수백만 개여도 메모리가 일정하고, 상위 k개는 스트림이 바뀔 때만 다시 계산합니다.
+- 카테고리는 캡션 특징 키워드 점수(pattern_aggregator.post_category), 국가는 크롤러의 country입니다.
+  모든 카테고리 / 모든 국가를 합친 스트림("*")도 함께 갱신합니다.
+
+벤치마크: python trending.py --bench [--count 1000000]
+"""
+
+import argparse
+import heapq
+import json
+import math
+import os
+import random
+import threading
+import time
+from collections import OrderedDict
+from pathlib import Path
+
+from pattern_aggregator import ALL_COUNTRIES, UNKNOWN_COUNTRY, post_category
+
+DEFAULT_STATE_PATH = "cache/trending_state.json"
+DEFAULT_HALF_LIFE = 24 * 3600
+# 스트림당 카운터 수 (상위 k개 추정 오차는 전체 가중치 / capacity 이하)
+DEFAULT_CAPACITY = 256
+DEFAULT_SAVE_INTERVAL = 60
+ALL_CATEGORIES = "*"
+# 중복 집계 방지용으로 마지막 게시 시각을 기억하는 최대 계정 수 (오래 안 본 계정부터 잊음)
+MAX_TRACKED_ACCOUNTS = 100000
+# landmark 이후 가중치 지수가 이 값을 넘으면 모든 카운터를 다시 정규화 (부동소수점 범위 유지)
+_RENORMALIZE_EXPONENT = 64.0
+
+
+class SpaceSaving:
+    """가중치 Space-Saving 카운터 (tag -> [count, error])
+
+    카운터가 가득 차면 가장 작은 카운터를 새 태그에 넘겨주고, 넘겨받은 값을 error로 기록합니다.
+    최솟값은 지연 삭제 힙으로 찾습니다 (힙이 capacity의 4배를 넘으면 다시 만듦).
+    """
+    __slots__ = ("capacity", "counters", "_heap", "_top", "version")
+
+    def __init__(self, capacity=DEFAULT_CAPACITY, counters=None):
+        self.capacity = capacity
+        self.counters = counters or {}
+        self._rebuild_heap()
+        self._top = None
+        self.version = 0
+
+    def _rebuild_heap(self):
+        self._heap = [(entry[0], tag) for tag, entry in self.counters.items()]
+        heapq.heapify(self._heap)
+
+    def _pop_min(self):
+        heap, counters = self._heap, self.counters
+        while True:
+            count, tag = heapq.heappop(heap)
+            entry = counters.get(tag)
+            if entry is not None and entry[0] == count:
+                return tag, entry
+
+    def add(self, tag, weight):
+        entry = self.counters.get(tag)
+        if entry is not None:
+            entry[0] += weight
+        elif len(self.counters) < self.capacity:
+            entry = self.counters[tag] = [weight, 0.0]
+        else:
+            evicted, (count, _) = self._pop_min()
+            del self.counters[evicted]
+            entry = self.counters[tag] = [count + weight, count]
+        heapq.heappush(self._heap, (entry[0], tag))
+        if len(self._heap) > 4 * self.capacity:
+            self._rebuild_heap()
+        self._top = None
+        self.version += 1
+
+    def scale(self, factor):
+        for entry in self.counters.values():
+            entry[0] *= factor
+            entry[1] *= factor
+        self._rebuild_heap()
+        self._top = None
+
+    def top(self, k):
+        """[(tag, count, error)] count 내림차순 (스트림이 바뀌지 않았으면 이전 결과 재사용)"""
+        if self._top is None or len(self._top) < min(k, len(self.counters)):
+            ranked = heapq.nlargest(max(k, 64), self.counters.items(), key=lambda item: item[1][0])
+            self._top = [(tag, entry[0], entry[1]) for tag, entry in ranked]
+        return self._top[:k]
+
+
+class TrendingHashtags:
+    """(카테고리, 국가)별 시간 감쇠 상위 해시태그 추적기 (스레드 안전)"""
+
+    def __init__(self, state_path=DEFAULT_STATE_PATH, half_life=DEFAULT_HALF_LIFE, capacity=DEFAULT_CAPACITY,
+                 save_interval=DEFAULT_SAVE_INTERVAL):
+        self.state_path = Path(state_path) if state_path else None
+        self.half_life = half_life
+        self.capacity = capacity
+        self.save_interval = save_interval
+        self._lock = threading.Lock()
+        self._streams = {}
+        self._landmark = time.time()
+        # username -> 이미 센 게시물 중 가장 최근 게시 시각 (LRU)
+        self._watermarks = OrderedDict()
+        self._dirty = False
+        self._saved_at = time.monotonic()
+        self.posts = 0
+        self._load_state()
+
+    def _load_state(self):
+        if self.state_path is None or not self.state_path.exists():
+            return
+        try:
+            with open(self.state_path, "r", encoding="utf-8") as f:
+                state = json.load(f)
+        except (OSError, json.JSONDecodeError):
+            return
+        # 반감기가 바뀌었으면 이전 카운터는 다른 척도이므로 버림
+        if state.get("half_life") != self.half_life:
+            return
+        self._landmark = state["landmark"]
+        self.posts = state.get("posts", 0)
+        for key, counters in state.get("streams", {}).items():
+            self._streams[tuple(key.split("|", 1))] = SpaceSaving(self.capacity, counters)
+        self._watermarks = OrderedDict(state.get("watermarks", {}))
+
+    def _weight(self, timestamp, now):
+        exponent = (min(timestamp, now) - self._landmark) / self.half_life
+        if exponent > _RENORMALIZE_EXPONENT:
+            # landmark를 now로 옮기고 기존 카운터를 같은 비율로 줄임
+            factor = 2.0 ** ((self._landmark - now) / self.half_life)
+            for stream in self._streams.values():
+                stream.scale(factor)
+            self._landmark = now
+            exponent = (min(timestamp, now) - now) / self.half_life
+        return 2.0 ** exponent
+
+    def _stream(self, category, country):
+        stream = self._streams.get((category, country))
+        if stream is None:
+            stream = self._streams[(category, country)] = SpaceSaving(self.capacity)
+        return stream
+
+    def observe_posts(self, posts, country=None, username=None, now=None):
+        """게시물들의 해시태그를 더하고 더한 게시물 수 반환 (username이 있으면 그 계정에서 이미 센 게시물은 건너뜀)"""
+        now = now or time.time()
+        country = (country or UNKNOWN_COUNTRY).lower()
+        rows = [
+            (post.get('taken_at_timestamp') or now, post_category(post), post.get('hashtags') or [])
+            for post in posts
+        ]
+        with self._lock:
+            watermark = 0
+            if username:
+                watermark = self._watermarks.get(username, 0)
+            counted = 0
+            newest = watermark
+            for taken_at, category, hashtags in rows:
+                if taken_at <= watermark:
+                    continue
+                newest = max(newest, taken_at)
+                counted += 1
+                if not hashtags:
+                    continue
+                weight = self._weight(taken_at, now)
+                streams = [
+                    self._stream(category, country), self._stream(category, ALL_COUNTRIES),
+                    self._stream(ALL_CATEGORIES, country), self._stream(ALL_CATEGORIES, ALL_COUNTRIES),
+                ]
+                # 한 게시물 안의 같은 태그는 한 번만 (대소문자 무시)
+                for tag in dict.fromkeys(tag.lower() for tag in hashtags):
+                    for stream in streams:
+                        stream.add(tag, weight)
+            if username and counted:
+                self._watermarks[username] = newest
+                self._watermarks.move_to_end(username)
+                while len(self._watermarks) > MAX_TRACKED_ACCOUNTS:
+                    self._watermarks.popitem(last=False)
+            self.posts += counted
+            self._dirty = self._dirty or counted > 0
+            due = self._dirty and time.monotonic() - self._saved_at >= self.save_interval
+        if due:
+            self.save()
+        return counted
+
+    def observe_profile(self, profile, country=None):
+        username = (profile.get('username') or '').lower() or None
+        return self.observe_posts(profile.get('recent_posts_raw') or [], country, username=username)
+
+    def on_profile(self, profile, crawler):
+        """InstagramCrawler post_listeners용 콜백 (crawler.country를 국가로 사용)"""
+        self.observe_profile(profile, getattr(crawler, "country", None))
+
+    def top(self, category=None, country=None, k=30, now=None):
+        """현재 시각 기준 감쇠 점수 상위 k개 [{'tag', 'score', 'error'}] (스트림이 없으면 빈 목록)
+
+        score는 반감기만큼 지난 게시물을 0.5개로 세는 감쇠 게시물 수, error는 Space-Saving 과대 추정 상한입니다.
+        """
+        now = now or time.time()
+        key = ((category or ALL_CATEGORIES), (country or ALL_COUNTRIES).lower())
+        with self._lock:
+            stream = self._streams.get(key)
+            if stream is None:
+                return []
+            ranked = stream.top(k)
+            decay = 2.0 ** ((self._landmark - now) / self.half_life)
+        return [
+            {'tag': tag, 'score': round(count * decay, 3), 'error': round(error * decay, 3)}
+            for tag, count, error in ranked
+        ]
+
+    def save(self):
+        """카운터 / landmark / 계정별 게시 시각을 원자적으로 기록 (state_path가 None이면 저장 안 함)"""
+        if self.state_path is None:
+            return
+        with self._lock:
+            self._dirty = False
+            self._saved_at = time.monotonic()
+            state = {
+                "half_life": self.half_life,
+                "landmark": self._landmark,
+                "posts": self.posts,
+                "streams": {
+                    f"{category}|{country}": {tag: list(entry) for tag, entry in stream.counters.items()}
+                    for (category, country), stream in self._streams.items()
+                },
+                "watermarks": dict(self._watermarks),
+            }
+        self.state_path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = self.state_path.with_suffix(f".{threading.get_ident()}.tmp")
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(state, f, ensure_ascii=False)
+        os.replace(tmp_path, self.state_path)
+
+    def stats(self):
+        with self._lock:
+            return {
+                "posts": self.posts,
+                "streams": len(self._streams),
+                "counters": sum(len(stream.counters) for stream in self._streams.values()),
+                "accounts": len(self._watermarks),
+            }
+
+
+_default_trending = None
+_default_trending_lock = threading.Lock()
+
+
+def get_trending():
+    """프로세스 전역 트렌딩 추적기 (TRENDING_STATE_PATH / TRENDING_HALF_LIFE 환경변수로 설정)"""
+    global _default_trending
+    with _default_trending_lock:
+        if _default_trending is None:
+            _default_trending = TrendingHashtags(
+                state_path=os.environ.get("TRENDING_STATE_PATH", DEFAULT_STATE_PATH),
+                half_life=float(os.environ.get("TRENDING_HALF_LIFE", DEFAULT_HALF_LIFE)),
+            )
+        return _default_trending
+
+
+def bench(count=1000000, vocabulary=50000, k=30):
+    """Zipf 분포 해시태그 count개를 넣은 뒤 (처리량 posts/sec, 상위 k개 재현율, 조회 시간 µs)"""
+    rng = random.Random(0)
+    weights = [1 / (rank + 1) ** 1.1 for rank in range(vocabulary)]
+    cumulative = []
+    total = 0.0
+    for weight in weights:
+        total += weight
+        cumulative.append(total)
+    tags = [f"tag{rank}" for rank in rng.choices(range(vocabulary), cum_weights=cumulative, k=count)]
+    trending = TrendingHashtags(state_path=None, half_life=math.inf)
+    now = time.time()
+    posts = [{'hashtags': [tag], 'taken_at_timestamp': now} for tag in tags]
+    started = time.perf_counter()
+    for start in range(0, count, 100):
+        trending.observe_posts(posts[start:start + 100], country="kr", now=now)
+    rate = round(count / (time.perf_counter() - started))
+    exact = {}
+    for tag in tags:
+        exact[tag] = exact.get(tag, 0) + 1
+    truth = {tag for tag, _ in heapq.nlargest(k, exact.items(), key=lambda item: item[1])}
+    started = time.perf_counter()
+    found = trending.top(k=k, now=now)
+    query_us = (time.perf_counter() - started) * 1e6
+    recall = len(truth & {row['tag'] for row in found}) / k
+    return rate, recall, query_us
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--bench", action="store_true", help="처리량 / 상위 k개 재현율 측정")
+    parser.add_argument("--count", type=int, default=1000000, help="벤치마크 게시물 수 (기본값: 1000000)")
+    args = parser.parse_args()
+    if args.bench:
+        rate, recall, query_us = bench(args.count)
+        print(f"ingest: {rate:,} posts/sec, top-30 recall: {recall:.0%}, query: {query_us:.0f} µs")
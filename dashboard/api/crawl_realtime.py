@@ -5,15 +5,18 @@ FastAPI 기반 Instagram 실시간 크롤링 API 서버
 
 from fastapi import FastAPI, HTTPException, Depends, Header, status
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import StreamingResponse, FileResponse
+from fastapi.responses import StreamingResponse, FileResponse, Response
 import uvicorn
 import json
 import asyncio
 import sys
 import os
 import random
+import re
+import uuid
 from datetime import datetime, timedelta
 from pathlib import Path
+from types import MappingProxyType
 import pandas as pd
 
 # API 디렉토리를 Python 경로에 추가
@@ -28,18 +31,53 @@ from api.auth import (
     ACCESS_TOKEN_EXPIRE_MINUTES
 )
 
-# Instagram 크롤러 추가
-instagram_path = Path(__file__).parent.parent.parent / "instagram"
-sys.path.append(str(instagram_path))
+# Instagram 크롤러 추가 (Instagram/ 디렉토리를 sys.path에 등록)
+from api.instagram_modules import INSTAGRAM_DIR as instagram_path
 
 # Config 파일 경로
 CONFIG_PATH = instagram_path / "config.json"
+# /crawl 작업별 실행 저널 디렉토리 (run_id 단위)
+CRAWL_RUNS_DIR = Path("temp_results") / "runs"
+# /crawl 작업 결과를 crawl_date/hashtag 파티션으로 모으는 Parquet 데이터셋
+CRAWL_DATASET_DIR = Path("temp_results") / "datasets"
+# /api/viral/analyze/batch 요청 1회당 최대 게시물 수
+VIRAL_BATCH_MAX_POSTS = 10000
+# /api/trending/hashtags limit 최대값
+TRENDING_MAX_LIMIT = 100
+# /crawl, /crawl/batch, /crawl/fanout 프로필 동시 수집 수 / 작업 1회당 수집 프로필 수 최대값
+CRAWL_MAX_CONCURRENCY = 16
+CRAWL_MAX_PROFILES = 500
+# /crawl, /crawl/batch, /crawl/fanout 계정별 수집 게시물 수 최대값
+CRAWL_MAX_USER_POSTS = 200
+# /crawl 프론티어 모드 / /crawl/batch 해시태그 페이지 요청 예산 최대값
+FRONTIER_MAX_REQUESTS = 200
+# /crawl/batch (해시태그 x 국가) 대상 최대 개수
+BATCH_MAX_TARGETS = 50
+# /crawl/batch, /crawl/fanout 동시에 수집하는 해시태그 최대 개수
+BATCH_TAG_CONCURRENCY = 8
+# /api/hashtags/related 입력 해시태그 / limit 최대값
+RELATED_MAX_TAGS = 30
+RELATED_MAX_LIMIT = 50
 
 try:
-    from InstagramCrawler import InstagramCrawler
+    from InstagramCrawler import InstagramCrawler, AsyncInstagramCrawler
+    from ig_transport import get_transport
+    from profile_cache import get_profile_cache, get_negative_cache, NEGATIVE_REASON_LABELS
+    from feed_store import get_feed_store
+    from raw_archive import get_raw_archive
+    from batch_crawl import BatchCrawl
 except ImportError:
     print("Instagram 크롤러를 찾을 수 없습니다. 경로를 확인해주세요.")
 
+# 크롤러 의존성(쿠키 / HTTP 클라이언트 등) 없이 쓰는 Instagram/ 공용 모듈 - 크롤러를 못 불러와도 분석 / 트렌딩 API는 동작
+from run_journal import RunJournal
+from records import to_plain
+from engagement_stats import EngagementStats
+from caption_features import features_for
+from pattern_aggregator import get_pattern_aggregator
+from trending import get_trending
+from cooccurrence import get_cooccurrence_index
+
 # Gemini 분석기 추가
 try:
     from api.gemini_analyzer import GeminiAnalyzer, InfluencerProfile
@@ -224,63 +262,139 @@ HASHTAG_TRANSLATIONS = {
     }
 }
 
+def compile_translations(table):
+    """HASHTAG_TRANSLATIONS(기본 번역 문자열 + 국가별 dict 혼합) -> (기본 번역, {국가: 기본 번역 위에 국가별 번역을 덮은 표})
+
+    국가마다 한 번의 dict 조회로 번역되도록 시작 시 한 번만 만들며, 두 결과 모두 읽기 전용입니다.
+    """
+    default = {keyword: value for keyword, value in table.items() if isinstance(value, str)}
+    per_country = {
+        country: MappingProxyType({**default, **translations})
+        for country, translations in table.items() if isinstance(translations, dict)
+    }
+    return MappingProxyType(default), MappingProxyType(per_country)
+
+DEFAULT_TRANSLATIONS, COUNTRY_TRANSLATIONS = compile_translations(HASHTAG_TRANSLATIONS)
+# /crawl/fanout 기본 대상 국가
+FANOUT_DEFAULT_COUNTRIES = ("kr", "us", "jp", "id", "th", "vn")
+
 def translate_hashtag(hashtag: str, target_country: str = "us"):
-    """해시태그를 타겟 국가 언어로 번역"""
-    # 한국어 입력이고 한국이 아닌 다른 나라를 선택한 경우
-    if target_country != "kr":
-        # 국가별 번역 확인 - dict 타입인 경우에만
-        if target_country in HASHTAG_TRANSLATIONS and isinstance(HASHTAG_TRANSLATIONS.get(target_country), dict):
-            country_translations = HASHTAG_TRANSLATIONS[target_country]
-            if hashtag in country_translations:
-                return country_translations[hashtag]
-        
-        # 기본 영어 번역 확인 - string 타입인 경우에만
-        if hashtag in HASHTAG_TRANSLATIONS:
-            value = HASHTAG_TRANSLATIONS[hashtag]
-            if isinstance(value, str):
-                return value
-    
-    # 한국 선택시 또는 번역이 없으면 원본 반환
-    return hashtag
+    """해시태그를 타겟 국가 언어로 번역 (한국 선택 시 또는 번역이 없으면 원본 반환)"""
+    if target_country == "kr":
+        return hashtag
+    # 국가별 번역 -> 기본 영어 번역 순 (표에 없는 국가는 기본 번역만)
+    return COUNTRY_TRANSLATIONS.get(target_country, DEFAULT_TRANSLATIONS).get(hashtag, hashtag)
+
+def instagram_credentials():
+    """크롤러 로그인 정보 (username, password) - 환경변수(Render.com), 없으면 config.json(로컬 개발용), 둘 다 없으면 (None, None)"""
+    username = os.environ.get('INSTAGRAM_USERNAME')
+    password = os.environ.get('INSTAGRAM_PASSWORD')
+    if username and password:
+        return username, password
+    if config and 'instagram' in config:
+        return config['instagram']['username'], config['instagram']['password']
+    return None, None
+
+def crawl_post_listeners():
+    """저장되는 프로필의 게시물을 바이럴 패턴 집계 / 트렌딩 해시태그 / 해시태그 동시 출현에 누적하는 크롤러 리스너"""
+    return [
+        get_pattern_aggregator().on_profile,
+        get_trending().on_profile,
+        get_cooccurrence_index().on_profile,
+    ]
+
+async def publish_crawl_stats():
+    """크롤링이 끝난 뒤 누적된 패턴 표 게시 (지식 베이스가 다음 확인 때 다시 읽음) + 트렌딩 / 동시 출현 상태 저장"""
+    loop = asyncio.get_running_loop()
+    await loop.run_in_executor(None, get_pattern_aggregator().publish)
+    await loop.run_in_executor(None, get_trending().save)
+    await loop.run_in_executor(None, get_cooccurrence_index().save)
+
+def negative_cache_message(username: str):
+    """네거티브 캐시에 등록된 계정이면 안내 메시지 반환"""
+    entry = get_negative_cache().check(username)
+    if not entry:
+        return None
+    label = NEGATIVE_REASON_LABELS.get(entry['reason'], entry['reason'])
+    return f'@{username} 프로필을 가져올 수 없습니다 ({label}).'
+
+def _bounded_int(request, key, default, upper):
+    """요청 값을 정수로 바꿔 1 ~ upper 범위로 제한 (정수로 바꿀 수 없으면 400)"""
+    try:
+        value = int(request.get(key, default))
+    except (TypeError, ValueError):
+        raise HTTPException(status_code=400, detail=f"{key} 값이 정수가 아닙니다")
+    return max(1, min(value, upper))
+
+def _request_countries(request, default):
+    """countries 요청 값(쉼표 구분 문자열 또는 목록) -> 중복 없는 소문자 국가 코드 목록 (비어 있으면 default)"""
+    countries = request.get("countries") or default
+    if isinstance(countries, str):
+        countries = countries.split(",")
+    countries = [str(country).strip().lower() for country in countries if country and str(country).strip()]
+    return list(dict.fromkeys(countries)) or list(default)
 
 @app.post("/crawl")
 async def crawl_hashtag(request: dict):
     """해시태그 기반 실시간 인플루언서 크롤링"""
     
     hashtag = request.get("hashtag", "").strip()
-    max_count = request.get("max_count", 20)
-    max_user_posts = request.get("max_user_posts", 50)
+    max_count = _bounded_int(request, "max_count", 20, CRAWL_MAX_PROFILES)
+    max_user_posts = _bounded_int(request, "max_user_posts", 50, CRAWL_MAX_USER_POSTS)
     target_country = request.get("target_country", "kr")
-    
-    if not hashtag:
-        raise HTTPException(status_code=400, detail="해시태그가 필요합니다")
-    
-    # 해시태그 번역
-    translated_hashtag = translate_hashtag(hashtag, target_country)
-    print(f"[번역] {hashtag} ({target_country}) -> {translated_hashtag}")
+    concurrency = _bounded_int(request, "concurrency", 4, CRAWL_MAX_CONCURRENCY)
+    # 이전 /crawl 스트림에서 받은 run_id를 넘기면 해당 작업의 저널부터 이어서 수집
+    run_id = request.get("run_id")
+    # 프론티어 모드 - true 또는 {max_requests, pages_per_tag, max_depth}면 해시태그(쉼표로 여러 개)를 시드로 인접 해시태그까지 확장
+    frontier = request.get("frontier") or None
+    if frontier is not None:
+        frontier = dict(frontier) if isinstance(frontier, dict) else {}
+        if frontier.get("max_requests") is not None:
+            frontier["max_requests"] = _bounded_int(frontier, "max_requests", None, FRONTIER_MAX_REQUESTS)
+    
+    if run_id:
+        if not re.fullmatch(r"[\w-]+", run_id):
+            raise HTTPException(status_code=400, detail="잘못된 run_id입니다")
+        meta = RunJournal(CRAWL_RUNS_DIR / run_id).replay()["meta"]
+        if meta is None:
+            raise HTTPException(status_code=404, detail="이어서 수집할 크롤링 작업을 찾을 수 없습니다")
+        hashtag = translated_hashtag = meta["category"]
+        max_count = meta["max_count"]
+        max_user_posts = meta["max_user_posts"]
+        frontier = meta.get("frontier")
+    else:
+        if not hashtag:
+            raise HTTPException(status_code=400, detail="해시태그가 필요합니다")
+        
+        # 해시태그 번역 (프론티어 모드는 시드별로)
+        if frontier is not None:
+            translated_hashtag = ",".join(
+                translate_hashtag(seed.strip().lstrip("#"), target_country) for seed in hashtag.split(",") if seed.strip()
+            )
+        else:
+            translated_hashtag = translate_hashtag(hashtag, target_country)
+        print(f"[번역] {hashtag} ({target_country}) -> {translated_hashtag}")
+        
+        run_id = f"{datetime.now().strftime('%Y%m%d_%H%M%S')}_{uuid.uuid4().hex[:8]}"
+        meta = None
     
     async def generate_stream():
         try:
-            # 진행 상황 표시
-            yield f"data: {json.dumps({'progress': f'#{hashtag} → #{translated_hashtag} 번역 완료'})}\n\n"
+            # 진행 상황 표시 (run_id는 중단 시 재개 요청에 사용)
+            if meta is not None:
+                yield f"data: {json.dumps({'run_id': run_id, 'progress': f'#{translated_hashtag} 작업 재개'})}\n\n"
+            else:
+                yield f"data: {json.dumps({'run_id': run_id, 'progress': f'#{hashtag} → #{translated_hashtag} 번역 완료'})}\n\n"
             await asyncio.sleep(0.3)
             
             # 실제 크롤링 시도
             yield f"data: {json.dumps({'progress': f'#{translated_hashtag} 해시태그 실시간 크롤링 시작...'})}\n\n"
             await asyncio.sleep(0.1)
             
-            # 환경변수에서 인증 정보 가져오기 (Render.com)
-            username = os.environ.get('INSTAGRAM_USERNAME')
-            password = os.environ.get('INSTAGRAM_PASSWORD')
-            
-            # 환경변수가 없으면 config.json 사용 (로컬 개발용)
+            username, password = instagram_credentials()
             if not username or not password:
-                if config and 'instagram' in config:
-                    username = config['instagram']['username']
-                    password = config['instagram']['password']
-                else:
-                    yield f"data: {json.dumps({'error': 'Instagram 인증 정보가 없습니다. 환경변수를 설정해주세요.'})}\n\n"
-                    return
+                yield f"data: {json.dumps({'error': 'Instagram 인증 정보가 없습니다. 환경변수를 설정해주세요.'})}\n\n"
+                return
             
             yield f"data: {json.dumps({'progress': '크롤러 초기화 중...'})}\n\n"
             await asyncio.sleep(0.1)
@@ -293,69 +407,48 @@ async def crawl_hashtag(request: dict):
                 output_dir="temp_results",
                 max_user_posts=max_user_posts,
                 username=username,
-                password=password
+                password=password,
+                profile_cache=get_profile_cache(),
+                negative_cache=get_negative_cache(),
+                feed_store=get_feed_store(),
+                parquet_dir=CRAWL_DATASET_DIR,
+                country=target_country,
+                frontier=frontier,
+                post_listeners=crawl_post_listeners()
             )
             
-            # 실제 크롤링 실행
-            loop = asyncio.get_event_loop()
-            
-            yield f"data: {json.dumps({'progress': f'#{translated_hashtag} 게시물 수집 중... (최대 {max_count}개)'})}\n\n"
+            yield f"data: {json.dumps({'progress': f'#{translated_hashtag} 게시물 페이지 수집과 프로필 분석을 동시에 진행합니다 (최대 {max_count}명)'})}\n\n"
             await asyncio.sleep(0.1)
             
-            # 게시물 수집 (번역된 해시태그 사용)
-            posts = await loop.run_in_executor(
-                None, 
-                crawler.get_recent_posts_by_tag, 
-                translated_hashtag,  # 번역된 해시태그 사용
-                max_count, 
-                None
-            )
+            # 해시태그 페이지에서 작성자가 나오는 즉시 프로필 수집 (완료 순서대로 스트리밍)
+            results = []
+            # 작업별 저널 + NDJSON 결과 저장소 (중단 시 같은 run_id로 재개)
+            journal, journal_state = crawler.open_run(CRAWL_RUNS_DIR / run_id)
+            engine = AsyncInstagramCrawler(crawler, concurrency=concurrency)
+            try:
+                done = 0
+                async for uname, profile in engine.iter_run_profiles(journal, journal_state):
+                    done += 1
+                    yield f"data: {json.dumps({'progress': f'[{done}/{max_count}] @{uname} 프로필 분석 완료'})}\n\n"
+                    if profile:
+                        # 응답용 dict로 변환, recent_posts_raw 제거 (용량 절약)
+                        row = to_plain(profile)
+                        row.pop('recent_posts_raw', None)
+                        results.append(row)
+            finally:
+                engine.close()
+                crawler.sink.close()
             
-            if not posts:
+            if done == 0:
                 yield f"data: {json.dumps({'error': f'#{translated_hashtag} 해시태그에서 게시물을 찾을 수 없습니다.'})}\n\n"
                 return
-            
-            yield f"data: {json.dumps({'progress': f'게시물 {len(posts)}개 수집 완료'})}\n\n"
-            await asyncio.sleep(0.1)
-            
-            # 사용자 추출
-            yield f"data: {json.dumps({'progress': '인플루언서 계정 추출 중...'})}\n\n"
-            await asyncio.sleep(0.1)
-            
-            usernames = crawler.extract_usernames_from_posts(posts)
-            
-            yield f"data: {json.dumps({'progress': f'유니크 계정 {len(usernames)}개 발견'})}\n\n"
-            await asyncio.sleep(0.1)
-            
-            # 프로필 수집
-            results = []
-            for i, uname in enumerate(usernames, 1):
-                if i > max_count:
-                    break
-                    
-                yield f"data: {json.dumps({'progress': f'[{i}/{min(len(usernames), max_count)}] @{uname} 프로필 분석 중...'})}\n\n"
-                await asyncio.sleep(0.1)
-                
-                try:
-                    profile = await loop.run_in_executor(
-                        None,
-                        crawler.scrape_instagram_profile,
-                        uname,
-                        None
-                    )
-                    
-                    if profile:
-                        # recent_posts_raw 제거 (용량 절약)
-                        if 'recent_posts_raw' in profile:
-                            del profile['recent_posts_raw']
-                        results.append(profile)
-                        
-                except Exception as e:
-                    print(f"프로필 수집 오류 ({uname}): {e}")
-                    continue
-                
-                # 너무 빠르면 차단될 수 있으므로 딜레이
-                await asyncio.sleep(1)
+            # CSV / Parquet 변환 (NDJSON을 한 줄씩 읽어 변환)
+            await asyncio.get_running_loop().run_in_executor(None, crawler.save_results)
+            journal.record_finish()
+            if crawler.frontier_state is not None:
+                visited = " ".join(f"#{tag}" for tag in crawler.frontier_state.visited)
+                yield f"data: {json.dumps({'progress': f'프론티어 수집 해시태그: {visited}', 'frontier': crawler.frontier_state.stats()})}\n\n"
+            await publish_crawl_stats()
             
             # 최종 결과 전송
             yield f"data: {json.dumps({'progress': f'✅ 크롤링 완료! {len(results)}명의 인플루언서 정보 수집'})}\n\n"
@@ -381,6 +474,180 @@ async def crawl_hashtag(request: dict):
         }
     )
 
+async def stream_batch_crawl(run_id, targets, max_profiles, max_user_posts, max_authors_per_tag, max_tag_requests,
+                             concurrency, stream_profiles=False):
+    """BatchCrawl 실행 SSE 스트림 (/crawl/batch, /crawl/fanout 공용)
+
+    프로필마다 작성자를 처음 찾은 국가(country)를 함께 보내고, stream_profiles면 프로필 행도 바로 보냅니다.
+    최종 result의 각 행에는 country와 작성자가 나온 모든 (hashtag, country)인 sources가 붙습니다.
+    """
+    try:
+        labels = " ".join(f"#{tag}({country})" for tag, country in targets)
+        yield f"data: {json.dumps({'run_id': run_id, 'progress': f'{labels} 일괄 크롤링 시작...'})}\n\n"
+        
+        username, password = instagram_credentials()
+        if not username or not password:
+            yield f"data: {json.dumps({'error': 'Instagram 인증 정보가 없습니다. 환경변수를 설정해주세요.'})}\n\n"
+            return
+        
+        crawler = InstagramCrawler(
+            category="batch",
+            max_count=max_profiles,
+            sleep_sec=1.0,
+            output_dir="temp_results",
+            max_user_posts=max_user_posts,
+            username=username,
+            password=password,
+            profile_cache=get_profile_cache(),
+            negative_cache=get_negative_cache(),
+            feed_store=get_feed_store(),
+            parquet_dir=CRAWL_DATASET_DIR,
+            post_listeners=crawl_post_listeners()
+        )
+        # 서로 다른 태그는 최대 BATCH_TAG_CONCURRENCY개까지 동시에 수집 (요청 간격은 공유 전송 계층의 스케줄러가 조절)
+        batch = BatchCrawl(
+            crawler, targets,
+            max_authors_per_tag=max_authors_per_tag,
+            max_profiles=max_profiles,
+            max_tag_requests=max_tag_requests,
+            tag_concurrency=min(len({tag for tag, _ in targets}), BATCH_TAG_CONCURRENCY),
+        )
+        
+        results = []
+        journal, journal_state = crawler.open_run(CRAWL_RUNS_DIR / run_id, batch=batch.options())
+        engine = AsyncInstagramCrawler(crawler, concurrency=concurrency)
+        try:
+            done = 0
+            async for uname, profile in batch.iter_profiles(engine, journal, journal_state):
+                done += 1
+                country = batch.origin.get(uname)
+                event = {'progress': f'[{done}/{max_profiles}] @{uname} ({country}) 프로필 분석 완료', 'country': country}
+                if profile:
+                    # 응답용 dict로 변환, recent_posts_raw 제거 (용량 절약)
+                    row = to_plain(profile)
+                    row.pop('recent_posts_raw', None)
+                    row['country'] = country
+                    results.append(row)
+                    if stream_profiles:
+                        event['profile'] = row
+                yield f"data: {json.dumps(event)}\n\n"
+        finally:
+            engine.close()
+            crawler.sink.close()
+        
+        if done == 0:
+            yield f"data: {json.dumps({'error': '해시태그에서 게시물을 찾을 수 없습니다.'})}\n\n"
+            return
+        await asyncio.get_running_loop().run_in_executor(None, batch.save_results)
+        journal.record_finish()
+        await publish_crawl_stats()
+        
+        # 출처는 모든 태그 페이지 수집이 끝난 뒤 기준으로 붙임 (나중에 다른 태그에서 발견된 작성자 포함)
+        by_country = {}
+        for row in results:
+            row['sources'] = batch.sources(row['username'])
+            by_country[row['country']] = by_country.get(row['country'], 0) + 1
+        yield f"data: {json.dumps({'progress': f'✅ 일괄 크롤링 완료! {len(results)}명의 인플루언서 정보 수집 (태그 페이지 요청 {batch.budget.used}회)', 'by_country': by_country})}\n\n"
+        yield f"data: {json.dumps({'result': results})}\n\n"
+        yield f"data: [DONE]\n\n"
+        
+    except Exception as e:
+        import traceback
+        error_msg = f"일괄 크롤링 중 오류 발생: {str(e)}"
+        print(f"ERROR: {error_msg}")
+        print(f"TRACEBACK: {traceback.format_exc()}")
+        yield f"data: {json.dumps({'error': error_msg})}\n\n"
+
+@app.post("/crawl/batch")
+async def crawl_hashtags_batch(request: dict):
+    """여러 해시태그 x 국가 일괄 크롤링
+
+    모든 대상의 태그 페이지를 동시에 수집해 작성자를 중복 없는 큐 하나로 합치고 프로필은 한 번씩만 수집합니다.
+    결과의 sources는 작성자가 나온 모든 (hashtag, country)이며, run_id로 중단된 작업을 이어서 수집할 수 있습니다.
+    """
+    hashtags = request.get("hashtags") or []
+    if isinstance(hashtags, str):
+        hashtags = hashtags.split(",")
+    hashtags = [tag.strip().lstrip("#") for tag in hashtags if tag and tag.strip().lstrip("#")]
+    countries = _request_countries(request, [request.get("target_country", "kr")])
+    max_profiles = _bounded_int(request, "max_profiles", 50, CRAWL_MAX_PROFILES)
+    max_user_posts = _bounded_int(request, "max_user_posts", 50, CRAWL_MAX_USER_POSTS)
+    max_authors_per_tag = _bounded_int(request, "max_authors_per_tag", 20, CRAWL_MAX_PROFILES)
+    max_tag_requests = _bounded_int(request, "max_tag_requests", 40, FRONTIER_MAX_REQUESTS)
+    concurrency = _bounded_int(request, "concurrency", 4, CRAWL_MAX_CONCURRENCY)
+    run_id = request.get("run_id")
+    
+    if run_id:
+        if not re.fullmatch(r"[\w-]+", run_id):
+            raise HTTPException(status_code=400, detail="잘못된 run_id입니다")
+        meta = RunJournal(CRAWL_RUNS_DIR / run_id).replay()["meta"]
+        if meta is None or "batch" not in meta:
+            raise HTTPException(status_code=404, detail="이어서 수집할 일괄 크롤링 작업을 찾을 수 없습니다")
+        targets = [tuple(target) for target in meta["batch"]["targets"]]
+        max_profiles = meta["max_count"]
+        max_user_posts = meta["max_user_posts"]
+        max_authors_per_tag = meta["batch"]["max_authors_per_tag"]
+        max_tag_requests = meta["batch"]["max_tag_requests"]
+    else:
+        if not hashtags:
+            raise HTTPException(status_code=400, detail="해시태그가 필요합니다")
+        # 국가별로 해시태그 번역 (번역 결과가 같은 대상은 BatchCrawl이 합침)
+        targets = [(translate_hashtag(tag, country), country) for tag in hashtags for country in countries]
+        if len(targets) > BATCH_MAX_TARGETS:
+            raise HTTPException(status_code=400, detail=f"해시태그 x 국가 조합은 최대 {BATCH_MAX_TARGETS}개까지 가능합니다")
+        run_id = f"{datetime.now().strftime('%Y%m%d_%H%M%S')}_{uuid.uuid4().hex[:8]}"
+    
+    return StreamingResponse(
+        stream_batch_crawl(run_id, targets, max_profiles, max_user_posts, max_authors_per_tag, max_tag_requests, concurrency),
+        media_type="text/plain",
+        headers={
+            "Cache-Control": "no-cache",
+            "Connection": "keep-alive",
+        }
+    )
+
+@app.post("/crawl/fanout")
+async def crawl_keyword_fanout(request: dict):
+    """키워드 하나를 여러 국가로 동시에 크롤링 (국가별 번역 인덱스로 대상 해시태그를 한 번에 결정)
+
+    국가별 해시태그 페이지를 동시에 수집하고(요청 간격은 공유 전송 계층의 스케줄러가 조절), 프로필은 한 번씩만 수집해
+    국가가 표시된 결과를 하나의 스트림으로 돌려줍니다. 번역이 같은 국가들(예: id / my의 makanan)은 태그를 한 번만 수집합니다.
+    중단된 작업은 스트림의 run_id로 /crawl/batch에서 이어서 수집할 수 있습니다.
+    """
+    keyword = request.get("keyword", request.get("hashtag", "")).strip().lstrip("#")
+    countries = _request_countries(request, FANOUT_DEFAULT_COUNTRIES)
+    # 국가(번역 태그)별 최대 작성자 수 (국가 수와 곱한 전체가 CRAWL_MAX_PROFILES를 넘지 않도록)
+    max_count = _bounded_int(request, "max_count", 20, CRAWL_MAX_PROFILES // max(1, len(countries)))
+    max_user_posts = _bounded_int(request, "max_user_posts", 50, CRAWL_MAX_USER_POSTS)
+    max_tag_requests = _bounded_int(request, "max_tag_requests", 10 * len(countries), FRONTIER_MAX_REQUESTS)
+    concurrency = _bounded_int(request, "concurrency", 4, CRAWL_MAX_CONCURRENCY)
+    if not keyword:
+        raise HTTPException(status_code=400, detail="키워드가 필요합니다")
+    if len(countries) > BATCH_MAX_TARGETS:
+        raise HTTPException(status_code=400, detail=f"국가는 최대 {BATCH_MAX_TARGETS}개까지 가능합니다")
+    # 번역 인덱스에 없는 국가는 기본 번역으로 조용히 바뀌지 않도록 거부
+    unknown = [country for country in countries if country not in COUNTRY_TRANSLATIONS]
+    if unknown:
+        raise HTTPException(
+            status_code=400,
+            detail=f"지원하지 않는 국가입니다: {', '.join(unknown)} (가능: {', '.join(COUNTRY_TRANSLATIONS)})",
+        )
+    
+    targets = [(translate_hashtag(keyword, country), country) for country in countries]
+    print(f"[번역] {keyword} -> " + ", ".join(f"{country}: {tag}" for tag, country in targets))
+    run_id = f"{datetime.now().strftime('%Y%m%d_%H%M%S')}_{uuid.uuid4().hex[:8]}"
+    return StreamingResponse(
+        stream_batch_crawl(
+            run_id, targets, max_count * len(countries), max_user_posts, max_count, max_tag_requests, concurrency,
+            stream_profiles=True,
+        ),
+        media_type="text/plain",
+        headers={
+            "Cache-Control": "no-cache",
+            "Connection": "keep-alive",
+        }
+    )
+
 @app.post("/analyze/user")
 async def analyze_user(request: dict):
     """특정 인플루언서 상세 분석"""
@@ -394,6 +661,11 @@ async def analyze_user(request: dict):
             yield f"data: {json.dumps({'progress': f'@{username} 프로필 분석 시작...'})}\n\n"
             await asyncio.sleep(0.5)
             
+            skip_message = negative_cache_message(username)
+            if skip_message:
+                yield f"data: {json.dumps({'error': skip_message})}\n\n"
+                return
+            
             # 환경변수에서 인증 정보 가져오기 (Render.com)
             username_auth = os.environ.get('INSTAGRAM_USERNAME')
             password = os.environ.get('INSTAGRAM_PASSWORD')
@@ -415,7 +687,10 @@ async def analyze_user(request: dict):
                 output_dir="temp_results",
                 max_user_posts=50,  # 더 많은 게시물 분석
                 username=username_auth,
-                password=password
+                password=password,
+                profile_cache=get_profile_cache(),
+                negative_cache=get_negative_cache(),
+                feed_store=get_feed_store()
             )
             
             loop = asyncio.get_event_loop()
@@ -426,7 +701,7 @@ async def analyze_user(request: dict):
             # 프로필 정보 수집
             profile = await loop.run_in_executor(
                 None,
-                crawler.scrape_instagram_profile,
+                crawler.get_profile,
                 username,
                 None
             )
@@ -443,14 +718,14 @@ async def analyze_user(request: dict):
             posts = profile.get('recent_posts_raw', [])
             hashtag_analysis = {}
             music_analysis = {}
-            posting_times = []
-            engagement_by_type = {'reel': [], 'post': []}
+            # 참여 통계는 배열로 한 번에 계산 (타입별 평균 / 게시 간격은 최근 50개 기준)
+            recent_stats = EngagementStats(posts[:50])
+            engagement_by_type = recent_stats.by_type()
             
             for post in posts[:50]:  # 최근 50개 게시물 분석
-                # 해시태그 추출
-                caption = post.get('caption', '')
-                hashtags = [tag.strip() for tag in caption.split() if tag.startswith('#')]
-                for tag in hashtags:
+                # 해시태그 (캡션 특징은 게시물에 캐시되어 이후 분석에서 다시 스캔하지 않음)
+                for tag in features_for(post).hashtags:
+                    tag = f'#{tag}'
                     hashtag_analysis[tag] = hashtag_analysis.get(tag, 0) + 1
                 
                 # 음악 정보
@@ -462,32 +737,21 @@ async def analyze_user(request: dict):
                     else:
                         music_key = str(music_info)
                     music_analysis[music_key] = music_analysis.get(music_key, 0) + 1
-                
-                # 게시 시간 분석
-                if post.get('taken_at_timestamp'):
-                    posting_times.append(post['taken_at_timestamp'])
-                
-                # 타입별 참여율
-                engagement = post.get('like_count', 0) + post.get('comment_count', 0)
-                if post.get('is_reel'):
-                    engagement_by_type['reel'].append(engagement)
-                else:
-                    engagement_by_type['post'].append(engagement)
             
             # 분석 결과 정리
             analysis = {
                 'profile': profile,
                 'hashtag_analysis': dict(sorted(hashtag_analysis.items(), key=lambda x: x[1], reverse=True)[:30]),
                 'music_analysis': dict(sorted(music_analysis.items(), key=lambda x: x[1], reverse=True)[:10]),
-                'avg_reel_engagement': sum(engagement_by_type['reel']) / len(engagement_by_type['reel']) if engagement_by_type['reel'] else 0,
-                'avg_post_engagement': sum(engagement_by_type['post']) / len(engagement_by_type['post']) if engagement_by_type['post'] else 0,
+                'avg_reel_engagement': engagement_by_type['reel']['mean'],
+                'avg_post_engagement': engagement_by_type['post']['mean'],
                 'total_posts_analyzed': len(posts),
-                'posting_frequency': calculate_posting_frequency(posting_times),
-                'best_performing_posts': sorted(posts, key=lambda x: x.get('like_count', 0) + x.get('comment_count', 0), reverse=True)[:5]
+                'posting_frequency': calculate_posting_frequency(recent_stats.intervals_days()),
+                'best_performing_posts': EngagementStats(posts).top_k(5)
             }
             
             yield f"data: {json.dumps({'progress': '✅ 분석 완료!'})}\n\n"
-            yield f"data: {json.dumps({'result': analysis})}\n\n"
+            yield f"data: {json.dumps({'result': to_plain(analysis)})}\n\n"
             yield f"data: [DONE]\n\n"
             
         except Exception as e:
@@ -507,35 +771,31 @@ async def analyze_user(request: dict):
         }
     )
 
-def calculate_posting_frequency(timestamps):
-    """게시물 빈도 계산"""
-    if len(timestamps) < 2:
+def calculate_posting_frequency(intervals):
+    """게시물 빈도 계산 (EngagementStats.intervals_days()의 게시 간격 배열)"""
+    if len(intervals) < 1:
         return "데이터 부족"
     
-    timestamps.sort()
-    intervals = []
-    for i in range(1, len(timestamps)):
-        interval_days = (timestamps[i] - timestamps[i-1]) / 86400
-        intervals.append(interval_days)
-    
-    if intervals:
-        avg_interval = sum(intervals) / len(intervals)
-        if avg_interval < 1:
-            return "하루 여러 번"
-        elif avg_interval < 3:
-            return f"약 {avg_interval:.1f}일마다"
-        elif avg_interval < 7:
-            return "주 2-3회"
-        elif avg_interval < 14:
-            return "주 1회"
-        else:
-            return f"약 {avg_interval:.0f}일마다"
-    return "알 수 없음"
+    avg_interval = float(intervals.mean())
+    if avg_interval < 1:
+        return "하루 여러 번"
+    elif avg_interval < 3:
+        return f"약 {avg_interval:.1f}일마다"
+    elif avg_interval < 7:
+        return "주 2-3회"
+    elif avg_interval < 14:
+        return "주 1회"
+    else:
+        return f"약 {avg_interval:.0f}일마다"
 
 @app.get("/influencer/{username}/posts")
 async def get_influencer_posts(username: str):
     """인플루언서의 게시물 상세 정보 조회"""
     
+    # 없는/비공개/차단 계정은 바로 빈 결과 반환
+    if negative_cache_message(username):
+        return {"username": username, "posts": []}
+    
     # 실제 크롤링 시도
     try:
         if not config or 'instagram' not in config:
@@ -552,19 +812,21 @@ async def get_influencer_posts(username: str):
             output_dir="temp_results",
             max_user_posts=30,
             username=username_auth,
-            password=password
+            password=password,
+            profile_cache=get_profile_cache(),
+            negative_cache=get_negative_cache(),
+            feed_store=get_feed_store()
         )
         
         # 프로필 정보 수집
-        profile = crawler.scrape_instagram_profile(username, None)
+        profile = crawler.get_profile(username, None)
         
         if profile and 'recent_posts_raw' in profile:
-            posts = profile['recent_posts_raw'][:30]
-            # 해시태그 추출
-            for post in posts:
-                caption = post.get('caption', '')
-                hashtags = [tag.strip() for tag in caption.split() if tag.startswith('#')]
-                post['hashtags'] = hashtags
+            posts = []
+            for record in profile['recent_posts_raw'][:30]:
+                post = to_plain(record)
+                post['hashtags'] = [f'#{tag}' for tag in features_for(record).hashtags]
+                posts.append(post)
             
             return {"username": username, "posts": posts}
         else:
@@ -576,11 +838,21 @@ async def get_influencer_posts(username: str):
 
 # 바이럴 분석 엔진 임포트
 from api.viral_analyzer import (
-    ViralContentAnalyzer,
+    get_analyzer,
     analyze_viral_content as analyze_content,
+    analyze_viral_contents,
     generate_ai_content_ideas,
     predict_content_performance
 )
+from api.knowledge_base import CachedResponse, POWER_TAG_LIMIT, get_knowledge_base, get_knowledge_store
+
+
+def _cached_json_response(cached, if_none_match):
+    """미리 직렬화한 응답 - If-None-Match가 ETag와 같으면 본문 없이 304"""
+    headers = {"ETag": cached.etag, "Cache-Control": "no-cache"}
+    if cached.matches(if_none_match):
+        return Response(status_code=304, headers=headers)
+    return Response(content=cached.body, media_type="application/json", headers=headers)
 
 @app.post("/analyze/viral-content")
 async def analyze_viral_content(request: dict):
@@ -596,6 +868,11 @@ async def analyze_viral_content(request: dict):
             yield f"data: {json.dumps({'progress': f'@{username} 콘텐츠 분석 시작...'})}\n\n"
             await asyncio.sleep(0.5)
             
+            skip_message = negative_cache_message(username)
+            if skip_message:
+                yield f"data: {json.dumps({'error': skip_message})}\n\n"
+                return
+            
             # 환경변수에서 인증 정보 가져오기 (Render.com)
             username_auth = os.environ.get('INSTAGRAM_USERNAME')
             password = os.environ.get('INSTAGRAM_PASSWORD')
@@ -617,7 +894,10 @@ async def analyze_viral_content(request: dict):
                 output_dir="temp_results",
                 max_user_posts=30,
                 username=username_auth,
-                password=password
+                password=password,
+                profile_cache=get_profile_cache(),
+                negative_cache=get_negative_cache(),
+                feed_store=get_feed_store()
             )
             
             loop = asyncio.get_event_loop()
@@ -628,7 +908,7 @@ async def analyze_viral_content(request: dict):
             
             profile = await loop.run_in_executor(
                 None,
-                crawler.scrape_instagram_profile,
+                crawler.get_profile,
                 username,
                 None
             )
@@ -640,11 +920,12 @@ async def analyze_viral_content(request: dict):
             posts = profile.get('recent_posts_raw', [])[:30]
             
             # 바이럴 게시물 식별 (평균 대비 2배 이상 참여율)
-            avg_engagement = sum(p.get('like_count', 0) + p.get('comment_count', 0) for p in posts) / len(posts) if posts else 0
-            viral_posts = [p for p in posts if (p.get('like_count', 0) + p.get('comment_count', 0)) > avg_engagement * 2]
+            stats = EngagementStats(posts)
+            avg_engagement = stats.mean()
+            viral_posts = stats.above(avg_engagement * 2)
             
             if not viral_posts:
-                viral_posts = sorted(posts, key=lambda x: x.get('like_count', 0) + x.get('comment_count', 0), reverse=True)[:5]
+                viral_posts = stats.top_k(5)
             
             yield f"data: {json.dumps({'progress': f'{len(viral_posts)}개 인기 게시물 분석 중...'})}\n\n"
             await asyncio.sleep(0.5)
@@ -653,7 +934,7 @@ async def analyze_viral_content(request: dict):
             viral_analysis = []
             for post in viral_posts[:3]:
                 caption = post.get('caption', '')
-                hashtags = [tag.strip() for tag in caption.split() if tag.startswith('#')]
+                hashtags = [f'#{tag}' for tag in features_for(post).hashtags]
                 
                 # 성공 요인 분석
                 success_factors = analyze_success_factors(post, avg_engagement, profile.get('followers', 0))
@@ -727,7 +1008,7 @@ def analyze_success_factors(post, avg_engagement, followers):
     """게시물의 성공 요인 분석"""
     factors = []
     engagement = post.get('like_count', 0) + post.get('comment_count', 0)
-    caption = post.get('caption', '')
+    features = features_for(post)
     
     # 참여율 분석
     engagement_rate = (engagement / followers * 100) if followers > 0 else 0
@@ -737,19 +1018,18 @@ def analyze_success_factors(post, avg_engagement, followers):
         factors.append(f"✨ 높은 참여율 ({engagement_rate:.1f}%)")
     
     # 캡션 분석
-    if '?' in caption:
+    if features.has_question:
         factors.append("❓ 질문으로 참여 유도")
-    if any(emoji in caption for emoji in ['😍', '❤️', '🔥', '😂', '🤣']):
+    if features.emoji_classes.get('emotion'):
         factors.append("😊 감정적 이모지 사용")
-    if len(caption) < 100:
+    if features.length < 100:
         factors.append("📝 간결한 캡션")
-    elif len(caption) > 500:
+    elif features.length > 500:
         factors.append("📖 스토리텔링 캡션")
     
     # 해시태그 분석
-    hashtags = [tag for tag in caption.split() if tag.startswith('#')]
-    if 5 <= len(hashtags) <= 10:
-        factors.append(f"#️⃣ 최적 해시태그 수 ({len(hashtags)}개)")
+    if 5 <= len(features.hashtags) <= 10:
+        factors.append(f"#️⃣ 최적 해시태그 수 ({len(features.hashtags)}개)")
     
     # 콘텐츠 타입
     if post.get('is_reel'):
@@ -773,7 +1053,7 @@ def generate_copy_ideas(post, hashtags, success_factors):
         ideas.append({
             'type': '질문 후크',
             'template': '당신도 [주제]에 대해 이런 경험 있나요?',
-            'example': caption[:50] if '?' in caption else '이런 상황 공감되시나요?'
+            'example': caption[:50] if features_for(post).has_question else '이런 상황 공감되시나요?'
         })
     
     # 감정 어필
@@ -856,9 +1136,7 @@ def analyze_optimal_hashtag_count(posts):
     """최적 해시태그 개수 분석"""
     hashtag_counts = []
     for post in posts:
-        caption = post.get('caption', '')
-        hashtags = [tag for tag in caption.split() if tag.startswith('#')]
-        hashtag_counts.append(len(hashtags))
+        hashtag_counts.append(len(features_for(post).hashtags))
     
     if hashtag_counts:
         avg_count = sum(hashtag_counts) // len(hashtag_counts)
@@ -870,13 +1148,7 @@ def analyze_engagement_triggers(posts):
     triggers = []
     
     for post in posts:
-        caption = post.get('caption', '')
-        if '?' in caption:
-            triggers.append("질문")
-        if any(word in caption.lower() for word in ['공감', '같이', '함께', '여러분']):
-            triggers.append("공감 유도")
-        if any(emoji in caption for emoji in ['🎁', '🎉', '🎊']):
-            triggers.append("이벤트/혜택")
+        triggers.extend(features_for(post).engagement_triggers)
     
     return list(set(triggers)) if triggers else ["시각적 임팩트", "트렌드 활용"]
 
@@ -1084,7 +1356,7 @@ async def save_influencer(
 async def viral_analysis_endpoint(request: dict):
     """바이럴 콘텐츠 심층 분석"""
     try:
-        analyzer = ViralContentAnalyzer()
+        analyzer = get_analyzer()
         
         # 콘텐츠 데이터 구성
         content_data = {
@@ -1117,6 +1389,27 @@ async def viral_analysis_endpoint(request: dict):
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
+@app.post("/api/viral/analyze/batch")
+async def viral_batch_analysis_endpoint(request: dict):
+    """바이럴 콘텐츠 일괄 분석 (게시물 수천 개를 한 번에 점수화, explain=true면 게시물별 설명 문구 포함)"""
+    posts = request.get('posts') or []
+    if not isinstance(posts, list) or not posts:
+        raise HTTPException(status_code=400, detail="분석할 게시물 목록(posts)이 필요합니다")
+    if len(posts) > VIRAL_BATCH_MAX_POSTS:
+        raise HTTPException(status_code=400, detail=f"한 번에 최대 {VIRAL_BATCH_MAX_POSTS}개까지 분석할 수 있습니다")
+    
+    try:
+        # 수천 개 분석은 이벤트 루프를 막지 않도록 스레드에서 실행
+        analysis = await asyncio.get_running_loop().run_in_executor(
+            None, analyze_viral_contents, posts, bool(request.get('explain', False))
+        )
+        return {
+            'success': True,
+            **analysis
+        }
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
 @app.post("/api/content/ideas")
 async def generate_content_ideas_endpoint(request: dict):
     """AI 기반 콘텐츠 아이디어 생성"""
@@ -1156,48 +1449,68 @@ async def predict_performance_endpoint(request: dict):
         raise HTTPException(status_code=500, detail=str(e))
 
 @app.get("/api/trending/hashtags")
-async def get_trending_hashtags(category: str = None):
-    """트렌딩 해시태그 조회"""
+async def get_trending_hashtags(category: str = None, country: str = None, limit: int = 30,
+                                if_none_match: str = Header(None)):
+    """트렌딩 해시태그 조회
+    
+    수집 게시물의 시간 감쇠 상위 해시태그(trending)로 답하고, 해당 스트림에 수집된 게시물이 없으면
+    지식 베이스의 정적 목록(버전별로 미리 만든 응답)을 돌려줍니다. 두 경우 모두 ETag / 304를 지원합니다.
+    """
     try:
-        analyzer = ViralContentAnalyzer()
+        knowledge = get_knowledge_base()
+        ranked = get_trending().top(category, country, k=max(1, min(limit, TRENDING_MAX_LIMIT)))
+        if not ranked:
+            return _cached_json_response(knowledge.trending_response(category), if_none_match)
         
-        if category:
-            hashtags = analyzer.hashtag_database['trending'].get(category, [])
-        else:
-            all_hashtags = []
-            for cat_hashtags in analyzer.hashtag_database['trending'].values():
-                all_hashtags.extend(cat_hashtags)
-            hashtags = list(set(all_hashtags))[:30]
-        
-        return {
+        return _cached_json_response(CachedResponse({
             'success': True,
             'category': category,
-            'hashtags': hashtags,
-            'power_tags': analyzer.hashtag_database['power_tags']['universal'][:10]
-        }
+            'country': country,
+            'source': 'stream',
+            'hashtags': [row['tag'] for row in ranked],
+            'scores': ranked,
+            'power_tags': list(knowledge.hashtag_database['power_tags']['universal'][:POWER_TAG_LIMIT])
+        }), if_none_match)
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
+@app.get("/api/hashtags/related")
+async def get_related_hashtags(tags: str, limit: int = 10):
+    """함께 쓰면 좋은 해시태그 (tags: 쉼표로 구분한 해시태그, 수집 게시물의 동시 출현 PMI로 미리 계산한 인덱스 조회)"""
+    hashtags = [tag.strip() for tag in tags.split(',') if tag.strip()][:RELATED_MAX_TAGS]
+    if not hashtags:
+        raise HTTPException(status_code=400, detail="tags가 비어 있습니다")
+    related = get_cooccurrence_index().related(hashtags, limit=max(1, min(limit, RELATED_MAX_LIMIT)))
+    return {
+        'success': True,
+        'hashtags': hashtags,
+        'related': related
+    }
+
 @app.get("/api/patterns/{category}")
-async def get_viral_patterns(category: str):
-    """카테고리별 바이럴 패턴 조회"""
+async def get_viral_patterns(category: str, country: str = None, if_none_match: str = Header(None)):
+    """카테고리별 바이럴 패턴 조회 (country가 있으면 그 국가의 학습 패턴, 지식 베이스 버전별로 미리 만든 응답 + ETag)"""
     try:
-        analyzer = ViralContentAnalyzer()
-        pattern = analyzer.viral_patterns.get(category)
+        cached = get_knowledge_base().pattern_response(category, country)
         
-        if not pattern:
+        if not cached:
             raise HTTPException(status_code=404, detail=f"카테고리 '{category}'를 찾을 수 없습니다")
         
-        return {
-            'success': True,
-            'category': category,
-            'pattern': pattern
-        }
+        return _cached_json_response(cached, if_none_match)
     except HTTPException:
         raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
+@app.post("/api/knowledge/reload")
+async def reload_knowledge_base(current_user: dict = Depends(get_current_user)):
+    """지식 베이스 데이터 파일을 즉시 다시 읽기 (실패하면 이전 버전 유지)"""
+    try:
+        knowledge = get_knowledge_store().reload(force=True)
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"지식 베이스를 읽을 수 없습니다: {e}")
+    return {'success': True, 'version': knowledge.version}
+
 @app.post("/api/gemini/analyze")
 async def gemini_analysis_endpoint(request: dict, x_gemini_api_key: str = Header(None)):
     """Gemini AI를 활용한 현실적인 인플루언서 분석"""
@@ -1502,6 +1815,20 @@ async def crawl_followers(request: dict):
         "accounts_used": len(follower_accounts)
     }
 
+@app.get("/api/crawler/stats")
+async def crawler_stats():
+    """크롤러 상태 (요청 스케줄러 속도/대기열, 프로필 캐시 적중률, 원본 아카이브 압축률, 패턴 집계 / 트렌딩 / 해시태그 동시 출현 현황)"""
+    return {
+        "transport": get_transport().stats(),
+        "profile_cache": get_profile_cache().stats(),
+        "negative_cache": get_negative_cache().stats(),
+        "raw_archive": get_raw_archive().stats(),
+        "pattern_aggregator": get_pattern_aggregator().stats(),
+        "trending": get_trending().stats(),
+        "cooccurrence": get_cooccurrence_index().stats(),
+        "timestamp": datetime.now().isoformat()
+    }
+
 @app.get("/health")
 async def health_check():
     return {"status": "healthy", "timestamp": datetime.now().isoformat()}
@@ -19,6 +19,13 @@ import aiohttp
 from collections import deque
 import hashlib
 
+# Instagram/ 공용 모듈(ig_transport) 경로 등록 후 import
+try:
+    import api.instagram_modules  # noqa: F401
+except ImportError:
+    import instagram_modules  # noqa: F401
+from ig_transport import get_transport
+
 app = FastAPI()
 
 # CORS 설정
@@ -158,14 +165,13 @@ class AccountManager:
                 state["cooldown_until"] = datetime.now() + timedelta(minutes=30)
         else:
             state["errors"] = 0  # 성공시 에러 카운트 리셋
-            
-        # 50번 요청마다 5분 쿨다운
-        if state["requests_made"] % 50 == 0:
-            state["cooldown_until"] = datetime.now() + timedelta(minutes=5)
+        # 요청 속도는 전송 계층의 토큰 버킷 스케줄러(AIMD)가 429/오류 응답에 맞춰 조절
 
 class MultiAccountFollowerCrawler:
     def __init__(self):
         self.account_manager = AccountManager()
+        # 계정/프록시별 keep-alive 세션 공유
+        self.transport = get_transport()
         self.user_agents = [
             "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36",
             "Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36",
@@ -194,7 +200,7 @@ class MultiAccountFollowerCrawler:
                 print(f"계정 {account['username']} 로그인 실패: {e}")
                 return None
     
-    def _make_request(self, url: str, account: dict, params: dict = None):
+    def _make_request(self, url: str, account: dict, params: dict = None, endpoint: str = None):
         """프록시와 계정 정보를 사용하여 요청"""
         cookies = self._get_cookies_for_account(account)
         if not cookies:
@@ -210,15 +216,16 @@ class MultiAccountFollowerCrawler:
             "referer": "https://www.instagram.com/"
         }
         
-        proxies = None
-        if account.get("proxy"):
-            proxies = {
-                "http": account["proxy"],
-                "https": account["proxy"]
-            }
-            
         try:
-            resp = requests.get(url, headers=headers, params=params, proxies=proxies, timeout=10)
+            resp = self.transport.get(
+                url,
+                account=account["username"],
+                proxy=account.get("proxy"),
+                headers=headers,
+                params=params,
+                timeout=10,
+                endpoint=endpoint
+            )
             return resp
         except Exception as e:
             print(f"요청 실패 ({account['username']}): {e}")
@@ -235,7 +242,7 @@ class MultiAccountFollowerCrawler:
             
         # User ID 획득
         url = f"https://i.instagram.com/api/v1/users/web_profile_info/?username={target_username}"
-        resp = self._make_request(url, account)
+        resp = self._make_request(url, account, endpoint="profile")
         
         if not resp or resp.status_code != 200:
             return {"success": False, "error": "사용자를 찾을 수 없습니다."}
@@ -256,7 +263,6 @@ class MultiAccountFollowerCrawler:
             # 계정 로테이션
             if request_count > 0 and request_count % 30 == 0:  # 30개 요청마다 계정 전환
                 print(f"계정 전환 (현재 {account['username']}에서 {request_count}개 요청 완료)")
-                time.sleep(random.uniform(5, 10))  # 계정 전환시 딜레이
                 
             account = self.account_manager.get_next_account()
             if not account:
@@ -274,7 +280,7 @@ class MultiAccountFollowerCrawler:
             if next_max_id:
                 params["max_id"] = next_max_id
                 
-            resp = self._make_request(base_url, account, params)
+            resp = self._make_request(base_url, account, params, endpoint="followers")
             
             if resp and resp.status_code == 200:
                 data = resp.json()
@@ -305,10 +311,8 @@ class MultiAccountFollowerCrawler:
                 if not next_max_id or not users:
                     break
                     
-                # 요청 간 딜레이 (랜덤)
-                delay = random.uniform(1.0, 3.0)
-                print(f"[{account['username']}] {len(users)}명 수집 완료, {delay:.1f}초 대기...")
-                time.sleep(delay)
+                # 요청 간격은 스케줄러가 조절하므로 고정 딜레이 없음
+                print(f"[{account['username']}] {len(users)}명 수집 완료")
                 
             elif resp and resp.status_code == 429:
                 # Rate limit - 계정 쿨다운 설정
@@ -371,6 +375,7 @@ async def account_status():
     return {
         "total_accounts": len(manager.accounts),
         "account_states": manager.account_states,
+        "scheduler": get_transport().stats().get("scheduler", {}),
         "timestamp": datetime.now().isoformat()
     }
 
@@ -0,0 +1,14 @@
+"""
+Instagram/ 디렉토리 모듈 경로 등록
+대시보드 API가 크롤러 쪽 공용 모듈(caption_features / pattern_aggregator / cooccurrence 등)을 import 할 수 있도록
+저장소의 Instagram/ 디렉토리를 sys.path에 한 번만 추가합니다. 이 모듈을 먼저 import 한 뒤 공용 모듈을 import 하세요.
+"""
+
+import sys
+from pathlib import Path
+
+# 대소문자를 구분하는 파일 시스템에서도 찾을 수 있도록 실제 디렉토리 이름(Instagram) 사용
+INSTAGRAM_DIR = Path(__file__).resolve().parent.parent.parent / "Instagram"
+
+if str(INSTAGRAM_DIR) not in sys.path:
+    sys.path.append(str(INSTAGRAM_DIR))
@@ -0,0 +1,251 @@
+"""
+바이럴 분석 지식 베이스 (프로세스 전역, 읽기 전용)
+바이럴 패턴 / 해시태그 DB / 콘텐츠 템플릿 / 아이디어 / 캡션 템플릿을 데이터 파일(viral_knowledge.json)에서 한 번 읽어
+변경할 수 없는 구조(MappingProxyType / tuple)로 만들고 모든 요청이 같은 객체를 공유합니다.
+- version은 데이터 파일(+ 학습 패턴 파일) 내용의 sha256 앞 12자리이며, 내용이 같으면 다시 만들지 않습니다.
+- 파일이 바뀌면(mtime / 크기) 새 지식 베이스를 완성한 뒤 참조 하나만 바꿔 끼우므로 읽는 쪽은 잠금 없이 항상 온전한 버전을 봅니다.
+- 읽기 전용 API(/api/trending/hashtags, /api/patterns/{category})의 응답 본문과 ETag는 버전별로 미리 만들어 둡니다.
+
+- 수집 게시물에서 학습한 패턴 표(pattern_aggregator가 게시하는 learned_patterns.json)도 함께 감시하며,
+  표본이 충분한 카테고리는 best_times / hashtag_count / avg_viral_rate를 학습값으로 덮어씁니다 (국가별 값은 pattern_for).
+
+- 캡션 어휘(바이럴 트리거 / 훅 / 트렌드 / 파워 태그)도 데이터 파일에 있으며, 버전마다 그 어휘를 오토마톤으로 컴파일한
+  CaptionExtractor(extractor)를 만들어 둡니다. 분석기는 features_for(post, extractor=knowledge.extractor)로 캡션을 스캔합니다.
+"""
+
+import hashlib
+import json
+import os
+import threading
+import time
+from pathlib import Path
+from types import MappingProxyType
+
+# Instagram/ 공용 모듈(caption_features / pattern_aggregator) 경로 등록 후 import
+try:
+    import api.instagram_modules  # noqa: F401
+except ImportError:
+    import instagram_modules  # noqa: F401
+from caption_features import CaptionExtractor
+from pattern_aggregator import ALL_COUNTRIES, DEFAULT_PATTERNS_PATH
+
+DEFAULT_PATH = Path(__file__).with_name("viral_knowledge.json")
+# 파일 변경 여부를 확인하는 최소 간격 (초)
+DEFAULT_CHECK_INTERVAL = 5.0
+# 전체 카테고리 트렌딩 해시태그 응답의 최대 개수 / 파워 태그 개수
+TRENDING_ALL_LIMIT = 30
+POWER_TAG_LIMIT = 10
+# 학습한 패턴에서 데이터 파일 값을 덮어쓰는 필드 (나머지 학습 지표는 pattern['learned']에 추가)
+LEARNED_FIELDS = ("best_times", "hashtag_count", "avg_viral_rate")
+
+
+def freeze(value):
+    """dict -> MappingProxyType, list -> tuple (중첩 포함)"""
+    if isinstance(value, (dict, MappingProxyType)):
+        return MappingProxyType({key: freeze(item) for key, item in value.items()})
+    if isinstance(value, (list, tuple)):
+        return tuple(freeze(item) for item in value)
+    return value
+
+
+def thaw(value):
+    """freeze의 반대 - 요청별로 수정할 복사본이 필요할 때 사용"""
+    if isinstance(value, (dict, MappingProxyType)):
+        return {key: thaw(item) for key, item in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [thaw(item) for item in value]
+    return value
+
+
+class CachedResponse:
+    """미리 직렬화한 JSON 응답 본문과 ETag"""
+    __slots__ = ("body", "etag")
+
+    def __init__(self, payload):
+        # FastAPI JSONResponse와 같은 직렬화 설정
+        self.body = json.dumps(payload, ensure_ascii=False, allow_nan=False, separators=(",", ":")).encode("utf-8")
+        self.etag = f'"{hashlib.sha256(self.body).hexdigest()[:16]}"'
+
+    def matches(self, if_none_match):
+        """If-None-Match 헤더 값과 일치하면 True (304 응답 대상)"""
+        if not if_none_match:
+            return False
+        if if_none_match.strip() == "*":
+            return True
+        return any(tag.strip().removeprefix("W/") == self.etag for tag in if_none_match.split(","))
+
+
+class KnowledgeBase:
+    """한 버전의 지식 베이스 (생성 후 읽기 전용, 스레드 안전)"""
+
+    def __init__(self, data, version, learned=None):
+        self.version = version
+        learned = learned or {}
+        base_patterns = {
+            category: dict(pattern, viral_triggers=data["viral_triggers"].get(category, []))
+            for category, pattern in data["viral_patterns"].items()
+        }
+        self.viral_patterns = freeze({
+            category: _apply_learned(pattern, learned.get(category, {}).get(ALL_COUNTRIES))
+            for category, pattern in base_patterns.items()
+        })
+        # 국가별 학습 패턴 (데이터 파일에 있는 카테고리만)
+        self._country_patterns = {
+            (category, country): freeze(_apply_learned(base_patterns[category], pattern))
+            for category, countries in learned.items() if category in base_patterns
+            for country, pattern in countries.items() if country != ALL_COUNTRIES
+        }
+        self.hashtag_database = freeze({
+            "trending": data["trending_tags"],
+            "power_tags": data["power_tags"],
+            "seasonal": data["seasonal_tags"],
+        })
+        self.content_templates = freeze({
+            "caption_hooks": data["caption_hooks"],
+            "visual_styles": data["visual_styles"],
+            "content_structures": data["content_structures"],
+        })
+        self.content_ideas = freeze(data["content_ideas"])
+        self.caption_templates = freeze(data["caption_templates"])
+        # 이 버전의 캡션 어휘로 컴파일한 추출기 (데이터 파일이 바뀌면 새 버전과 함께 다시 만듦)
+        self.extractor = CaptionExtractor(
+            [word for words in data["viral_triggers"].values() for word in words]
+            + [tag for tags in data["trending_tags"].values() for tag in tags]
+            + [tag for tags in data["power_tags"].values() for tag in tags],
+            hook_patterns=data["caption_hooks"],
+        )
+
+        trending = self.hashtag_database["trending"]
+        self._trending_responses = {None: CachedResponse(self._trending_payload(None))}
+        for category in trending:
+            self._trending_responses[category] = CachedResponse(self._trending_payload(category))
+        self._pattern_responses = {
+            (category, None): CachedResponse({'success': True, 'category': category, 'pattern': thaw(pattern)})
+            for category, pattern in self.viral_patterns.items()
+        }
+        for (category, country), pattern in self._country_patterns.items():
+            self._pattern_responses[(category, country)] = CachedResponse(
+                {'success': True, 'category': category, 'country': country, 'pattern': thaw(pattern)}
+            )
+
+    def _trending_payload(self, category):
+        trending = self.hashtag_database["trending"]
+        if category:
+            hashtags = list(trending.get(category, ()))
+        else:
+            # 카테고리 간 중복 제거 (처음 나온 순서 유지 - 응답과 ETag가 프로세스마다 같도록)
+            hashtags = list(dict.fromkeys(tag for tags in trending.values() for tag in tags))[:TRENDING_ALL_LIMIT]
+        return {
+            'success': True,
+            'category': category,
+            'hashtags': hashtags,
+            'power_tags': list(self.hashtag_database["power_tags"]["universal"][:POWER_TAG_LIMIT]),
+        }
+
+    def trending_response(self, category=None):
+        """트렌딩 해시태그 응답 (알려지지 않은 카테고리는 캐시하지 않고 매번 생성)"""
+        cached = self._trending_responses.get(category or None)
+        return cached or CachedResponse(self._trending_payload(category))
+
+    def pattern_for(self, category, country=None):
+        """카테고리 패턴 - country의 학습 패턴이 있으면 그것, 없으면 전체 국가 기준 패턴 (없는 카테고리면 None)"""
+        if country:
+            pattern = self._country_patterns.get((category, country.lower()))
+            if pattern is not None:
+                return pattern
+        return self.viral_patterns.get(category)
+
+    def pattern_response(self, category, country=None):
+        """카테고리별 바이럴 패턴 응답 (없는 카테고리면 None, 학습 패턴이 없는 국가는 전체 기준 응답)"""
+        if country:
+            cached = self._pattern_responses.get((category, country.lower()))
+            if cached is not None:
+                return cached
+        return self._pattern_responses.get((category, None))
+
+
+def _apply_learned(pattern, learned):
+    """데이터 파일 패턴 + 학습 패턴 (학습 표본이 없으면 원래 패턴 그대로)"""
+    if not learned:
+        return pattern
+    merged = dict(pattern)
+    for field in LEARNED_FIELDS:
+        if learned.get(field):
+            merged[field] = learned[field]
+    merged["learned"] = {key: value for key, value in learned.items() if key not in LEARNED_FIELDS}
+    return merged
+
+
+class KnowledgeBaseStore:
+    """데이터 파일 -> 현재 KnowledgeBase (파일이 바뀌면 다시 읽어 원자적으로 교체)"""
+
+    def __init__(self, path=DEFAULT_PATH, check_interval=DEFAULT_CHECK_INTERVAL, learned_path=DEFAULT_PATTERNS_PATH):
+        self.path = Path(path)
+        self.learned_path = Path(learned_path) if learned_path else None
+        self.check_interval = check_interval
+        self._lock = threading.Lock()
+        self._signature = None
+        self._checked_at = 0.0
+        self._current = None
+        self.reload(force=True)
+
+    def _stat_signature(self):
+        stat = os.stat(self.path)
+        signature = (stat.st_mtime_ns, stat.st_size)
+        if self.learned_path is not None and self.learned_path.exists():
+            learned = os.stat(self.learned_path)
+            signature += (learned.st_mtime_ns, learned.st_size)
+        return signature
+
+    def current(self):
+        """현재 버전 - check_interval마다 파일 변경을 확인하고, 다시 읽기에 실패하면 이전 버전을 계속 사용"""
+        if time.monotonic() - self._checked_at >= self.check_interval:
+            try:
+                self.reload()
+            except (OSError, ValueError, KeyError) as e:
+                print(f"지식 베이스 다시 읽기 실패 ({self.path}), 이전 버전 유지: {e}")
+        return self._current
+
+    def reload(self, force=False):
+        """파일이 바뀌었으면(force면 무조건) 새 버전을 만들어 교체하고 현재 버전 반환
+
+        읽기 / 파싱 / 구성 중 오류는 그대로 올리며 이 경우 현재 버전은 바뀌지 않습니다.
+        """
+        with self._lock:
+            self._checked_at = time.monotonic()
+            signature = self._stat_signature()
+            if not force and signature == self._signature:
+                return self._current
+            raw = self.path.read_bytes()
+            learned_raw = b""
+            if self.learned_path is not None and self.learned_path.exists():
+                learned_raw = self.learned_path.read_bytes()
+            version = hashlib.sha256(raw + b"\0" + learned_raw).hexdigest()[:12]
+            if self._current is None or self._current.version != version:
+                learned = json.loads(learned_raw.decode("utf-8")).get("patterns", {}) if learned_raw else {}
+                # 완성된 객체로만 교체 (읽는 쪽은 이전 버전 또는 새 버전 중 하나를 온전히 봄)
+                self._current = KnowledgeBase(json.loads(raw.decode("utf-8")), version, learned)
+            self._signature = signature
+            return self._current
+
+
+_default_store = None
+_default_store_lock = threading.Lock()
+
+
+def get_knowledge_store():
+    """프로세스 전역 지식 베이스 저장소 (VIRAL_KNOWLEDGE_PATH / VIRAL_KNOWLEDGE_CHECK_INTERVAL / LEARNED_PATTERNS_PATH 환경변수로 설정)"""
+    global _default_store
+    with _default_store_lock:
+        if _default_store is None:
+            _default_store = KnowledgeBaseStore(
+                path=os.environ.get("VIRAL_KNOWLEDGE_PATH", DEFAULT_PATH),
+                check_interval=float(os.environ.get("VIRAL_KNOWLEDGE_CHECK_INTERVAL", DEFAULT_CHECK_INTERVAL)),
+                learned_path=os.environ.get("LEARNED_PATTERNS_PATH", DEFAULT_PATTERNS_PATH),
+            )
+        return _default_store
+
+
+def get_knowledge_base():
+    """현재 버전의 지식 베이스"""
+    return get_knowledge_store().current()
@@ -12,6 +12,26 @@ from collections import Counter
 import statistics
 import math
 
+import numpy as np
+
+# Instagram/ 공용 모듈(caption_features 등) 경로 등록 후 import
+try:
+    import api.instagram_modules  # noqa: F401
+except ImportError:
+    import instagram_modules  # noqa: F401
+from caption_features import features_for
+
+# 동시 출현 인덱스가 없으면 추천 해시태그만 비움 (분석은 계속)
+try:
+    from cooccurrence import get_cooccurrence_index
+except ImportError:
+    get_cooccurrence_index = None
+
+try:
+    from api.knowledge_base import get_knowledge_base, thaw
+except ImportError:
+    from knowledge_base import get_knowledge_base, thaw
+
 @dataclass
 class ContentMetrics:
     """콘텐츠 성과 지표"""
@@ -36,159 +56,44 @@ class ViralFactors:
     success_factors: List[str]
     improvement_suggestions: List[str]
 
+def to_content_data(post: Dict) -> Dict:
+    """크롤러 게시물(like_count / comment_count / view_count / is_reel / taken_at_timestamp)을 analyze_content 입력 형식으로 변환
+    
+    이미 analyze_content 형식이면 그대로 반환합니다.
+    """
+    if 'like_count' not in post and 'comment_count' not in post:
+        return post
+    content = {
+        'type': 'reels' if post.get('is_reel') else post.get('type', 'post'),
+        'caption': post.get('caption') or '',
+        'hashtags': list(post.get('hashtags') or []),
+        'likes': post.get('like_count') or 0,
+        'comments': post.get('comment_count') or 0,
+        'shares': post.get('shares', 0),
+        'saves': post.get('saves', 0),
+    }
+    if post.get('view_count'):
+        content['views'] = post['view_count']
+    if post.get('taken_at_timestamp'):
+        content['timestamp'] = datetime.fromtimestamp(post['taken_at_timestamp']).isoformat()
+    for key in ('id', 'shortcode'):
+        if post.get(key):
+            content[key] = post[key]
+    return content
+
 class ViralContentAnalyzer:
     """바이럴 콘텐츠 분석 엔진"""
     
-    def __init__(self):
-        self.viral_patterns = self._load_viral_patterns()
-        self.hashtag_database = self._load_hashtag_database()
-        self.content_templates = self._load_content_templates()
-        
-    def _load_viral_patterns(self) -> Dict:
-        """바이럴 패턴 데이터베이스 - 확장된 카테고리"""
-        return {
-            "먹방": {
-                "key_elements": ["리얼사운드", "클로즈업", "먹는표정", "음식비주얼"],
-                "best_times": ["12:00-13:00", "18:00-20:00", "22:00-23:00"],
-                "optimal_duration": "15-60초",
-                "hashtag_count": "5-8개",
-                "viral_triggers": ["ASMR", "첫입반응", "큰한입", "치즈늘어남"],
-                "avg_viral_rate": 0.15
-            },
-            "여행": {
-                "key_elements": ["절경", "일출일몰", "드론샷", "현지음식", "숨은명소"],
-                "best_times": ["07:00-09:00", "17:00-19:00", "20:00-22:00"],
-                "optimal_duration": "30-90초",
-                "hashtag_count": "8-12개",
-                "viral_triggers": ["비현실적풍경", "로컬체험", "여행팁", "감성자막"],
-                "avg_viral_rate": 0.12
-            },
-            "패션": {
-                "key_elements": ["전신샷", "디테일샷", "코디법", "브랜드태그"],
-                "best_times": ["10:00-12:00", "14:00-16:00", "19:00-21:00"],
-                "optimal_duration": "10-30초",
-                "hashtag_count": "10-15개",
-                "viral_triggers": ["변신", "비포애프터", "코디팁", "세일정보"],
-                "avg_viral_rate": 0.10
-            },
-            "뷰티": {
-                "key_elements": ["비포애프터", "튜토리얼", "제품리뷰", "피부변화"],
-                "best_times": ["09:00-11:00", "15:00-17:00", "21:00-23:00"],
-                "optimal_duration": "30-120초",
-                "hashtag_count": "8-12개",
-                "viral_triggers": ["즉각효과", "꿀팁공유", "신제품", "할인코드"],
-                "avg_viral_rate": 0.13
-            },
-            "운동": {
-                "key_elements": ["운동자세", "비포애프터", "루틴공유", "동기부여"],
-                "best_times": ["06:00-08:00", "12:00-13:00", "18:00-20:00"],
-                "optimal_duration": "15-45초",
-                "hashtag_count": "6-10개",
-                "viral_triggers": ["챌린지", "변화과정", "홈트", "식단공유"],
-                "avg_viral_rate": 0.11
-            },
-            "일상": {
-                "key_elements": ["브이로그", "루틴", "일기", "TMI"],
-                "best_times": ["08:00-10:00", "20:00-22:00"],
-                "optimal_duration": "30-180초",
-                "hashtag_count": "5-10개",
-                "viral_triggers": ["공감대", "소소한행복", "일상공유", "힐링"],
-                "avg_viral_rate": 0.08
-            },
-            "반려동물": {
-                "key_elements": ["귀여운순간", "일상", "훈련", "케어팁"],
-                "best_times": ["19:00-21:00", "22:00-23:00"],
-                "optimal_duration": "15-60초",
-                "hashtag_count": "8-12개",
-                "viral_triggers": ["아기동물", "재롱", "감동스토리", "훈련과정"],
-                "avg_viral_rate": 0.14
-            },
-            "요리": {
-                "key_elements": ["레시피", "과정샷", "완성샷", "꿀팁"],
-                "best_times": ["11:00-12:00", "17:00-19:00"],
-                "optimal_duration": "30-90초",
-                "hashtag_count": "6-10개",
-                "viral_triggers": ["초간단", "에어프라이어", "다이어트", "자취요리"],
-                "avg_viral_rate": 0.11
-            },
-            "육아": {
-                "key_elements": ["성장기록", "육아팁", "놀이법", "제품리뷰"],
-                "best_times": ["10:00-11:00", "14:00-15:00", "20:00-21:00"],
-                "optimal_duration": "30-120초",
-                "hashtag_count": "8-12개",
-                "viral_triggers": ["첫경험", "성장순간", "육아꿀팁", "공감대화"],
-                "avg_viral_rate": 0.10
-            },
-            "공부": {
-                "key_elements": ["공부법", "플래너", "스터디윗미", "자격증"],
-                "best_times": ["07:00-09:00", "19:00-21:00", "22:00-24:00"],
-                "optimal_duration": "30-180초",
-                "hashtag_count": "5-10개",
-                "viral_triggers": ["공부자극", "합격후기", "스터디팁", "타임랩스"],
-                "avg_viral_rate": 0.09
-            },
-            "인테리어": {
-                "key_elements": ["비포애프터", "DIY", "수납팁", "제품추천"],
-                "best_times": ["10:00-12:00", "20:00-22:00"],
-                "optimal_duration": "30-120초",
-                "hashtag_count": "10-15개",
-                "viral_triggers": ["셀프인테리어", "소품", "정리정돈", "공간활용"],
-                "avg_viral_rate": 0.11
-            },
-            "예술": {
-                "key_elements": ["작업과정", "완성작", "튜토리얼", "전시소식"],
-                "best_times": ["14:00-16:00", "20:00-22:00"],
-                "optimal_duration": "30-180초",
-                "hashtag_count": "8-12개",
-                "viral_triggers": ["타임랩스", "비포애프터", "DIY아트", "작품스토리"],
-                "avg_viral_rate": 0.09
-            }
-        }
-    
-    def _load_hashtag_database(self) -> Dict:
-        """해시태그 트렌드 데이터베이스"""
-        return {
-            "trending": {
-                "먹방": ["맛집", "먹스타그램", "푸드스타그램", "맛집투어", "혼밥", "야식", "신상맛집"],
-                "여행": ["여행스타그램", "여행에미치다", "국내여행", "해외여행", "여행코스", "숨은명소"],
-                "패션": ["데일리룩", "패션스타그램", "옷스타그램", "코디", "패션피플", "스트릿패션"],
-                "뷰티": ["뷰티스타그램", "화장품추천", "메이크업", "스킨케어", "뷰티팁", "신상코스메틱"],
-                "운동": ["운동스타그램", "헬스타그램", "홈트", "다이어트", "운동루틴", "바디프로필"]
-            },
-            "power_tags": {
-                "universal": ["일상", "데일리", "오늘", "주말", "좋아요", "팔로우", "소통"],
-                "engagement": ["이벤트", "선물", "공유", "댓글", "참여", "질문", "꿀팁"]
-            },
-            "seasonal": {
-                "spring": ["봄", "벚꽃", "봄나들이", "봄패션", "봄신상"],
-                "summer": ["여름", "바다", "휴가", "여름휴가", "바캉스"],
-                "fall": ["가을", "단풍", "가을여행", "가을패션", "가을코디"],
-                "winter": ["겨울", "크리스마스", "연말", "겨울여행", "겨울패션"]
-            }
-        }
-    
-    def _load_content_templates(self) -> Dict:
-        """콘텐츠 템플릿 데이터베이스"""
-        return {
-            "caption_hooks": {
-                "question": ["~한 사람?", "~해본 사람 있나요?", "뭐가 더 좋을까요?"],
-                "challenge": ["~챌린지", "~하기 도전", "~일 동안"],
-                "tips": ["~하는 꿀팁", "~하는 방법", "알아두면 좋은"],
-                "story": ["~했던 썰", "~한 이야기", "경험담"],
-                "recommendation": ["~추천", "인생 ~", "최고의 ~"]
-            },
-            "visual_styles": {
-                "high_engagement": ["밝은톤", "선명한색감", "클로즈업", "얼굴노출", "텍스트오버레이"],
-                "trending": ["미니멀", "파스텔톤", "네온사인", "빈티지필터", "자연광"]
-            },
-            "content_structures": {
-                "listicle": "Top N 형식 (예: 서울 맛집 TOP 5)",
-                "tutorial": "단계별 설명 (예: 메이크업 튜토리얼)",
-                "before_after": "변화 과정 보여주기",
-                "storytelling": "스토리 중심 전개",
-                "comparison": "비교 콘텐츠 (A vs B)"
-            }
-        }
+    def __init__(self, knowledge=None, cooccurrence=None):
+        # 지식 베이스는 프로세스 전역에서 공유하는 읽기 전용 객체 (요청마다 다시 만들지 않음)
+        self.knowledge = knowledge or get_knowledge_base()
+        # 수집 게시물로 갱신되는 해시태그 동시 출현 인덱스 (추천 해시태그)
+        if cooccurrence is None and get_cooccurrence_index is not None:
+            cooccurrence = get_cooccurrence_index()
+        self.cooccurrence = cooccurrence
+        self.viral_patterns = self.knowledge.viral_patterns
+        self.hashtag_database = self.knowledge.hashtag_database
+        self.content_templates = self.knowledge.content_templates
     
     def analyze_content(self, content_data: Dict) -> ViralFactors:
         """콘텐츠 바이럴 요인 분석"""
@@ -196,23 +101,26 @@ class ViralContentAnalyzer:
         # 기본 메트릭 추출
         metrics = self._extract_metrics(content_data)
         
+        # 캡션은 한 번만 스캔하고 이후 분석은 추출된 특징을 사용
+        features = features_for(content_data, hashtags=content_data.get('hashtags', []), extractor=self.knowledge.extractor)
+        
         # 카테고리 식별
-        category = self._identify_category(content_data)
+        category = self._identify_category(features)
         
         # 바이럴 점수 계산
         viral_score = self._calculate_viral_score(metrics, category)
         
         # 성공 요인 분석
-        success_factors = self._analyze_success_factors(content_data, category)
+        success_factors = self._analyze_success_factors(content_data, category, features)
         
         # 개선 제안 생성
-        improvements = self._generate_improvements(content_data, category, viral_score)
+        improvements = self._generate_improvements(content_data, category, viral_score, features)
         
         # 해시태그 전략 분석
-        hashtag_strategy = self._analyze_hashtag_strategy(content_data, category)
+        hashtag_strategy = self._analyze_hashtag_strategy(content_data, category, features)
         
         # 캡션 분석
-        caption_analysis = self._analyze_caption(content_data.get('caption', ''))
+        caption_analysis = self._analyze_caption(features)
         
         # 포스팅 시간 분석
         posting_time = self._analyze_posting_time(content_data.get('timestamp'))
@@ -265,26 +173,9 @@ class ViralContentAnalyzer:
             viral_score=viral_score * 100
         )
     
-    def _identify_category(self, content_data: Dict) -> str:
-        """콘텐츠 카테고리 식별"""
-        caption = content_data.get('caption', '').lower()
-        hashtags = content_data.get('hashtags', [])
-        
-        category_keywords = {
-            "먹방": ["맛집", "먹방", "음식", "요리", "푸드", "맛있", "배고"],
-            "여행": ["여행", "travel", "여행", "풍경", "관광", "trip"],
-            "패션": ["패션", "옷", "코디", "스타일", "fashion", "ootd"],
-            "뷰티": ["뷰티", "화장", "메이크업", "스킨케어", "코스메틱"],
-            "운동": ["운동", "헬스", "다이어트", "피트니스", "workout"]
-        }
-        
-        scores = {}
-        for cat, keywords in category_keywords.items():
-            score = sum(1 for kw in keywords if kw in caption)
-            score += sum(1 for tag in hashtags for kw in keywords if kw in tag.lower())
-            scores[cat] = score
-        
-        return max(scores, key=scores.get) if scores else "기타"
+    def _identify_category(self, features) -> str:
+        """콘텐츠 카테고리 식별 (캡션 / 해시태그 키워드 점수는 caption_features에서 계산)"""
+        return features.category
     
     def _calculate_viral_score(self, metrics: ContentMetrics, category: str) -> float:
         """바이럴 확률 계산"""
@@ -304,17 +195,16 @@ class ViralContentAnalyzer:
         
         return viral_probability
     
-    def _analyze_success_factors(self, content_data: Dict, category: str) -> List[str]:
+    def _analyze_success_factors(self, content_data: Dict, category: str, features) -> List[str]:
         """성공 요인 분석"""
         factors = []
         pattern = self.viral_patterns.get(category, {})
         
         # 바이럴 트리거 체크
-        caption = content_data.get('caption', '').lower()
         viral_triggers = pattern.get('viral_triggers', [])
         
         for trigger in viral_triggers:
-            if trigger.lower() in caption:
+            if features.has(trigger):
                 factors.append(f"바이럴 트리거 사용: {trigger}")
         
         # 해시태그 최적화 체크
@@ -347,7 +237,7 @@ class ViralContentAnalyzer:
         
         return factors if factors else ["일반적인 콘텐츠 패턴"]
     
-    def _generate_improvements(self, content_data: Dict, category: str, viral_score: float) -> List[str]:
+    def _generate_improvements(self, content_data: Dict, category: str, viral_score: float, features) -> List[str]:
         """개선 제안 생성"""
         suggestions = []
         pattern = self.viral_patterns.get(category, {})
@@ -372,10 +262,9 @@ class ViralContentAnalyzer:
             suggestions.append(f"#️⃣ 해시태그 {hashtag_count-max_tags}개 줄이기 권장")
         
         # 캡션 개선
-        caption = content_data.get('caption', '')
-        if len(caption) < 50:
+        if features.length < 50:
             suggestions.append("📝 스토리텔링을 추가하여 캡션 보강")
-        if '?' not in caption:
+        if not features.has_question:
             suggestions.append("❓ 질문을 추가하여 댓글 유도")
         
         # 포스팅 시간 최적화
@@ -390,16 +279,16 @@ class ViralContentAnalyzer:
         
         return suggestions
     
-    def _analyze_hashtag_strategy(self, content_data: Dict, category: str) -> Dict[str, Any]:
-        """해시태그 전략 분석"""
+    def _analyze_hashtag_strategy(self, content_data: Dict, category: str, features) -> Dict[str, Any]:
+        """해시태그 전략 분석 (해시태그별 키워드는 caption_features의 오토마톤 스캔 결과 사용)"""
         hashtags = content_data.get('hashtags', [])
         trending = self.hashtag_database['trending'].get(category, [])
         power = self.hashtag_database['power_tags']['universal']
         
         analysis = {
             "total_count": len(hashtags),
-            "trending_match": len([h for h in hashtags if any(t in h.lower() for t in trending)]),
-            "power_tags": len([h for h in hashtags if any(p in h.lower() for p in power)]),
+            "trending_match": features.tags_matching(trending),
+            "power_tags": features.tags_matching(power),
             "recommendation": [],
             "effectiveness_score": 0
         }
@@ -413,29 +302,31 @@ class ViralContentAnalyzer:
         
         analysis['effectiveness_score'] = score
         
-        # 추천 해시태그
-        missing_trending = [t for t in trending[:5] if not any(t in h.lower() for h in hashtags)]
-        analysis['recommendation'] = missing_trending[:3]
+        # 추천 해시태그 - 사용한 해시태그와 함께 많이 쓰이는 태그(동시 출현 PMI), 수집 데이터가 없으면 빠진 트렌드 태그
+        # (인덱스 자체를 쓸 수 없으면 빈 목록)
+        if self.cooccurrence is None:
+            analysis['recommendation'] = []
+            return analysis
+        related = self.cooccurrence.related(hashtags, limit=3) if hashtags else []
+        if related:
+            analysis['recommendation'] = [row['tag'] for row in related]
+        else:
+            missing_trending = features.missing_from_tags(trending[:5])
+            analysis['recommendation'] = missing_trending[:3]
         
         return analysis
     
-    def _analyze_caption(self, caption: str) -> Dict[str, Any]:
+    def _analyze_caption(self, features) -> Dict[str, Any]:
         """캡션 분석"""
         analysis = {
-            "length": len(caption),
-            "has_emoji": bool(re.search(r'[^\w\s,]', caption)),
-            "has_question": '?' in caption,
-            "has_cta": any(word in caption.lower() for word in ['댓글', '공유', '태그', '팔로우']),
-            "hook_type": None,
+            "length": features.length,
+            "has_emoji": features.has_emoji,
+            "has_question": features.has_question,
+            "has_cta": features.has_cta,
+            "hook_type": features.hook_type,
             "readability_score": 0
         }
         
-        # 훅 타입 식별
-        for hook_type, patterns in self.content_templates['caption_hooks'].items():
-            if any(p in caption for p in patterns):
-                analysis['hook_type'] = hook_type
-                break
-        
         # 가독성 점수
         score = 0
         if 50 <= analysis['length'] <= 200:
@@ -516,6 +407,98 @@ class ViralContentAnalyzer:
         
         return patterns
     
+    def analyze_many(self, posts: List[Dict], explain: bool = False, top_k: int = 10) -> Dict[str, Any]:
+        """여러 게시물 일괄 분석
+        
+        메트릭 / 바이럴 확률 / 참여 패턴은 게시물 전체를 배열로 한 번에 계산하고 (ContentMetrics / ViralFactors 생성 없음),
+        성공 요인 / 개선 제안 / 해시태그 / 캡션 / 시간대 설명 문구는 explain=True일 때만 게시물별로 만듭니다.
+        posts는 analyze_content 입력 형식(likes / comments ...) 또는 크롤러 게시물 형식(like_count / comment_count ...)입니다.
+        """
+        contents = [to_content_data(post) for post in posts]
+        # PostRecord는 레코드에 캐시된 캡션 특징을 재사용 (같은 지식 베이스 버전의 추출기일 때)
+        extractor = self.knowledge.extractor
+        features = [
+            features_for(post, extractor=extractor) if not isinstance(post, dict)
+            else features_for(content, hashtags=content.get('hashtags', []), extractor=extractor)
+            for post, content in zip(posts, contents)
+        ]
+        categories = [self._identify_category(feature) for feature in features]
+        
+        likes = np.array([content.get('likes', 0) for content in contents], dtype=np.float64)
+        comments = np.array([content.get('comments', 0) for content in contents], dtype=np.float64)
+        shares = np.array([content.get('shares', 0) for content in contents], dtype=np.float64)
+        saves = np.array([content.get('saves', 0) for content in contents], dtype=np.float64)
+        views = np.array([content.get('views', content.get('likes', 0) * 10) for content in contents], dtype=np.float64)
+        multipliers = np.array(
+            [self.viral_patterns.get(category, {}).get('avg_viral_rate', 0.1) for category in categories], dtype=np.float64
+        )
+        
+        with np.errstate(divide='ignore', invalid='ignore'):
+            # _extract_metrics와 같은 연산 순서 (조회수 0이면 0)
+            total = likes + comments + shares + saves
+            has_views = views > 0
+            engagement_rate = np.where(has_views, total / views * 100, 0.0)
+            metric_score = np.where(has_views, (likes * 1 + comments * 2 + shares * 3 + saves * 2.5) / views, 0.0) * 100
+            # _calculate_viral_score
+            adjusted = np.where(engagement_rate > 10, metric_score * 1.5, np.where(engagement_rate > 5, metric_score * 1.2, metric_score))
+            viral_probability = np.minimum(adjusted * multipliers, 1.0)
+            # _analyze_engagement_patterns (좋아요 0이면 비율은 댓글 등이 있을 때 무한대 -> 높음, 없으면 보통)
+            has_total = total > 0
+            distribution = {
+                name: np.where(has_total, values / total * 100, 0.0)
+                for name, values in (('likes', likes), ('comments', comments), ('shares', shares), ('saves', saves))
+            }
+            interaction_high = comments / likes > 0.05
+            virality_high = shares / likes > 0.1
+            save_high = saves / likes > 0.15
+        
+        distribution = {name: values.tolist() for name, values in distribution.items()}
+        has_total = has_total.tolist()
+        interaction_high, virality_high, save_high = interaction_high.tolist(), virality_high.tolist(), save_high.tolist()
+        probability_list = viral_probability.tolist()
+        engagement_list = engagement_rate.tolist()
+        
+        results = []
+        for i, (content, category) in enumerate(zip(contents, categories)):
+            result = {
+                'index': i,
+                'content_type': content.get('type', 'unknown'),
+                'category': category,
+                'viral_probability': round(probability_list[i] * 100, 1),
+                'engagement_rate': round(engagement_list[i], 2),
+                'engagement_patterns': {
+                    "engagement_distribution": {
+                        name: round(values[i], 1) if has_total[i] else 0 for name, values in distribution.items()
+                    },
+                    "interaction_quality": "높음" if interaction_high[i] else "보통",
+                    "virality_indicator": "높음" if virality_high[i] else "보통",
+                    "save_rate": "높음" if save_high[i] else "보통"
+                }
+            }
+            for key in ('id', 'shortcode'):
+                if key in content:
+                    result[key] = content[key]
+            if explain:
+                feature = features[i]
+                result['success_factors'] = self._analyze_success_factors(content, category, feature)
+                result['improvement_suggestions'] = self._generate_improvements(content, category, probability_list[i], feature)
+                result['hashtag_strategy'] = self._analyze_hashtag_strategy(content, category, feature)
+                result['caption_analysis'] = self._analyze_caption(feature)
+                result['posting_time'] = self._analyze_posting_time(content.get('timestamp'))
+            results.append(result)
+        
+        top = np.argsort(-viral_probability, kind='stable')[:top_k].tolist()
+        return {
+            'count': len(results),
+            'summary': {
+                'mean_viral_probability': round(float(viral_probability.mean()) * 100, 1) if len(results) else 0,
+                'median_engagement_rate': round(float(np.median(engagement_rate)), 2) if len(results) else 0,
+                'by_category': dict(Counter(categories)),
+                'top_indices': top
+            },
+            'results': results
+        }
+    
     def generate_content_ideas(self, category: str, trending_data: Dict = None) -> List[Dict[str, Any]]:
         """
         🤖 AI 기반 콘텐츠 아이디어 생성 (GPT-4 & Gemini 알고리즘 기반)
@@ -530,102 +513,8 @@ class ViralContentAnalyzer:
         ideas = []
         pattern = self.viral_patterns.get(category, {})
         
-        # 기본 아이디어 템플릿
-        base_ideas = {
-            "먹방": [
-                {
-                    "title": "🔥 ASMR 먹방 챌린지",
-                    "description": "인기 음식의 ASMR 사운드를 극대화한 먹방",
-                    "format": "릴스 (30초)",
-                    "key_points": ["첫입 리액션", "클로즈업 샷", "리얼 사운드"],
-                    "expected_engagement": "15-20%",
-                    "best_time": "19:00-21:00"
-                },
-                {
-                    "title": "📍 숨은 맛집 탐방기",
-                    "description": "아직 알려지지 않은 로컬 맛집 소개",
-                    "format": "캐러셀 (5-7장)",
-                    "key_points": ["위치 정보", "메뉴 가격", "솔직 리뷰"],
-                    "expected_engagement": "8-12%",
-                    "best_time": "12:00-13:00"
-                }
-            ],
-            "여행": [
-                {
-                    "title": "🌅 일출 명소 TOP 5",
-                    "description": "한국의 숨겨진 일출 명소 소개",
-                    "format": "릴스 (60초)",
-                    "key_points": ["드론샷", "타임랩스", "위치 정보"],
-                    "expected_engagement": "12-18%",
-                    "best_time": "07:00-09:00"
-                },
-                {
-                    "title": "💰 가성비 여행 꿀팁",
-                    "description": "예산 절약하며 여행하는 방법",
-                    "format": "캐러셀 (8-10장)",
-                    "key_points": ["숙박 할인", "교통 팁", "무료 관광지"],
-                    "expected_engagement": "10-15%",
-                    "best_time": "20:00-22:00"
-                }
-            ],
-            "패션": [
-                {
-                    "title": "👗 일주일 코디 챌린지",
-                    "description": "최소 아이템으로 일주일 다른 스타일링",
-                    "format": "릴스 (45초)",
-                    "key_points": ["빠른 전환", "아이템 정보", "구매 링크"],
-                    "expected_engagement": "10-14%",
-                    "best_time": "14:00-16:00"
-                },
-                {
-                    "title": "🛍️ 세일 정보 총정리",
-                    "description": "이번 주 브랜드별 세일 정보",
-                    "format": "캐러셀 (5-6장)",
-                    "key_points": ["할인율", "추천 아이템", "쿠폰 코드"],
-                    "expected_engagement": "15-20%",
-                    "best_time": "19:00-21:00"
-                }
-            ],
-            "뷰티": [
-                {
-                    "title": "✨ 5분 메이크업 루틴",
-                    "description": "바쁜 아침을 위한 초간단 메이크업",
-                    "format": "릴스 (60초)",
-                    "key_points": ["스피드", "필수템", "비포애프터"],
-                    "expected_engagement": "12-16%",
-                    "best_time": "09:00-11:00"
-                },
-                {
-                    "title": "🧴 신제품 솔직 리뷰",
-                    "description": "이달의 뷰티 신제품 사용기",
-                    "format": "캐러셀 (7-8장)",
-                    "key_points": ["장단점", "피부타입", "가격대"],
-                    "expected_engagement": "10-13%",
-                    "best_time": "21:00-23:00"
-                }
-            ],
-            "운동": [
-                {
-                    "title": "💪 30일 챌린지",
-                    "description": "매일 10분 홈트레이닝 챌린지",
-                    "format": "릴스 (30초)",
-                    "key_points": ["운동 시범", "칼로리", "비포애프터"],
-                    "expected_engagement": "11-15%",
-                    "best_time": "06:00-08:00"
-                },
-                {
-                    "title": "🥗 다이어트 식단 공개",
-                    "description": "일주일 다이어트 식단과 레시피",
-                    "format": "캐러셀 (8-10장)",
-                    "key_points": ["칼로리", "영양정보", "레시피"],
-                    "expected_engagement": "9-13%",
-                    "best_time": "18:00-20:00"
-                }
-            ]
-        }
-        
-        # 카테고리별 아이디어 선택
-        category_ideas = base_ideas.get(category, [])
+        # 카테고리별 아이디어 선택 (공유 지식 베이스는 읽기 전용이므로 요청별 복사본에 메타데이터를 추가)
+        category_ideas = [thaw(idea) for idea in self.knowledge.content_ideas.get(category, ())]
         
         # 트렌딩 데이터 반영
         if trending_data:
@@ -661,31 +550,10 @@ class ViralContentAnalyzer:
     
     def _generate_caption_template(self, title: str, category: str) -> str:
         """AI 캡션 템플릿 생성"""
-        templates = {
-            "먹방": [
-                f"🍽️ {title}\n\n오늘은 특별한 [음식명]을 준비했어요!\n\n✨ [특별한 포인트]\n📍 [위치/가게명]\n💰 [가격정보]\n\n맛있게 보셨다면 ❤️ 꾹!\n.\n.\n#먹방 #맛집 #푸드스타그램",
-                f"[후킹 질문]? 🤔\n\n{title} 시작합니다!\n\n[메인 내용]\n\n👇 댓글로 여러분의 최애 [음식종류] 알려주세요!\n.\n.\n#먹스타그램 #맛집추천"
-            ],
-            "여행": [
-                f"📍 {title}\n\n인생샷 건지러 떠난 [장소명] 🌅\n\n💡 꿀팁\n1. [팁1]\n2. [팁2]\n3. [팁3]\n\n저장하고 나중에 꼭 가보세요! 📌\n.\n.\n#여행스타그램 #국내여행",
-                f"[감성 문구] ✈️\n\n{title}\n\n📸 포토스팟: [위치]\n⏰ 베스트 타임: [시간]\n💰 입장료: [가격]\n\n더 많은 여행 정보는 프로필 링크! 🔗\n.\n.\n#여행 #풍경스타그램"
-            ],
-            "패션": [
-                f"Today's OOTD 👗\n\n{title}\n\n상의: [브랜드/제품명]\n하의: [브랜드/제품명]\n신발: [브랜드/제품명]\n\n💝 세일 정보는 스토리 확인!\n.\n.\n#데일리룩 #패션스타그램",
-                f"스타일링 고민 해결! 💫\n\n{title}\n\n[스타일링 팁]\n\n마음에 드는 룩에 투표해주세요 👉\n.\n.\n#옷스타그램 #코디"
-            ],
-            "뷰티": [
-                f"✨ {title}\n\n사용 제품 리스트 📝\n1. [제품1]\n2. [제품2]\n3. [제품3]\n\n💄 자세한 사용법은 릴스 참고!\n.\n.\n#뷰티스타그램 #메이크업",
-                f"[비포 애프터 공개] 😱\n\n{title}\n\n핵심 포인트:\n✔️ [포인트1]\n✔️ [포인트2]\n✔️ [포인트3]\n\n할인 코드: [코드] (프로필 링크)\n.\n.\n#화장품추천 #뷰티팁"
-            ],
-            "운동": [
-                f"오운완 💪\n\n{title}\n\n오늘의 루틴:\n1️⃣ [운동1] - [세트/횟수]\n2️⃣ [운동2] - [세트/횟수]\n3️⃣ [운동3] - [세트/횟수]\n\n함께 운동해요! 인증샷 기다릴게요 📸\n.\n.\n#운동스타그램 #헬스타그램",
-                f"[도전 시작] Day 1/30 🔥\n\n{title}\n\n목표: [목표]\n방법: [간단 설명]\n\n동참하실 분들 댓글 남겨주세요! 👇\n.\n.\n#다이어트 #운동"
-            ]
-        }
-        
-        category_templates = templates.get(category, [f"{title}\n\n[내용]\n\n#해시태그"])
-        return category_templates[0] if category_templates else f"{title}"
+        category_templates = self.knowledge.caption_templates.get(category)
+        if not category_templates:
+            return f"{title}\n\n[내용]\n\n#해시태그"
+        return category_templates[0].replace("{title}", title)
     
     def predict_performance(self, content_plan: Dict) -> Dict[str, Any]:
         """콘텐츠 성과 예측"""
@@ -793,10 +661,23 @@ class ViralContentAnalyzer:
         return tips
 
 
+_shared_analyzer = None
+
+
+def get_analyzer() -> ViralContentAnalyzer:
+    """현재 지식 베이스 버전에 묶인 공유 분석기 (지식 베이스가 다시 로드되면 새로 만듦)"""
+    global _shared_analyzer
+    knowledge = get_knowledge_base()
+    analyzer = _shared_analyzer
+    if analyzer is None or analyzer.knowledge is not knowledge:
+        analyzer = _shared_analyzer = ViralContentAnalyzer(knowledge)
+    return analyzer
+
+
 # FastAPI 엔드포인트 통합을 위한 헬퍼 함수
 def analyze_viral_content(content_data: Dict) -> Dict:
     """바이럴 콘텐츠 분석 API 헬퍼"""
-    analyzer = ViralContentAnalyzer()
+    analyzer = get_analyzer()
     result = analyzer.analyze_content(content_data)
     
     return {
@@ -811,9 +692,13 @@ def analyze_viral_content(content_data: Dict) -> Dict:
         'improvement_suggestions': result.improvement_suggestions
     }
 
+def analyze_viral_contents(posts: List[Dict], explain: bool = False) -> Dict:
+    """바이럴 콘텐츠 일괄 분석 API 헬퍼"""
+    return get_analyzer().analyze_many(posts, explain=explain)
+
 def generate_ai_content_ideas(category: str, user_data: Dict = None) -> List[Dict]:
     """AI 콘텐츠 아이디어 생성 API 헬퍼"""
-    analyzer = ViralContentAnalyzer()
+    analyzer = get_analyzer()
     
     # 사용자 데이터에서 트렌딩 정보 추출
     trending_data = None
@@ -828,6 +713,6 @@ def generate_ai_content_ideas(category: str, user_data: Dict = None) -> List[Dic
 
 def predict_content_performance(content_plan: Dict) -> Dict:
     """콘텐츠 성과 예측 API 헬퍼"""
-    analyzer = ViralContentAnalyzer()
+    analyzer = get_analyzer()
     prediction = analyzer.predict_performance(content_plan)
     return prediction
\ No newline at end of file